@@ -1,9 +1,26 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Body, Header, Response
+from typing import Optional, List, Dict, Any
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 import json
 import random
+import copy
+
+from app.core.security import verify_admin_user
+from app.schemas.job import PipelineStage
+from app.services.cost_model import check_admission, estimate_job, job_eta
+from app.services.job_queue import job_queue
+from app.services.keyframes import keyframe_cache
+from app.services.metrics import build_mni_metrics
+from app.services.mni_binary import mni_dictionaries
+from app.services.mni_codec import MNI_ENCODERS, MniValidationError, mni_bytes_cache, negotiate_media_type, validate_mni
+from app.services.mni_store import load_mni, save_mni
+from app.services.pot_runner import pot_cells, pot_runner
+from app.services.renderer import diff_sections
+from app.services.scene_compiler import SceneCompileError
+from app.utils.json_patch import JsonPatchError, apply_patch
+from app.utils.mni_hash import HashTimeoutError, canonical_dumps, compute_hash_key, run_hashing
 
 router = APIRouter()
 
@@ -68,6 +85,63 @@ DUMMY_JOBS = [
     }
 ]
 
+# 더미 .mni 파일 내용 (실제 구현에서는 스토리지에서 가져옴)
+DUMMY_MNI = {
+    "schema_version": "1.0",
+    "problem": {
+        "id": "QF001",
+        "statement": "함수 y = x^2 - 4x + 3의 꼭짓점을 구하라",
+        "metadata": { "subject": "수학", "unit": "이차함수", "difficulty": "중간", "time_estimate_min": 3 }
+    },
+    "proof_tape": [
+        {"step":1,"rule":"complete_square","expr_in":"x^2-4x+3","expr_out":"(x-2)^2-1"},
+        {"step":2,"rule":"vertex","expr_in":"(x-2)^2-1","expr_out":"(2,-1)"}
+    ],
+    "visual": {
+        "type": "ManimScene",
+        "sections": [
+            {
+                "section_name": "Graph",
+                "steps": [
+                    { "action": "CreateAxes", "x_range": [-2,6], "y_range": [-2,10] },
+                    { "action": "PlotFunction", "function": "x**2 - 4*x + 3" },
+                    { "action": "HighlightPoint", "point": [2, -1], "color": "yellow" }
+                ]
+            }
+        ]
+    },
+    "verification": {
+        "sympy": { "code":"import sympy as sp\nx = sp.Symbol('x')\nf = x**2 - 4*x + 3\nf_expanded = sp.expand(f)\na = f_expanded.coeff(x, 2)\nb = f_expanded.coeff(x, 1)\nc = f_expanded.coeff(x, 0)\nvx = -b/(2*a)\nvy = f.subs(x, vx)\nprint(f'Vertex: ({vx}, {vy})')", "status":"pass", "artifacts":["vx=2","vy=-1"] }
+    },
+    "build": {
+        "options": { "fps": 30, "resolution": "1400x800", "theme":"dark" },
+        "hash_key": "QF001:9b7c...:v1",
+        "created_at": "2025-09-18T10:45:00Z"
+    }
+}
+
+async def _find_job(job_id: str) -> Optional[dict]:
+    """
+    작업 큐 저장소와 더미 목록에서 작업을 찾습니다. (저장소 조회는 스레드에서)
+    """
+    job = await asyncio.to_thread(job_queue.get_job, job_id)
+    if job is not None:
+        return job
+    for job in DUMMY_JOBS:
+        if job["id"] == job_id:
+            return job
+    return None
+
+async def _run_hashing(func, *args):
+    # hash_key 계산(수식 정규화 포함)을 이벤트 루프 밖에서 시간 제한을 두고 실행
+    try:
+        return await run_hashing(func, *args)
+    except HashTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=".mni 수식이 너무 복잡해 hash_key를 계산할 수 없습니다."
+        )
+
 @router.get("/")
 async def list_jobs(
     status: Optional[str] = None, 
@@ -78,9 +152,10 @@ async def list_jobs(
     작업 목록 조회
     """
     # 실제 구현에서는 DB에서 필터링하여 가져옴
-    filtered_jobs = DUMMY_JOBS
+    all_jobs = DUMMY_JOBS + await asyncio.to_thread(job_queue.list_jobs)
+    filtered_jobs = all_jobs
     if status:
-        filtered_jobs = [job for job in DUMMY_JOBS if job["status"] == status]
+        filtered_jobs = [job for job in all_jobs if job["status"] == status]
     
     # 페이징 적용
     paginated = filtered_jobs[offset:offset+limit]
@@ -91,9 +166,11 @@ async def list_jobs(
     }
 
 @router.post("/")
-async def create_job(problem_image_url: Optional[str] = None, problem_text: Optional[str] = None):
+async def create_job(problem_image_url: Optional[str] = None, problem_text: Optional[str] = None, preview: bool = False):
     """
     새 작업 생성
+    
+    preview=true이면 레이아웃 확인용 저해상도 영상만 렌더링합니다. (POST /{job_id}/promote로 최종 렌더)
     """
     if not problem_image_url and not problem_text:
         raise HTTPException(
@@ -116,11 +193,22 @@ async def create_job(problem_image_url: Optional[str] = None, problem_text: Opti
         "updated_at": now,
         "error_message": None,
         "metadata": {
-            "problem_text": problem_text
+            "problem_text": problem_text,
+            "preview": preview
         }
     }
     
-    # 실제로는 이 시점에서 백그라운드 작업을 큐에 등록
+    # 예상 대기 시간이 한도를 넘으면 거절
+    retry_after = await asyncio.to_thread(check_admission, estimate_job(new_job))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="현재 처리 대기 중인 작업이 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+    
+    # 파이프라인 작업 큐에 등록 (실패한 단계는 재시도 정책에 따라 재실행)
+    await asyncio.to_thread(job_queue.submit, new_job)
     
     return new_job
 
@@ -130,9 +218,13 @@ async def get_job(job_id: str):
     특정 작업 상세 조회
     """
     # 실제 구현에서는 DB에서 작업 정보를 조회
-    for job in DUMMY_JOBS:
-        if job["id"] == job_id:
-            return job
+    job = await _find_job(job_id)
+    if job is not None:
+        # 대기·처리 중인 작업은 렌더 비용 모델 기반 예상 완료 시간 포함
+        eta = await asyncio.to_thread(job_eta, job)
+        if eta is not None:
+            job = {**job, "eta": eta}
+        return job
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -169,56 +261,290 @@ async def get_job_video(job_id: str):
         detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
     )
 
+@router.get("/mni-dictionaries/{dictionary_id}")
+async def get_mni_dictionary(dictionary_id: str):
+    """
+    바이너리 .mni를 풀 때 쓰는 zlib 미리 정의 사전 (사전 id는 바이너리 .mni 헤더 5~12번째 바이트)
+    """
+    try:
+        dictionary = mni_dictionaries.get(bytes.fromhex(dictionary_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {dictionary_id}인 .mni 사전을 찾을 수 없습니다."
+        )
+    # 사전 id는 내용 해시이므로 바뀌지 않음
+    return Response(
+        content=dictionary,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
 @router.get("/{job_id}/mni")
-async def get_job_mni(job_id: str):
+async def get_job_mni(job_id: str, accept: Optional[str] = Header(None)):
     """
     작업의 .mni 파일 내용 조회
+    
+    Accept: application/x-mni-binary이면 바이너리 형식(MessagePack + zlib 미리 정의 사전)으로 반환합니다.
     """
-    # 실제 구현에서는 DB에서 작업 정보를 조회하고 .mni 파일 내용 반환
-    for job in DUMMY_JOBS:
-        if job["id"] == job_id:
-            if job["status"] != "completed":
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="작업이 아직 완료되지 않았습니다."
-                )
-            
-            # 더미 .mni 파일 내용 (실제로는 DB나 스토리지에서 가져와야 함)
-            return {
-                "schema_version": "1.0",
-                "problem": {
-                    "id": "QF001",
-                    "statement": "함수 y = x^2 - 4x + 3의 꼭짓점을 구하라",
-                    "metadata": { "subject": "수학", "unit": "이차함수", "difficulty": "중간", "time_estimate_min": 3 }
-                },
-                "proof_tape": [
-                    {"step":1,"rule":"complete_square","expr_in":"x^2-4x+3","expr_out":"(x-2)^2-1"},
-                    {"step":2,"rule":"vertex","expr_in":"(x-2)^2-1","expr_out":"(2,-1)"}
-                ],
-                "visual": {
-                    "type": "ManimScene",
-                    "sections": [
-                        {
-                            "section_name": "Graph",
-                            "steps": [
-                                { "action": "CreateAxes", "x_range": [-2,6], "y_range": [-2,10] },
-                                { "action": "PlotFunction", "function": "x**2 - 4*x + 3" },
-                                { "action": "HighlightPoint", "point": [2, -1], "color": "yellow" }
-                            ]
-                        }
-                    ]
-                },
-                "verification": {
-                    "sympy": { "code":"import sympy as sp\nx = sp.Symbol('x')\nf = x**2 - 4*x + 3\nf_expanded = sp.expand(f)\na = f_expanded.coeff(x, 2)\nb = f_expanded.coeff(x, 1)\nc = f_expanded.coeff(x, 0)\nvx = -b/(2*a)\nvy = f.subs(x, vx)\nprint(f'Vertex: ({vx}, {vy})')", "status":"pass", "artifacts":["vx=2","vy=-1"] }
-                },
-                "build": {
-                    "options": { "fps": 30, "resolution": "1400x800", "theme":"dark" },
-                    "hash_key": "QF001:9b7c...:v1",
-                    "created_at": "2025-09-18T10:45:00Z"
-                }
-            }
+    job = await _find_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
+        )
     
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
-    )
\ No newline at end of file
+    if job["status"] != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="작업이 아직 완료되지 않았습니다."
+        )
+    
+    # 파이프라인 단계별 측정값을 metrics 블록에 기록
+    metrics = build_mni_metrics(job) if job.get("metadata", {}).get("metrics") else None
+    
+    def prepare(mni: Dict[str, Any]) -> Dict[str, Any]:
+        # 렌더링 영향 필드 기반 캐시 키
+        mni.setdefault("build", {"options": {}})["hash_key"] = compute_hash_key(mni)
+        if metrics:
+            mni["metrics"] = metrics
+        return mni
+    
+    media_type = negotiate_media_type(accept)
+    # 같은 버전의 .mni는 직렬화된 바이트를 재사용
+    body = job["mni_file_id"] and await _run_hashing(
+        mni_bytes_cache.get, job["mni_file_id"], prepare, canonical_dumps(metrics) if metrics else "", media_type
+    )
+    if not body:
+        # .mni 저장소에 없으면 더미 .mni 파일 내용 사용 (실제로는 DB나 스토리지에서 가져와야 함)
+        body = await _run_hashing(lambda: MNI_ENCODERS[media_type](prepare(copy.deepcopy(DUMMY_MNI))))
+    
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+@router.get("/{job_id}/keyframes")
+async def get_job_keyframes(
+    job_id: str,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    작업의 .mni를 브라우저에서 재생할 키프레임 타임라인으로 반환합니다.
+    
+    서버 렌더링 없이 생성하며(visual.type이 ThreeJS인 작업은 영상 대신 이 결과만 만듦),
+    hash_key를 ETag로 사용합니다. 클라이언트가 gzip을 지원하면 압축해서 보냅니다.
+    """
+    job = await _find_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
+        )
+    
+    if job["status"] != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="작업이 아직 완료되지 않았습니다."
+        )
+    
+    mni = (job["mni_file_id"] and await asyncio.to_thread(load_mni, job["mni_file_id"])) or copy.deepcopy(DUMMY_MNI)
+    try:
+        # hash_key 계산과 키프레임 생성(캐시 조회)은 이벤트 루프 밖에서 시간 제한을 두고 실행
+        hash_key, body, gzipped = await _run_hashing(keyframe_cache.get, mni)
+    except SceneCompileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"키프레임을 생성할 수 없습니다: {str(e)}"
+        )
+    
+    headers = {"ETag": f'"{hash_key}"', "Vary": "Accept-Encoding"}
+    if if_none_match and if_none_match.strip('"') == hash_key:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if accept_encoding and "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        body = gzipped
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.patch("/{job_id}/mni")
+async def patch_job_mni(
+    job_id: str,
+    patch: List[Dict[str, Any]] = Body(...),
+    if_match: Optional[str] = Header(None),
+    preview: bool = False,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+):
+    """
+    작업의 .mni에 JSON Patch(RFC 6902)를 적용하고 변경된 섹션만 다시 렌더링합니다. (관리자 전용)
+    
+    섹션 해시가 바뀌지 않은 섹션은 캐시된 영상을 재사용해 최종 영상을 다시 조립합니다.
+    If-Match 헤더에 현재 hash_key를 주면 그 사이 다른 수정이 있었는지 확인합니다.
+    preview=true이면 수정 결과를 저해상도 미리보기로만 렌더링합니다.
+    """
+    job = await _find_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
+        )
+    
+    if job["status"] not in ("completed", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="처리 중인 작업의 .mni는 수정할 수 없습니다."
+        )
+    
+    current = (job["mni_file_id"] and await asyncio.to_thread(load_mni, job["mni_file_id"])) or copy.deepcopy(DUMMY_MNI)
+    current_hash = await _run_hashing(compute_hash_key, current)
+    if if_match and if_match.strip('"') != current_hash:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f".mni가 이미 변경되었습니다. (현재 hash_key: {current_hash})"
+        )
+    
+    try:
+        updated = apply_patch(current, patch)
+        validate_mni(updated)
+    except JsonPatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"패치를 적용할 수 없습니다: {str(e)}"
+        )
+    except MniValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"패치 결과가 유효한 .mni가 아닙니다: {str(e)}"
+        )
+    
+    sections = await _run_hashing(diff_sections, current, updated)
+    hash_key = await _run_hashing(compute_hash_key, updated)
+    updated.setdefault("build", {"options": {}})["hash_key"] = hash_key
+    updated["build"]["created_at"] = datetime.now().isoformat()
+    updated.pop("metrics", None)
+    
+    job = copy.deepcopy(job)
+    job["mni_file_id"] = job["mni_file_id"] or f"mni_{job_id}"
+    await asyncio.to_thread(save_mni, job["mni_file_id"], updated)
+    
+    # 렌더 단계부터 다시 실행 (변경되지 않은 섹션은 캐시 적중)
+    # proof_tape·검증 코드가 바뀌었으면 이전 검증 결과가 맞지 않으므로 검증 단계부터 실행
+    if hash_key != current_hash or preview != bool(job["metadata"].get("preview")):
+        job["metadata"]["edits"] = job["metadata"].get("edits", 0) + int(hash_key != current_hash)
+        job["metadata"]["preview"] = preview
+        job["metadata"].pop("metrics", None)
+        estimate_job(job, updated)
+        stage = PipelineStage.RENDER
+        if any(current.get(key) != updated.get(key) for key in ("proof_tape", "verification")):
+            job["metadata"].pop("verification", None)
+            stage = PipelineStage.VERIFY
+        await asyncio.to_thread(job_queue.submit, job, stage)
+    elif await asyncio.to_thread(job_queue.get_job, job_id) is not None:
+        await asyncio.to_thread(job_queue.store.save_job, job)
+    
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "preview": preview,
+        "hash_key": hash_key,
+        "previous_hash_key": current_hash,
+        "changed_sections": [s["section_name"] for s in sections if s["changed"]],
+        "reused_sections": [s["section_name"] for s in sections if not s["changed"]],
+        "sections": sections
+    }
+
+@router.post("/{job_id}/pot/run")
+async def run_job_pot(job_id: str, user: Dict[str, Any] = Depends(verify_admin_user)):
+    """
+    작업 .mni의 structure.pot 셀을 실행하고 셀별 출력을 .mni에 기록합니다. (관리자 전용)
+    
+    셀 출력은 그 셀과 위쪽 셀 전체의 해시로 캐시하므로, 수정 후에는 바뀐 셀과 그 아래쪽 셀만 다시 실행합니다.
+    """
+    job = await _find_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
+        )
+    
+    if job["status"] not in ("completed", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="처리 중인 작업의 PoT 셀은 실행할 수 없습니다."
+        )
+    
+    mni = load_mni(job["mni_file_id"]) if job.get("mni_file_id") else None
+    pot = ((mni or {}).get("structure") or {}).get("pot")
+    if not pot or not pot.get("cells"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="작업 .mni에 실행할 PoT 셀(structure.pot.cells)이 없습니다."
+        )
+    
+    # 문자열 셀은 출력을 기록할 수 있도록 셀 객체로 바꿔 저장
+    pot["cells"] = pot_cells(pot)
+    try:
+        cells = await pot_runner.run(pot)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"PoT 셀을 실행할 수 없습니다: {str(e)}"
+        )
+    
+    # 다음 실행 때 캐시로 쓰도록 출력과 체인 해시를 .mni에 기록 (hash_key에는 영향 없음)
+    for cell, result in zip(pot["cells"], cells):
+        cell["outputs"] = result["outputs"]
+        cell["hash"] = result["hash"]
+    save_mni(job["mni_file_id"], mni)
+    
+    return {
+        "job_id": job_id,
+        "lang": pot.get("lang", "python"),
+        "executed": sum(1 for c in cells if not c["cached"]),
+        "cached": sum(1 for c in cells if c["cached"]),
+        "cells": cells
+    }
+
+@router.post("/{job_id}/promote")
+async def promote_job(job_id: str):
+    """
+    미리보기 작업을 최종 해상도로 렌더링합니다.
+    
+    미리보기에서 이미 검증·생성된 .mni(IR)를 그대로 사용하므로 구조화·검증 단계를 건너뛰고 렌더 단계부터 실행합니다.
+    """
+    job = await _find_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID가 {job_id}인 작업을 찾을 수 없습니다."
+        )
+    
+    if not job["metadata"].get("preview"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="미리보기 작업이 아닙니다."
+        )
+    
+    if job["status"] != "completed" or not job["mni_file_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="미리보기 렌더링이 아직 완료되지 않았습니다."
+        )
+    
+    mni = await asyncio.to_thread(load_mni, job["mni_file_id"])
+    if mni is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=".mni 파일을 찾을 수 없습니다."
+        )
+    
+    job = copy.deepcopy(job)
+    job["metadata"]["preview"] = False
+    job["metadata"]["promoted_at"] = datetime.now().isoformat()
+    estimate_job(job, mni)
+    hash_key = await _run_hashing(compute_hash_key, mni)
+    await asyncio.to_thread(job_queue.submit, job, PipelineStage.RENDER)
+    
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "hash_key": hash_key,
+        "preview_video_path": job["metadata"].get("preview_video_path")
+    }
@@ -36,6 +36,56 @@ class Settings(BaseSettings):
     
     # Storage
     BUCKET_MNI_FILES: str = "mni-files"
+    MNI_STORE_DIR: str = "./data/mni"
+    MNI_STORE_FORMAT: str = "json"  # "json" | "binary" (MessagePack + zlib 미리 정의 사전, 읽을 때는 자동 판별)
+    MNI_DICTIONARY_DIR: str = "./data/mni-dict"
+    MNI_MIGRATION_WORKERS: Optional[int] = None  # 기본값: CPU 코어 수
+    MNI_MIGRATION_CHECKPOINT: str = "./data/mni-migration.jsonl"
+    MNI_HASH_TIMEOUT_SEC: float = 5.0  # hash_key 계산(수식 정규화) 1건의 벽시계 시간 제한
+    
+    # 렌더링
+    MANIM_BIN: str = "manim"
+    FFMPEG_BIN: str = "ffmpeg"
+    RENDER_TIMEOUT_SEC: int = 600
+    RENDER_PROCESSES: Optional[int] = None  # 기본값: CPU 코어 수
+    RENDER_WORKER_MAX_TASKS: int = 50  # 상주 렌더 워커 교체 주기 (작업 수)
+    RENDER_WORKER_MAX_RSS_MB: int = 2048  # 상주 렌더 워커 교체 기준 (메모리)
+    RENDER_CACHE_DIR: str = "./data/render-cache"
+    RENDER_CACHE_MAX_BYTES: int = 5 * 1024 ** 3
+    RENDER_CACHE_BUCKET: Optional[str] = None
+    COST_MODEL_REFIT_SEC: int = 600
+    COST_MODEL_MAX_SAMPLES: int = 2000
+    ADMISSION_MAX_BACKLOG_SEC: int = 1800  # 예상 대기 시간이 이보다 길면 새 작업을 503으로 거절 (0이면 비활성)
+    TEX_CACHE_DIR: str = "./data/tex-cache"
+    TEX_CACHE_MAX_BYTES: int = 512 * 1024 ** 2
+    PREVIEW_SCALE: float = 0.5  # 미리보기 해상도 배율
+    PREVIEW_FPS: int = 15
+    
+    # SymPy 검증 (verification.sympy.code 샌드박스 실행)
+    VERIFY_WORKERS: Optional[int] = None  # 기본값: CPU 코어 수
+    VERIFY_TIMEOUT_SEC: int = 10  # 실행 1건의 벽시계 시간 제한 (넘으면 워커 강제 종료)
+    VERIFY_CPU_SEC: int = 5  # 실행 1건의 CPU 시간 제한
+    VERIFY_MEMORY_MB: int = 512  # 워커 기본 사용량 외 추가 메모리 제한
+    VERIFY_WORKER_MAX_TASKS: int = 200
+    VERIFY_SANDBOX_USER: Optional[str] = "nobody"  # root로 실행 중일 때 검증 워커·PoT 커널이 전환할 사용자 (비우면 전환하지 않음)
+    EXPRESSION_CACHE_PATH: str = "./data/expression-cache.db"  # SymPy 파싱·단순화 결과 디스크 캐시
+    EXPRESSION_CACHE_MEMORY_SIZE: int = 8192
+    VERIFICATION_STORE_PATH: str = "./data/verification-store.db"  # ProofStep 판정 결과 저장소
+    VERIFICATION_STORE_MEMORY_SIZE: int = 200000  # 시작 시 메모리에 올리는 최대 판정 수
+    VERIFICATION_STORE_MMAP_MB: int = 256
+
+    # PoT(structure.pot) 셀 실행
+    POT_KERNELS: int = 1  # 상주 커널 프로세스 수
+    POT_CPU_SEC: int = 5  # 셀 1개의 CPU 시간 제한
+    POT_TIMEOUT_SEC: int = 30  # 실행 1회(여러 셀)의 벽시계 시간 제한
+    POT_SNAPSHOTS: int = 64  # 커널이 보관하는 셀별 변수 상태 수
+    POT_OUTPUT_CACHE_SIZE: int = 4096
+    
+    # 작업 큐
+    JOB_WORKERS: int = 2
+    JOB_STORE_URL: str = "sqlite:///./data/jobs.db"
+    JOB_LEASE_SEC: int = 60
+    JOB_POLL_INTERVAL_SEC: float = 1.0
     
     @property
     def CORS_ORIGINS(self) -> List[str]:
@@ -12,7 +12,16 @@ from app.routers import (
     diag, auth, manim, storage, problem, user,
     upload, evaluations, community, admin
 )
+# API 모듈에서 jobs 라우터 임포트
+from app.api import jobs
 from app.core.config import settings
+from app.services.job_queue import job_queue
+# 파이프라인 단계 핸들러 등록
+from app.services import pipeline
+from app.services.render_executor import render_executor
+from app.services.cost_model import cost_model
+from app.services.verifier import verification_pool
+from app.services.pot_runner import pot_runner
 
 # 로거 설정
 logging.basicConfig(
@@ -73,7 +82,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning(f"HTTP exception: {exc.detail} ({exc.status_code})")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"message": exc.detail}
+        content={"message": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 # 기본 엔드포인트
@@ -99,6 +109,7 @@ app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
 app.include_router(evaluations.router, prefix="/api/evaluations", tags=["Evaluations"])
 app.include_router(community.router, prefix="/api/community", tags=["Community"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 # 직접 라우트 추가 (프록시 전송 문제 방지)
 @app.get("/api/health")
@@ -122,11 +133,25 @@ async def startup_event():
     logger.info(f"Starting AI-MANIM API on port {settings.API_PORT}")
     logger.info(f"Environment: {'Development' if settings.DEBUG else 'Production'}")
     logger.info(f"CORS origins: {settings.CORS_ORIGINS}")
+    job_queue.start(settings.JOB_WORKERS)
+    # 렌더 워커를 미리 띄워 첫 작업의 import 비용을 없앰
+    render_executor.start()
+    verification_pool.start()
+    # 이전에 확인한 ProofStep 판정을 메모리에 올려 재실행 시 검증을 건너뜀
+    await verification_pool.warm()
+    pot_runner.start()
+    # 완료된 작업의 렌더 시간으로 비용 모델 주기적 재학습
+    cost_model.start(settings.COST_MODEL_REFIT_SEC)
 
 # 앱 종료 이벤트
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down AI-MANIM API")
+    await job_queue.stop()
+    await cost_model.stop()
+    render_executor.shutdown()
+    verification_pool.shutdown()
+    pot_runner.shutdown()
 
 # 직접 실행 시 서버 시작
 if __name__ == "__main__":
@@ -1,9 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Path, Query
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import tempfile
 import httpx
 
 from app.core.config import settings
 from app.core.security import get_current_user, verify_admin_user
+from app.schemas.job import DeadLetterRequeue, PipelineStage
+from app.services.bulk_verify import UPLOAD_SPOOL_BYTES, WINDOW_SIZE, BulkVerification, ndjson_windows, stored_windows
+from app.services.cost_model import cost_model
+from app.services.job_queue import job_queue
+from app.services.pot_runner import pot_runner
+from app.services.metrics import stage_metrics
+from app.services.mni_codec import train_mni_dictionary
+from app.services.mni_migration import MIGRATION_BATCH_FILES, MniMigration
+from app.services.render_executor import render_executor
+from app.services.tex_cache import common_tex_expressions
+from app.services.verifier import verification_pool
 
 router = APIRouter()
 
@@ -247,3 +262,206 @@ async def delete_reply(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting reply: {str(e)}"
         )
+
+@router.get("/jobs/dead-letters")
+async def get_dead_letters(
+    stage: Optional[PipelineStage] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    재시도를 소진했거나 영구 실패한 작업(데드레터 큐)을 조회합니다.
+    """
+    entries = await asyncio.to_thread(job_queue.list_dead_letters, stage)
+    offset = (page - 1) * limit
+    return {
+        "dead_letters": [entry.model_dump(mode="json") for entry in entries[offset:offset + limit]],
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": len(entries),
+            "pages": (len(entries) + limit - 1) // limit
+        }
+    }
+
+@router.post("/jobs/dead-letters/requeue")
+async def requeue_dead_letters(
+    request: DeadLetterRequeue,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    데드레터 큐의 작업을 일괄 재등록합니다.
+
+    job_ids를 생략하면 stage 조건에 맞는 모든 작업을 재등록합니다.
+    """
+    requeued = await asyncio.to_thread(job_queue.requeue_dead_letters, request.job_ids, request.stage)
+    return {
+        "message": f"{len(requeued)} job(s) requeued",
+        "job_ids": requeued
+    }
+
+@router.get("/metrics/stages")
+async def get_stage_metrics(
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    파이프라인 단계별 처리 시간 히스토그램과 캐시 적중률을 조회합니다. (현재 프로세스 기준)
+    """
+    return {
+        "stages": stage_metrics.snapshot()
+    }
+
+@router.get("/metrics/render-workers")
+async def get_render_worker_metrics(
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    상주 렌더 워커 상태와 절약한 프로세스 시작 비용을 조회합니다. (현재 프로세스 기준)
+    """
+    return {
+        "render_workers": render_executor.workers.snapshot()
+    }
+
+@router.get("/metrics/verify-workers")
+async def get_verify_worker_metrics(
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    SymPy 검증 워커 상태, 결과(pass/fail/error/timeout) 집계, 표현식 캐시 적중률을 조회합니다. (현재 프로세스 기준)
+    """
+    return {
+        "verify_workers": verification_pool.snapshot()
+    }
+
+@router.get("/metrics/pot-kernels")
+async def get_pot_kernel_metrics(
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    PoT 커널 상태와 셀 실행·캐시 적중 집계를 조회합니다. (현재 프로세스 기준)
+    """
+    return {
+        "pot_kernels": pot_runner.snapshot()
+    }
+
+@router.post("/render/tex-cache/prewarm")
+async def prewarm_tex_cache(
+    limit: int = 200,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    저장된 .mni에서 자주 쓰인 TeX 수식을 렌더 워커에서 미리 컴파일해 TeX 캐시를 채웁니다.
+    """
+    expressions = await asyncio.to_thread(common_tex_expressions, limit)
+    result = await render_executor.workers.call("prewarm_tex", (expressions,))
+    return {
+        "message": f"Prewarm ran for {len(expressions)} TeX expression(s)",
+        "result": result
+    }
+
+@router.post("/mni/dictionary/train")
+async def train_mni_binary_dictionary(
+    max_files: int = 2000,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    저장된 .mni로 바이너리 .mni 압축 사전을 학습해 이후 저장·응답에 적용합니다.
+    이전 사전도 보관하므로 이미 인코딩된 파일은 그대로 읽을 수 있습니다.
+    """
+    if max_files < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="max_files는 1 이상이어야 합니다."
+        )
+    result = await asyncio.to_thread(train_mni_dictionary, max_files)
+    return {
+        "message": f"Trained a .mni dictionary on {result['samples']} file(s)",
+        "result": result
+    }
+
+@router.post("/mni/migrate")
+async def migrate_mni_files(
+    batch_size: int = MIGRATION_BATCH_FILES,
+    restart: bool = False,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> StreamingResponse:
+    """
+    저장된 .mni를 모두 Full 형식으로 변환하고 파일별 결과를 NDJSON으로 스트리밍합니다.
+
+    체크포인트에 기록된 파일은 해시가 같으면 건너뛰므로 중단된 변환은 다시 호출하면 이어서 진행하고,
+    이미 변환한 저장소에 다시 실행하면 아무 파일도 쓰지 않습니다. restart=true면 체크포인트를 지우고 처음부터 확인합니다.
+    마지막 줄은 {"summary": ...}입니다.
+    """
+    if batch_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="batch_size는 1 이상이어야 합니다."
+        )
+    migration = MniMigration(batch_size=batch_size)
+    # 체크포인트 파일 락이므로 다른 API 워커 프로세스에서 진행 중인 변환도 확인
+    if not await asyncio.to_thread(migration.checkpoint.acquire):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="이미 .mni 변환이 진행 중입니다."
+        )
+
+    async def lines():
+        try:
+            async for result in migration.run(restart=restart):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            migration.checkpoint.release()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/metrics/cost-model")
+async def get_cost_model(
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> Dict[str, Any]:
+    """
+    렌더 비용 예측 모델의 계수와 학습 상태(표본 수, 평균 절대 백분율 오차)를 조회합니다.
+    """
+    return {
+        "cost_model": cost_model.snapshot()
+    }
+
+@router.post("/verify/proof-tapes")
+async def verify_proof_tapes(
+    request: Request,
+    window_size: int = WINDOW_SIZE,
+    refresh: bool = False,
+    user: Dict[str, Any] = Depends(verify_admin_user)
+) -> StreamingResponse:
+    """
+    문제 은행의 proof_tape step을 모두 다시 검증하고 파일별 결과를 NDJSON으로 스트리밍합니다.
+
+    본문(Content-Type: application/x-ndjson)에 .mni를 한 줄에 하나씩 보내면 그 파일들을,
+    본문이 없으면 저장된 .mni 전체를 검증합니다. 여러 파일에 나오는 같은 step은 한 번만 검증합니다.
+    refresh=true면 판정 저장소에 있는 step도 다시 검증합니다. 마지막 줄은 {"summary": ...}입니다.
+    """
+    if window_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="window_size는 1 이상이어야 합니다."
+        )
+    upload = None
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        # 응답 스트리밍 중에는 요청 본문을 읽을 수 없으므로 먼저 임시 파일로 받아 둠
+        upload = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        windows = ndjson_windows(upload, window_size)
+    else:
+        windows = stored_windows(window_size)
+
+    async def lines():
+        try:
+            async for result in BulkVerification(use_store=not refresh).run(windows):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            if upload is not None:
+                upload.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
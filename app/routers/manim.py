@@ -1,13 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
+from datetime import datetime
+import asyncio
+import uuid
 
 from app.core.security import get_current_user
+from app.schemas.job import PipelineStage
+from app.schemas.mni import MNIFile
+from app.services.cost_model import check_admission, estimate_job
+from app.services.job_queue import job_queue
+from app.services.mni_store import save_mni
+from app.services.renderer import build_options
+from app.services.scene_compiler import SceneCompileError, scene_compiler
+from app.services.timeline import timeline_report
+from app.utils.mni_hash import HashTimeoutError, compute_hash_key, run_hashing
 
 router = APIRouter()
 
 class ManimGenerateRequest(BaseModel):
-    script: str
+    script: Optional[str] = None
+    mni: Optional[MNIFile] = None
+    preview: bool = False
 
 @router.post("/generate")
 async def generate_manim(
@@ -15,11 +29,77 @@ async def generate_manim(
     user: Dict[str, Any] = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
-    Manim 스크립트를 기반으로 시각화 생성을 요청합니다.
+    Manim 스크립트 또는 .mni를 기반으로 시각화 생성을 요청합니다.
+
+    .mni를 주면 GPT를 거치지 않고 visual 섹션을 Manim 코드로 바로 컴파일하고, 검증 단계부터 실행합니다.
+    (검증에 실패한 proof_tape는 렌더링하지 않음)
     """
-    # TODO: 실제 Manim 생성 로직 구현
+    if request.mni is None:
+        if not request.script:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="script나 mni 중 하나는 제공해야 합니다."
+            )
+        # TODO: 실제 Manim 생성 로직 구현
+        return {
+            "message": "manim queued",
+            "job_id": "dummy_job_id_12345", 
+            "status": "pending"
+        }
+    
+    mni = request.mni.model_dump(mode="json", exclude_none=True)
+    try:
+        scenes = await asyncio.to_thread(scene_compiler.compile_mni, mni, build_options(mni))
+    except SceneCompileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f".mni를 Manim 코드로 변환할 수 없습니다: {str(e)}"
+        )
+    
+    try:
+        hash_key = await run_hashing(compute_hash_key, mni)
+    except HashTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=".mni 수식이 너무 복잡해 hash_key를 계산할 수 없습니다."
+        )
+    mni.setdefault("build", {"options": {}})["hash_key"] = hash_key
+    
+    job_id = f"job_{str(uuid.uuid4())[:8]}"
+    now = datetime.now().isoformat()
+    job = {
+        "id": job_id,
+        "status": "pending",
+        "problem_image_url": None,
+        "video_url": None,
+        "mni_file_id": f"mni_{job_id}",
+        "created_at": now,
+        "updated_at": now,
+        "error_message": None,
+        "metadata": {
+            "problem_text": mni["problem"]["statement"],
+            "user_id": user.get("id"),
+            "preview": request.preview
+        }
+    }
+    retry_after = await asyncio.to_thread(check_admission, estimate_job(job, mni))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="현재 처리 대기 중인 작업이 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+    
+    await asyncio.to_thread(save_mni, job["mni_file_id"], mni)
+    await asyncio.to_thread(job_queue.submit, job, PipelineStage.VERIFY)
+    
     return {
         "message": "manim queued",
-        "job_id": "dummy_job_id_12345", 
-        "status": "pending"
+        "job_id": job_id,
+        "status": job["status"],
+        "hash_key": hash_key,
+        "estimated_render_ms": job["metadata"]["estimated_render_ms"],
+        # build.options.optimize_timeline으로 줄일 수 있는(또는 줄인) 프레임 수
+        "timeline": timeline_report((mni.get("visual") or {}).get("sections") or [], build_options(mni)),
+        "scenes": scenes
     }
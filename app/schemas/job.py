@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
 
@@ -8,6 +8,20 @@ class JobStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    RETRYING = "retrying"
+
+class PipelineStage(str, Enum):
+    INPUT = "input"
+    STRUCTURE = "structure"
+    VERIFY = "verify"
+    IR_BUILD = "ir_build"
+    RENDER = "render"
+    ASSEMBLE = "assemble"
+    UPLOAD = "upload"
+
+class FailureKind(str, Enum):
+    TRANSIENT = "transient"
+    PERMANENT = "permanent"
 
 class JobCreate(BaseModel):
     problem_image_url: Optional[str] = None
@@ -28,3 +42,15 @@ class JobResponse(BaseModel):
 class JobList(BaseModel):
     jobs: list[JobResponse]
     total: int
+
+class DeadLetterEntry(BaseModel):
+    job_id: str
+    stage: PipelineStage
+    attempts: int
+    failure_kind: FailureKind
+    error_message: str
+    failed_at: datetime
+
+class DeadLetterRequeue(BaseModel):
+    job_ids: Optional[List[str]] = None
+    stage: Optional[PipelineStage] = None
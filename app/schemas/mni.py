@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Literal, Optional, Type, Union
+from typing_extensions import Annotated, Required, TypedDict
 from enum import Enum
 
 class SchemaVersion(str, Enum):
@@ -30,6 +31,54 @@ class VisualStep(BaseModel):
     action: VisualAction
     params: Dict[str, Any] = Field(default_factory=dict)
 
+# action별 step payload (평탄한 형태와 params 형태를 합친 dict 기준, 컴파일러가 쓰지 않는 키는 무시)
+# step은 dict 그대로 다루므로 모델 인스턴스를 만들지 않는 TypedDict로 검증만 함
+class StepPayload(TypedDict, total=False):
+    id: Optional[Union[str, int]]
+    color: Optional[str]
+    wait: Optional[float]
+
+class CreateAxesPayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.CREATE_AXES]]
+    x_range: Annotated[List[float], Field(min_length=2, max_length=3)]
+    y_range: Annotated[List[float], Field(min_length=2, max_length=3)]
+
+class PlotFunctionPayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.PLOT_FUNCTION]]
+    function: str
+
+class HighlightPointPayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.HIGHLIGHT_POINT]]
+    point: Annotated[List[float], Field(min_length=2)]
+
+class CreateTexPayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.CREATE_TEX]]
+    tex: str
+
+class FadeInPayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.FADE_IN]]
+    tex: Optional[str]
+    target: Optional[str]
+
+class IndicatePayload(StepPayload, total=False):
+    action: Required[Literal[VisualAction.INDICATE]]
+    target: Optional[str]
+
+STEP_PAYLOAD_TYPES: Dict[VisualAction, Type[StepPayload]] = {
+    VisualAction.CREATE_AXES: CreateAxesPayload,
+    VisualAction.PLOT_FUNCTION: PlotFunctionPayload,
+    VisualAction.HIGHLIGHT_POINT: HighlightPointPayload,
+    VisualAction.CREATE_TEX: CreateTexPayload,
+    VisualAction.FADE_IN: FadeInPayload,
+    VisualAction.INDICATE: IndicatePayload,
+}
+
+# action 값으로 바로 해당 payload 타입을 고르는 판별 유니온
+VisualStepPayload = Annotated[
+    Union[CreateAxesPayload, PlotFunctionPayload, HighlightPointPayload, CreateTexPayload, FadeInPayload, IndicatePayload],
+    Field(discriminator="action"),
+]
+
 class VisualSection(BaseModel):
     section_name: str
     steps: List[Dict[str, Any]]
@@ -38,25 +87,75 @@ class Visual(BaseModel):
     type: str = "ManimScene"
     sections: List[VisualSection]
 
+class VerificationStatus(str, Enum):
+    PASS = "pass"
+    FAIL = "fail"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+    # 식이 같은지 확인할 수 없는 규칙의 step (vertex, solve 등)
+    SKIPPED = "skipped"
+
 class Verification(BaseModel):
     sympy: Union[str, Dict[str, Any]]
     wolfram_alpha: Optional[Dict[str, Any]] = None
 
+class PotCell(BaseModel):
+    id: Optional[str] = None
+    source: str
+    # 마지막 실행 결과와 그 결과를 만든 셀 체인 해시 (PoT 실행기가 기록)
+    outputs: Optional[Dict[str, Any]] = None
+    hash: Optional[str] = None
+
+class Pot(BaseModel):
+    lang: str = "python"
+    # MVP 문자열 셀도 허용 (PoT 실행기는 {"source": 문자열}로 취급)
+    cells: List[Union[str, PotCell]] = Field(default_factory=list)
+
+class Structure(BaseModel):
+    # 추론 트리 {nodes, edges}
+    tot: Optional[Dict[str, Any]] = None
+    pot: Optional[Pot] = None
+
 class BuildOptions(BaseModel):
     fps: int = 30
     resolution: str = "1400x800"
     theme: str = "dark"
+    # 독립적인 step을 동시에 재생하도록 타임라인 최적화 (None이면 끔, 기존 hash_key 유지)
+    optimize_timeline: Optional[bool] = None
 
 class Build(BaseModel):
     options: BuildOptions
     hash_key: Optional[str] = None
     created_at: Optional[str] = None
 
+class Metrics(BaseModel):
+    verify_pass: Optional[bool] = None
+    render_ms: Optional[int] = None
+    cache_hit: bool = False
+    stage_ms: Dict[str, float] = Field(default_factory=dict)
+    stage_cache_hit: Dict[str, bool] = Field(default_factory=dict)
+    total_ms: Optional[float] = None
+
 class MNIFile(BaseModel):
     schema_version: SchemaVersion
     problem: Problem
+    # 문자열(MVP 형식) 또는 ProofStep 객체 (pydantic 2.1의 smart 모드 union으로 검증)
     proof_tape: List[Union[str, ProofStep]]
     visual: Visual
     verification: Verification
+    structure: Optional[Structure] = None
     build: Optional[Build] = None
+    metrics: Optional[Metrics] = None
+    # Full 형식 확장 필드
+    publish: Optional[Dict[str, Any]] = None
+    i18n: Optional[Dict[str, Any]] = None
+    assets: Optional[Dict[str, Any]] = None
+    provenance: Optional[Dict[str, Any]] = None
     notes: Optional[str] = None
+
+    def compute_hash_key(self) -> str:
+        """
+        렌더링에 영향을 주는 필드만으로 build.hash_key를 계산합니다.
+        """
+        from app.utils.mni_hash import compute_hash_key
+        return compute_hash_key(self.model_dump(mode="json"))
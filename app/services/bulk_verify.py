@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import IO, Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.mni import VerificationStatus
+from app.services.mni_store import load_mni
+from app.services.step_verifier import proof_steps
+from app.services.verification_store import step_hash
+from app.services.verifier import VerificationPool, verification_pool
+
+logger = logging.getLogger("api.bulk_verify")
+
+# 한 번에 읽어 검증 워커에 보내는 .mni 파일 수
+WINDOW_SIZE = 512
+# 실행 한 번에 메모리에 두는 step 판정 수 (넘으면 오래 쓰지 않은 판정부터 버리고, 다시 나오면 판정 저장소에서 읽음)
+VERDICT_CACHE_SIZE = 100_000
+# 업로드된 NDJSON을 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+UPLOAD_SPOOL_BYTES = 64 * 1024 * 1024
+
+# (mni_file_id, .mni 내용, 읽기 오류)
+SourceItem = Tuple[str, Optional[Dict[str, Any]], Optional[str]]
+
+
+def _load_many(mni_file_ids: List[str]) -> List[SourceItem]:
+    items: List[SourceItem] = []
+    for mni_file_id in mni_file_ids:
+        try:
+            mni = load_mni(mni_file_id)
+        except ValueError as exc:
+            # 깨진 파일 하나 때문에 전체 검증이 멈추지 않도록 파일별 오류로 보고
+            items.append((mni_file_id, None, f"Invalid .mni JSON: {exc}"))
+            continue
+        if mni is not None:
+            items.append((mni_file_id, mni, None))
+    return items
+
+
+async def stored_windows(size: int = WINDOW_SIZE) -> AsyncIterator[List[SourceItem]]:
+    """
+    저장된 .mni 전체를 size개씩 읽습니다. (파일 읽기는 스레드에서)
+    """
+    if not os.path.isdir(settings.MNI_STORE_DIR):
+        return
+    names = await asyncio.to_thread(os.listdir, settings.MNI_STORE_DIR)
+    mni_file_ids = sorted(name[:-len(".mni")] for name in names if name.endswith(".mni"))
+    for i in range(0, len(mni_file_ids), size):
+        window = await asyncio.to_thread(_load_many, mni_file_ids[i:i + size])
+        if window:
+            yield window
+
+
+def _read_ndjson(file: IO[bytes], start: int, size: int) -> List[SourceItem]:
+    items: List[SourceItem] = []
+    number = start
+    while len(items) < size:
+        line = file.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            mni = json.loads(line)
+            if not isinstance(mni, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as exc:
+            items.append((f"line_{number}", None, f"Invalid .mni JSON: {exc}"))
+            continue
+        items.append((str((mni.get("problem") or {}).get("id") or f"line_{number}"), mni, None))
+    return items
+
+
+async def ndjson_windows(file: IO[bytes], size: int = WINDOW_SIZE) -> AsyncIterator[List[SourceItem]]:
+    """
+    한 줄에 .mni 하나씩 담긴 NDJSON 파일을 size개씩 읽습니다. id는 problem.id(없으면 줄 번호)입니다.
+    """
+    read = 0
+    while True:
+        window = await asyncio.to_thread(_read_ndjson, file, read, size)
+        if not window:
+            return
+        read += len(window)
+        yield window
+
+
+class BulkVerification:
+    """
+    여러 .mni의 proof_tape를 한꺼번에 다시 검증합니다.
+
+    파일을 창(window) 단위로 읽어 처음 보는 step만 검증 워커 풀에 보내고(파일 간 중복 제거),
+    이전 창의 결과를 내보내는 동안 다음 창의 검증을 진행합니다. 결과는 파일 순서대로 하나씩 반환합니다.
+    중복 제거용 판정은 최근 VERDICT_CACHE_SIZE개만 메모리에 두고, 실행이 끝나면 비웁니다.
+    """
+
+    def __init__(self, pool: VerificationPool = verification_pool, use_store: bool = True):
+        self.pool = pool
+        # False면 판정 저장소를 읽지 않고 모든 step을 다시 검증
+        self.use_store = use_store
+        self._verdicts: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self.stats: Dict[str, int] = {"files": 0, "failed_files": 0, "steps": 0, "unique_steps": 0, "cached_steps": 0}
+
+    @staticmethod
+    def _window_keys(window: List[SourceItem]) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        # 파일마다 (step 해시, step) 목록
+        return [
+            [(step_hash(step), step) for step in proof_steps((mni or {}).get("proof_tape"))]
+            for _, mni, _ in window
+        ]
+
+    def _evict(self, keep: Iterable[str]) -> None:
+        # 아직 결과를 내보내지 않은 창의 판정은 남기고 오래된 판정부터 버림
+        keep = set(keep)
+        for key in list(self._verdicts):
+            if len(self._verdicts) <= VERDICT_CACHE_SIZE:
+                break
+            if key not in keep:
+                del self._verdicts[key]
+
+    async def _dispatch(self, keys: List[List[Tuple[str, Dict[str, Any]]]]) -> None:
+        loop = asyncio.get_running_loop()
+        new: Dict[str, Dict[str, Any]] = {}
+        for key, step in (pair for pairs in keys for pair in pairs):
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+            else:
+                self._verdicts[key] = loop.create_future()
+                new[key] = step
+        if not new:
+            return
+        self.stats["unique_steps"] += len(new)
+        try:
+            results = await self.pool.verify_steps(list(new.values()), use_store=self.use_store)
+            self.stats["cached_steps"] += sum(1 for result in results if result.get("cached"))
+        except Exception as exc:
+            logger.error(f"Bulk verification batch failed: {exc}")
+            results = [{"status": VerificationStatus.ERROR.value, "error": str(exc)}] * len(new)
+        for key, result in zip(new, results):
+            self._verdicts[key].set_result(result)
+
+    async def _report(self, item: SourceItem, keys: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        mni_file_id, mni, error = item
+        self.stats["files"] += 1
+        if mni is None:
+            self.stats["failed_files"] += 1
+            return {"mni_file_id": mni_file_id, "status": VerificationStatus.ERROR.value, "error": error}
+        failed, skipped = [], 0
+        for key, step in keys:
+            result = await self._verdicts[key]
+            if result["status"] == VerificationStatus.SKIPPED.value:
+                skipped += 1
+            elif result["status"] != VerificationStatus.PASS.value:
+                failed.append({
+                    "step": step.get("step"),
+                    "rule": step.get("rule"),
+                    "status": result["status"],
+                    "error": result.get("error"),
+                })
+        self.stats["steps"] += len(keys)
+        if failed:
+            self.stats["failed_files"] += 1
+        statuses = {f["status"] for f in failed}
+        status = VerificationStatus.PASS if not failed else (
+            VerificationStatus.FAIL if VerificationStatus.FAIL.value in statuses else VerificationStatus.ERROR
+        )
+        return {
+            "mni_file_id": mni_file_id,
+            "problem_id": (mni.get("problem") or {}).get("id"),
+            "status": status.value,
+            "steps": len(keys),
+            "passed": len(keys) - len(failed) - skipped,
+            "skipped": skipped,
+            "failed": failed,
+        }
+
+    async def run(self, windows: AsyncIterator[List[SourceItem]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        파일별 결과를 순서대로 내보내고 마지막에 {"summary": ...}를 내보냅니다.
+        """
+        start = time.perf_counter()
+        previous: Optional[Tuple[asyncio.Task, List[SourceItem], List[List[Tuple[str, Dict[str, Any]]]]]] = None
+        try:
+            async for window in windows:
+                # 창 전체(파일 수백 개)의 step 해시는 이벤트 루프 밖에서 계산
+                keys = await asyncio.to_thread(self._window_keys, window)
+                task = asyncio.create_task(self._dispatch(keys))
+                if previous is not None:
+                    await previous[0]
+                    for item, item_keys in zip(previous[1], previous[2]):
+                        yield await self._report(item, item_keys)
+                    self._evict(key for pairs in keys for key, _ in pairs)
+                previous = (task, window, keys)
+            if previous is not None:
+                await previous[0]
+                for item, item_keys in zip(previous[1], previous[2]):
+                    yield await self._report(item, item_keys)
+        finally:
+            if previous is not None and not previous[0].done():
+                # 클라이언트가 연결을 끊은 경우
+                previous[0].cancel()
+            self._verdicts.clear()
+        elapsed = time.perf_counter() - start
+        yield {
+            "summary": {
+                **self.stats,
+                "deduplicated_steps": self.stats["steps"] - self.stats["unique_steps"],
+                "elapsed_sec": round(elapsed, 2),
+                "files_per_sec": round(self.stats["files"] / elapsed, 1) if elapsed else None,
+            }
+        }
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.job import JobStatus, PipelineStage
+from app.schemas.mni import VisualAction
+from app.services.job_queue import job_queue
+from app.services.keyframes import is_client_rendered
+from app.services.mni_store import load_mni
+from app.services.renderer import build_options, preview_options
+from app.services.scene_compiler import DEFAULT_AXES_RANGE, SceneCompileError, plot_segments
+from app.services.timeline import section_seconds, step_payload
+
+logger = logging.getLogger("api.cost_model")
+
+FEATURES = [
+    "intercept",
+    "sections",
+    "frames",
+    "megapixel_frames",
+    "tex_count",
+    "tex_chars",
+    "plot_points",
+    "axes_count",
+    "steps",
+]
+
+# 학습 데이터가 부족할 때 쓰는 사전 계수 (ms 단위, 로컬 Manim 렌더 기준 대략값)
+DEFAULT_COEFFICIENTS = [3000.0, 1500.0, 15.0, 8.0, 900.0, 5.0, 2.0, 300.0, 100.0]
+DEFAULT_JOB_MS = 15000.0
+MIN_SAMPLES = 20
+RIDGE = 1e-3
+
+ACTIVE_STATUSES = (JobStatus.PENDING.value, JobStatus.PROCESSING.value, JobStatus.RETRYING.value)
+
+
+def section_features(section: Dict[str, Any], options: Dict[str, Any]) -> List[float]:
+    """
+    섹션 하나의 특징 벡터 (intercept 제외 항목은 섹션끼리 더할 수 있음)
+    """
+    width, height = str(options.get("resolution", "1400x800")).lower().split("x")
+    megapixels = int(width) * int(height) / 1_000_000
+    x_range = y_range = DEFAULT_AXES_RANGE
+    tex_count = tex_chars = plot_points = axes_count = steps = 0.0
+    for step in section.get("steps") or []:
+        payload = step_payload(step)
+        action = payload.get("action")
+        steps += 1
+        tex = payload.get("tex")
+        if action == VisualAction.CREATE_TEX.value or (action == VisualAction.FADE_IN.value and tex):
+            tex_count += 1
+            tex_chars += len(str(tex or ""))
+        elif action == VisualAction.CREATE_AXES.value:
+            axes_count += 1
+            x_range = payload.get("x_range", DEFAULT_AXES_RANGE)
+            y_range = payload.get("y_range", DEFAULT_AXES_RANGE)
+        elif action == VisualAction.PLOT_FUNCTION.value:
+            try:
+                plot_points += sum(len(s) for s in plot_segments(str(payload.get("function", "x")), x_range, y_range))
+            except SceneCompileError:
+                pass
+    seconds = section_seconds(section.get("steps") or [], bool(options.get("optimize_timeline")))
+    frames = seconds * float(options.get("fps", 30))
+    return [0.0, 1.0, frames, frames * megapixels, tex_count, tex_chars, plot_points, axes_count, steps]
+
+
+def mni_features(mni: Dict[str, Any], preview: bool = False) -> List[float]:
+    options = build_options(mni)
+    if preview:
+        options = preview_options(options)
+    total = np.zeros(len(FEATURES))
+    total[0] = 1.0
+    for section in (mni.get("visual") or {}).get("sections") or []:
+        total += np.array(section_features(section, options))
+    return total.tolist()
+
+
+class RenderCostModel:
+    """
+    .mni 특징으로 렌더 시간(ms)을 예측하는 선형 모델
+
+    완료된 작업의 render 단계 측정값(캐시 적중 제외)으로 주기적으로 다시 학습합니다(릿지 최소제곱, 음수 계수는 0).
+    작업 ETA, 수용 제어(백로그 초과 시 503), 섹션 분배 순서(LPT)에 사용합니다.
+    """
+
+    def __init__(self):
+        self.coefficients = np.array(DEFAULT_COEFFICIENTS)
+        self.samples = 0
+        self.mean_ms: Optional[float] = None
+        self.mape: Optional[float] = None
+        self.fitted_at: Optional[str] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def predict(self, mni: Dict[str, Any], preview: bool = False) -> float:
+        if is_client_rendered(mni):
+            return 0.0
+        features = mni_features(mni, preview)
+        with self._lock:
+            return float(max(0.0, np.dot(self.coefficients, features)))
+
+    def predict_section(self, section: Dict[str, Any], options: Dict[str, Any]) -> float:
+        features = section_features(section, options)
+        with self._lock:
+            return float(max(0.0, np.dot(self.coefficients, features)))
+
+    def default_ms(self) -> float:
+        # .mni가 아직 없는 작업(IR 생성 전)의 예상값
+        return self.mean_ms if self.mean_ms is not None else DEFAULT_JOB_MS
+
+    def fit(self, samples: List[Tuple[List[float], float]]) -> bool:
+        """
+        (특징 벡터, 실제 render ms) 목록으로 계수를 다시 계산합니다. 표본이 부족하면 False.
+        """
+        if len(samples) < MIN_SAMPLES:
+            return False
+        X = np.array([f for f, _ in samples])
+        y = np.array([ms for _, ms in samples])
+        # 특징 스케일이 크게 다르므로 열 정규화 후 릿지
+        scale = np.maximum(np.abs(X).max(axis=0), 1e-9)
+        Xs = X / scale
+        A = Xs.T @ Xs + RIDGE * np.eye(len(FEATURES))
+        coefficients = np.clip(np.linalg.solve(A, Xs.T @ y) / scale, 0.0, None)
+        predicted = X @ coefficients
+        with self._lock:
+            self.coefficients = coefficients
+            self.samples = len(samples)
+            self.mean_ms = float(y.mean())
+            self.mape = float(np.mean(np.abs(predicted - y) / np.maximum(y, 1.0)))
+            self.fitted_at = datetime.now().isoformat()
+        return True
+
+    def training_samples(self, limit: int) -> List[Tuple[List[float], float]]:
+        samples = []
+        # 최근 완료된 작업부터
+        jobs = job_queue.list_jobs(JobStatus.COMPLETED.value)[:limit]
+        for job in jobs:
+            metadata = job.get("metadata") or {}
+            metrics = metadata.get("metrics") or {}
+            render_ms = (metrics.get("stage_ms") or {}).get(PipelineStage.RENDER.value)
+            if render_ms is None or (metrics.get("cache_hit") or {}).get(PipelineStage.RENDER.value):
+                continue
+            if metadata.get("output") == "keyframes" or not job.get("mni_file_id"):
+                continue
+            mni = load_mni(job["mni_file_id"])
+            if mni is None:
+                continue
+            samples.append((mni_features(mni, bool(metadata.get("preview"))), float(render_ms)))
+        return samples
+
+    def refit(self) -> bool:
+        start = time.perf_counter()
+        samples = self.training_samples(settings.COST_MODEL_MAX_SAMPLES)
+        fitted = self.fit(samples)
+        if fitted:
+            logger.info(f"Render cost model refit on {len(samples)} sample(s) in {time.perf_counter() - start:.2f}s, MAPE={self.mape:.3f}")
+        return fitted
+
+    async def _refit_loop(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refit)
+            except Exception as exc:
+                logger.error(f"Render cost model refit failed: {exc}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refit_loop(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "coefficients": dict(zip(FEATURES, [round(float(c), 4) for c in self.coefficients])),
+                "samples": self.samples,
+                "mean_ms": self.mean_ms,
+                "mape": self.mape,
+                "fitted_at": self.fitted_at,
+            }
+
+
+cost_model = RenderCostModel()
+
+
+def estimate_job(job: Dict[str, Any], mni: Optional[Dict[str, Any]] = None) -> float:
+    """
+    작업의 예상 렌더 시간을 계산해 metadata.estimated_render_ms에 기록합니다.
+    """
+    if mni is None and job.get("mni_file_id"):
+        mni = load_mni(job["mni_file_id"])
+    if mni is None:
+        estimate = cost_model.default_ms()
+    else:
+        estimate = cost_model.predict(mni, bool(job["metadata"].get("preview")))
+    job["metadata"]["estimated_render_ms"] = round(estimate)
+    return estimate
+
+
+def queue_backlog(exclude_job_id: Optional[str] = None, before: Optional[str] = None) -> Tuple[float, int]:
+    """
+    대기·처리 중인 작업의 예상 렌더 시간 합계와 작업을 나눠 처리하는 워커 수 (before를 주면 그보다 먼저 생성된 작업만)
+
+    작업 저장소의 집계 쿼리로 계산합니다. 워커 수는 모든 프로세스·노드에서 지금 작업을 임대 중인 워커 수이며,
+    이 프로세스가 띄운 워커 수(JOB_WORKERS, 최소 1)보다 적으면 그 값을 씁니다.
+    """
+    backlog = job_queue.backlog(list(ACTIVE_STATUSES), exclude_job_id, before)
+    total = backlog["estimated_ms"] + backlog["unestimated"] * cost_model.default_ms()
+    workers = max(int(backlog["workers"]), settings.JOB_WORKERS, 1)
+    return total, workers
+
+
+def job_eta(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    대기 중인 작업의 완료 예상 시각 (앞선 작업의 예상 시간 합 / 워커 수 + 자신의 예상 시간)
+    """
+    if job.get("status") not in ACTIVE_STATUSES:
+        return None
+    own = job["metadata"].get("estimated_render_ms")
+    if own is None:
+        own = cost_model.default_ms()
+    ahead, workers = queue_backlog(exclude_job_id=job["id"], before=job.get("created_at"))
+    eta_ms = ahead / workers + own
+    return {
+        "estimated_render_ms": round(own),
+        "queue_ahead_ms": round(ahead),
+        "eta_sec": round(eta_ms / 1000, 1),
+    }
+
+
+def check_admission(estimated_ms: float) -> Optional[float]:
+    """
+    백로그가 한도를 넘으면 다시 시도할 때까지 기다릴 초를 반환합니다. (None이면 수용)
+    """
+    limit_sec = settings.ADMISSION_MAX_BACKLOG_SEC
+    if not limit_sec:
+        return None
+    backlog_ms, workers = queue_backlog()
+    backlog_sec = (backlog_ms + estimated_ms) / workers / 1000
+    if backlog_sec <= limit_sec:
+        return None
+    return backlog_sec - limit_sec
@@ -0,0 +1,211 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import sympy as sp
+
+from app.core.config import settings
+from app.utils.expressions import PARSER_VERSION, ExpressionSyntaxError, parse_expression
+
+logger = logging.getLogger("api.expression_cache")
+
+# 파서 규칙이 바뀌면 이전 캐시 항목을 쓰지 않도록 SymPy 버전과 함께 구분
+SYMPY_VERSION = f"{sp.__version__}/p{PARSER_VERSION}"
+# 문법이 틀린 입력도 캐시 (같은 잘못된 수식을 매번 다시 파싱하지 않도록)
+# 디스크에는 입력만으로 정해지는 ExpressionSyntaxError만 저장하고, 그 밖의 오류(모듈 import 실패 등
+# 실행 환경에 따른 오류)는 프로세스 내 LRU에만 둠
+ERROR_PREFIX = "!"
+# srepr 문자열을 SymPy 식으로 되돌릴 때 쓰는 이름공간 (캐시 DB에는 서버가 만든 srepr만 저장됨)
+_SREPR_NAMESPACE = {name: getattr(sp, name) for name in dir(sp) if not name.startswith("_")}
+
+
+def _input_key(expr: str) -> str:
+    return " ".join(str(expr).split())
+
+
+def _from_srepr(text: str) -> sp.Basic:
+    return eval(text, {"__builtins__": {}}, _SREPR_NAMESPACE)
+
+
+class ExpressionCache:
+    """
+    SymPy 파싱·정규화·단순화·동치 판정 결과의 2단계 캐시
+
+    1단계는 프로세스 내 LRU(SymPy 객체를 그대로 보관), 2단계는 SQLite 파일로 프로세스·재시작 간에 공유합니다.
+    키는 (종류, 공백을 정리한 입력 문자열, SymPy 버전)이며, SymPy 버전이 바뀌면 이전 버전의 행은 처음 열 때 지웁니다.
+    디스크 쓰기는 모아서 flush합니다.
+    """
+
+    def __init__(self, path: Optional[str], memory_size: int = 8192, flush_every: int = 256):
+        self.path = path
+        self.memory_size = memory_size
+        self.flush_every = flush_every
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS expression_cache ("
+                "kind TEXT NOT NULL, version TEXT NOT NULL, input TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (kind, version, input))"
+            )
+            conn.execute("DELETE FROM expression_cache WHERE version != ?", (SYMPY_VERSION,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def open(self) -> None:
+        # 샌드박스 워커가 권한을 낮추기 전에 미리 열어 둠 (연 뒤에는 파일 권한과 관계없이 계속 사용)
+        try:
+            self._db()
+        except sqlite3.Error as exc:
+            logger.warning(f"Expression cache unavailable: {exc}")
+
+    def _lookup(
+        self,
+        kind: str,
+        text: str,
+        compute: Callable[[], Any],
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+    ) -> Any:
+        key = (kind, text)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._unwrap(entry)
+            conn = self._db()
+            row = conn.execute(
+                "SELECT value FROM expression_cache WHERE kind = ? AND version = ? AND input = ?",
+                (kind, SYMPY_VERSION, text),
+            ).fetchone() if conn is not None else None
+
+        entry = None
+        if row is not None:
+            stored = row[0]
+            try:
+                entry = ("syntax", stored[len(ERROR_PREFIX):]) if stored.startswith(ERROR_PREFIX) else ("ok", decode(stored))
+            except Exception as exc:
+                # 손상된 행은 다시 계산
+                logger.warning(f"Discarding unreadable expression cache entry {kind}:{text!r}: {exc}")
+        disk_hit = entry is not None
+        if not disk_hit:
+            try:
+                value = compute()
+                entry, stored = ("ok", value), encode(value)
+            except ExpressionSyntaxError as exc:
+                entry, stored = ("syntax", str(exc)), ERROR_PREFIX + str(exc)
+            except ValueError as exc:
+                entry, stored = ("error", str(exc)), None
+
+        with self._lock:
+            if disk_hit:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                if stored is not None:
+                    self._pending.append((kind, SYMPY_VERSION, text, stored))
+            self._memory[key] = entry
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+        return self._unwrap(entry)
+
+    @staticmethod
+    def _unwrap(entry: Tuple[str, Any]) -> Any:
+        status, value = entry
+        if status == "syntax":
+            raise ExpressionSyntaxError(value)
+        if status == "error":
+            raise ValueError(value)
+        return value
+
+    def parse(self, expr: str) -> sp.Basic:
+        text = _input_key(expr)
+        return self._lookup("parse", text, lambda: parse_expression(text), sp.srepr, _from_srepr)
+
+    def normalize(self, expr: str) -> str:
+        """
+        계산(evaluate)한 식의 정규화 문자열 (파싱할 수 없으면 ValueError)
+
+        normalize_expression(해시용, 계산하지 않음)과 달리 식을 계산하므로 샌드박스 워커 안에서만 씁니다.
+        """
+        text = _input_key(expr)
+        return self._lookup("normalize", text, lambda: sp.sstr(self.parse(text), order="lex"), str, str)
+
+    def simplify(self, expr: str) -> sp.Basic:
+        text = _input_key(expr)
+        return self._lookup("simplify", text, lambda: sp.simplify(self.parse(text)), sp.srepr, _from_srepr)
+
+    def equivalent(self, left: str, right: str) -> bool:
+        """
+        두 수식이 항등적으로 같은지 판정합니다. (simplify(left - right) == 0)
+
+        Raises:
+            ValueError: 어느 한쪽을 파싱할 수 없는 경우
+        """
+        left, right = self.normalize(left), self.normalize(right)
+        return self._lookup(
+            "equivalent",
+            f"{left} == {right}",
+            lambda: bool(sp.simplify(self.parse(left) - self.parse(right)) == 0),
+            lambda value: "1" if value else "0",
+            lambda stored: stored == "1",
+        )
+
+    def _flush_locked(self) -> None:
+        conn = self._db()
+        if conn is None or not self._pending:
+            self._pending.clear()
+            return
+        try:
+            conn.executemany("INSERT OR REPLACE INTO expression_cache (kind, version, input, value) VALUES (?, ?, ?, ?)", self._pending)
+            conn.commit()
+        except sqlite3.Error as exc:
+            # 디스크 캐시 저장 실패는 검증을 막지 않음
+            logger.warning(f"Expression cache flush failed: {exc}")
+        self._pending.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return cache_stats(self.memory_hits, self.disk_hits, self.misses, entries=len(self._memory))
+
+
+def cache_stats(memory_hits: int, disk_hits: int, misses: int, **extra: Any) -> Dict[str, Any]:
+    total = memory_hits + disk_hits + misses
+    return {
+        **extra,
+        "sympy_version": SYMPY_VERSION,
+        "memory_hits": memory_hits,
+        "disk_hits": disk_hits,
+        "misses": misses,
+        "memory_hit_rate": round(memory_hits / total, 4) if total else None,
+        "hit_rate": round((memory_hits + disk_hits) / total, 4) if total else None,
+    }
+
+
+expression_cache = ExpressionCache(settings.EXPRESSION_CACHE_PATH, settings.EXPRESSION_CACHE_MEMORY_SIZE)
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import socket
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.schemas.job import DeadLetterEntry, JobStatus, PipelineStage
+from app.services.job_store import JobStore, LeasedJob, create_job_store
+from app.services.metrics import clear_stage_metrics, stage_recorded, stage_timer, write_mni_metrics
+from app.services.retry import classify_failure, get_retry_policy
+
+logger = logging.getLogger("api.jobs")
+
+# 파이프라인 단계 실행 순서 (flow.txt 1~8단계)
+PIPELINE_STAGES: List[PipelineStage] = list(PipelineStage)
+
+StageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class JobQueue:
+    """
+    파이프라인 작업 큐
+
+    작업 상태는 공유 JobStore(SQLite WAL / Postgres)에 저장되며, 각 워커는
+    가시성 타임아웃(lease)을 걸고 작업을 한 단계씩 가져가 실행합니다.
+    실행 중에는 하트비트로 lease를 연장하고, 프로세스가 죽어 lease가 만료되면
+    다른 워커가 그 단계를 이어받습니다.
+
+    실패한 단계는 단계별 재시도 정책에 따라 available_at을 미뤄 다시 큐에 넣고,
+    재시도를 모두 소진했거나 영구적 실패로 분류된 작업은 데드레터 큐로 이동합니다.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None):
+        self._store = store
+        self._handlers: Dict[PipelineStage, StageHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self.lease_sec = float(settings.JOB_LEASE_SEC)
+        self.poll_interval = settings.JOB_POLL_INTERVAL_SEC
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = create_job_store(settings.JOB_STORE_URL)
+        return self._store
+
+    def register_handler(self, stage: PipelineStage) -> Callable[[StageHandler], StageHandler]:
+        """
+        단계 실행 함수를 등록하는 데코레이터
+        """
+        def decorator(func: StageHandler) -> StageHandler:
+            self._handlers[stage] = func
+            return func
+        return decorator
+
+    def submit(self, job: Dict[str, Any], stage: PipelineStage = PIPELINE_STAGES[0]) -> Dict[str, Any]:
+        """
+        작업을 주어진 단계부터 실행하도록 큐에 등록합니다.
+        """
+        job["status"] = JobStatus.PENDING.value
+        job["metadata"]["stage"] = stage.value
+        job["metadata"]["attempt"] = 0
+        job["metadata"].pop("next_retry_at", None)
+        clear_stage_metrics(job, PIPELINE_STAGES[PIPELINE_STAGES.index(stage):])
+        self.store.enqueue(job, stage)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_job(job_id)
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.store.list_jobs(status)
+
+    def _touch(self, job: Dict[str, Any], status: JobStatus) -> None:
+        job["status"] = status.value
+        job["updated_at"] = datetime.now().isoformat()
+
+    async def _heartbeat(self, leased: LeasedJob, task: asyncio.Task, lost: asyncio.Event) -> None:
+        """
+        실행 중인 단계의 lease를 주기적으로 연장합니다. 연장에 실패하면 실행을 중단합니다.
+        """
+        job_id = leased.job["id"]
+        while True:
+            await asyncio.sleep(self.lease_sec / 3)
+            try:
+                alive = await asyncio.to_thread(self.store.heartbeat, job_id, leased.lease_token, self.lease_sec)
+            except Exception as exc:
+                logger.warning(f"Heartbeat for job {job_id} failed: {exc}")
+                continue
+            if not alive:
+                logger.warning(f"Lease for job {job_id} lost, aborting {leased.stage.value}")
+                lost.set()
+                task.cancel()
+                return
+
+    async def _process(self, leased: LeasedJob) -> None:
+        job = leased.job
+        stage = leased.stage
+        job["metadata"]["stage"] = stage.value
+        job["metadata"]["attempt"] = leased.attempt
+        self._touch(job, JobStatus.PROCESSING)
+
+        handler = self._handlers.get(stage)
+        lost = asyncio.Event()
+        heartbeat: Optional[asyncio.Task] = None
+        # 핸들러가 없는 단계도 상태 저장을 포함한 전이 시간을 기록 (모든 단계가 stage_ms에 나타나도록)
+        # 앞 단계 핸들러가 이미 측정한 단계(렌더 중 이어 붙이기 → assemble)는 그 값을 유지
+        if handler is not None or not stage_recorded(job, stage):
+            timer = stage_timer(job, stage)
+        else:
+            timer = nullcontext()
+        try:
+            with timer:
+                await asyncio.to_thread(self.store.save_job, job)
+                if handler is not None:
+                    task = asyncio.create_task(handler(job))
+                    heartbeat = asyncio.create_task(self._heartbeat(leased, task, lost))
+                    await task
+        except asyncio.CancelledError:
+            if not lost.is_set():
+                raise
+            # lease를 잃었으므로 결과를 버립니다. 단계는 다른 워커가 다시 실행합니다.
+            return
+        except Exception as exc:
+            await self._handle_failure(leased, exc)
+            return
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+        # 다음 단계로 진행
+        index = PIPELINE_STAGES.index(stage)
+        job["error_message"] = None
+        job["metadata"].pop("next_retry_at", None)
+        next_stage = PIPELINE_STAGES[index + 1] if index + 1 < len(PIPELINE_STAGES) else None
+        if next_stage is not None:
+            job["metadata"]["stage"] = next_stage.value
+            job["metadata"]["attempt"] = 0
+            self._touch(job, JobStatus.PENDING)
+        else:
+            self._touch(job, JobStatus.COMPLETED)
+            try:
+                await asyncio.to_thread(write_mni_metrics, job)
+            except Exception as exc:
+                logger.warning(f"Failed to write metrics for job {job['id']}: {exc}")
+        if not await asyncio.to_thread(self.store.advance, job, leased.lease_token, next_stage):
+            logger.warning(f"Lease for job {job['id']} expired before {stage.value} was acknowledged")
+
+    async def _handle_failure(self, leased: LeasedJob, exc: Exception) -> None:
+        job = leased.job
+        stage = leased.stage
+        attempt = leased.attempt
+        kind = classify_failure(exc)
+        policy = get_retry_policy(stage)
+        job["error_message"] = str(exc) or exc.__class__.__name__
+
+        if policy.should_retry(attempt, kind):
+            delay = policy.compute_delay(attempt)
+            job["metadata"]["next_retry_at"] = (datetime.now() + timedelta(seconds=delay)).isoformat()
+            self._touch(job, JobStatus.RETRYING)
+            logger.warning(f"Job {job['id']} {stage.value} failed (attempt {attempt}), retrying in {delay:.1f}s: {exc}")
+            # 재시도는 available_at을 미루는 것으로 예약되며, 워커는 즉시 다른 작업을 가져갑니다.
+            await asyncio.to_thread(self.store.retry, job, leased.lease_token, delay)
+            return
+
+        job["metadata"].pop("next_retry_at", None)
+        self._touch(job, JobStatus.FAILED)
+        entry = DeadLetterEntry(
+            job_id=job["id"],
+            stage=stage,
+            attempts=attempt,
+            failure_kind=kind,
+            error_message=job["error_message"],
+            failed_at=datetime.now(),
+        )
+        await asyncio.to_thread(self.store.dead_letter, job, leased.lease_token, entry)
+        logger.error(f"Job {job['id']} moved to dead-letter queue at {stage.value} ({kind.value}): {exc}")
+
+    def backlog(
+        self,
+        statuses: List[str],
+        exclude_job_id: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> Dict[str, float]:
+        return self.store.backlog(statuses, exclude_job_id, before)
+
+    def list_dead_letters(self, stage: Optional[PipelineStage] = None) -> List[DeadLetterEntry]:
+        return self.store.list_dead_letters(stage)
+
+    def requeue_dead_letters(
+        self,
+        job_ids: Optional[List[str]] = None,
+        stage: Optional[PipelineStage] = None,
+    ) -> List[str]:
+        """
+        데드레터 큐의 작업을 실패한 단계부터 다시 실행합니다.
+
+        job_ids가 없으면 (stage 조건에 맞는) 모든 항목을 재등록합니다.
+        """
+        return self.store.requeue_dead_letters(job_ids, stage)
+
+    async def _worker(self, worker_id: str) -> None:
+        while True:
+            try:
+                leased = await asyncio.to_thread(self.store.claim, worker_id, self.lease_sec)
+            except Exception as exc:
+                logger.error(f"Worker {worker_id} failed to claim a job: {exc}")
+                leased = None
+            if leased is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await self._process(leased)
+            except Exception as exc:
+                # lease가 만료되면 다른 워커가 이어받습니다.
+                logger.error(f"Worker {worker_id} crashed on job {leased.job['id']}: {exc}", exc_info=True)
+
+    def start(self, concurrency: int = 1) -> None:
+        """
+        워커 태스크를 시작합니다. (앱 startup 이벤트에서 호출)
+
+        워커 ID는 호스트·프로세스 단위로 구분되어 여러 uvicorn 워커와 레플리카가
+        같은 저장소를 공유할 수 있습니다.
+        """
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(concurrency):
+            self._workers.append(asyncio.create_task(self._worker(f"{prefix}:{i}")))
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+
+job_queue = JobQueue()
@@ -0,0 +1,195 @@
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.schemas.mni import VisualAction
+from app.services.renderer import build_options
+from app.services.scene_compiler import DEFAULT_AXES_RANGE, SceneCompileError, plot_segments
+from app.services.timeline import PLAY_SEC, beat_wait, plan_beats, step_payload
+from app.utils.mni_hash import compute_hash_key
+
+KEYFRAME_FORMAT = "mni-keyframes"
+KEYFRAME_VERSION = 1
+
+PRECISION = 3
+
+# 객체 종류 / 애니메이션 코드 (브라우저 플레이어와 공유하는 값, 변경 시 KEYFRAME_VERSION 증가)
+KINDS = ("axes", "curve", "point", "tex")
+OPS = ("create", "write", "fade_in", "indicate")
+
+CLIENT_VISUAL_TYPES = {"ThreeJS"}
+
+
+def _round(value: float) -> float:
+    rounded = round(value, PRECISION)
+    return int(rounded) if rounded == int(rounded) else rounded
+
+
+def _range(payload: Dict[str, Any], field: str) -> List[float]:
+    value = payload.get(field, DEFAULT_AXES_RANGE)
+    try:
+        return [float(v) for v in value[:2]]
+    except (TypeError, ValueError, IndexError) as exc:
+        raise SceneCompileError(f"{field} must be [min, max]: {value!r}") from exc
+
+
+def _flatten(segments: List[List[List[float]]]) -> List[Optional[float]]:
+    # [x0, y0, x1, y1, ...] 평탄 배열, 구간 사이는 [None, None]으로 선을 끊음
+    flat: List[Optional[float]] = []
+    for i, segment in enumerate(segments):
+        if i:
+            flat += [None, None]
+        for x, y in segment:
+            flat += [_round(x), _round(y)]
+    return flat
+
+
+def _compile_section(
+    section: Dict[str, Any],
+    start: float,
+    objects: List[List[Any]],
+    optimize: bool = False,
+) -> Tuple[List[List[Any]], float]:
+    """
+    섹션 하나를 트랙 [시작(초), 길이(초), op, 객체 인덱스]로 변환합니다. 객체는 objects에 추가합니다.
+
+    같은 beat(동시에 재생하는 step 묶음)의 트랙은 시작 시각이 같습니다.
+    """
+    tracks: List[List[Any]] = []
+    names: Dict[str, int] = {}
+    x_range, y_range = DEFAULT_AXES_RANGE, DEFAULT_AXES_RANGE
+    last: Optional[int] = None
+    steps = section.get("steps") or []
+    beats = plan_beats(steps, optimize)
+    # beat별 시작 시각
+    starts: Dict[int, float] = {}
+    t = start
+    for beat in beats:
+        for i in beat:
+            starts[i] = t
+        t += PLAY_SEC + beat_wait(steps, beat, optimize)
+    end = t
+
+    def add_object(kind: str, props: Dict[str, Any], name: str) -> int:
+        objects.append([KINDS.index(kind), props])
+        names[name] = len(objects) - 1
+        return len(objects) - 1
+
+    for i, step in enumerate(steps):
+        t = starts[i]
+        payload = step_payload(step)
+        try:
+            action = VisualAction(payload.get("action"))
+        except ValueError as exc:
+            raise SceneCompileError(f"Unsupported visual action: {payload.get('action')}") from exc
+        name = str(payload.get("id") or f"step_{i}")
+        color = str(payload.get("color", "WHITE")).lower()
+
+        if action == VisualAction.CREATE_AXES:
+            x_range, y_range = _range(payload, "x_range"), _range(payload, "y_range")
+            last = add_object("axes", {"x": x_range, "y": y_range}, name)
+            tracks.append([t, PLAY_SEC, OPS.index("create"), last])
+        elif action == VisualAction.PLOT_FUNCTION:
+            points = _flatten(plot_segments(str(payload.get("function", "x")), x_range, y_range))
+            last = add_object("curve", {"c": color, "p": points}, name)
+            tracks.append([t, PLAY_SEC, OPS.index("create"), last])
+        elif action == VisualAction.HIGHLIGHT_POINT:
+            point = payload.get("point", [0, 0])
+            try:
+                xy = [_round(float(point[0])), _round(float(point[1]))]
+            except (TypeError, ValueError, IndexError) as exc:
+                raise SceneCompileError(f"point must be [x, y]: {point!r}") from exc
+            last = add_object("point", {"c": color, "p": xy}, name)
+            tracks.append([t, PLAY_SEC, OPS.index("fade_in"), last])
+            tracks.append([t, PLAY_SEC, OPS.index("indicate"), last])
+        elif action == VisualAction.CREATE_TEX:
+            last = add_object("tex", {"tex": str(payload.get("tex", ""))}, name)
+            tracks.append([t, PLAY_SEC, OPS.index("write"), last])
+        else:
+            target = payload.get("target")
+            if action == VisualAction.FADE_IN and payload.get("tex"):
+                last = add_object("tex", {"tex": str(payload["tex"])}, name)
+            elif target:
+                if str(target) not in names:
+                    raise SceneCompileError(f"Unknown target: {target!r}")
+                last = names[str(target)]
+            if last is None:
+                raise SceneCompileError(f"{action.value} has no object to animate")
+            op = "fade_in" if action == VisualAction.FADE_IN else "indicate"
+            tracks.append([t, PLAY_SEC, OPS.index(op), last])
+    return tracks, end
+
+
+def compile_keyframes(mni: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    visual.sections를 브라우저에서 재생할 키프레임 타임라인(JSON)으로 변환합니다.
+
+    서버에서 영상을 렌더링·인코딩하지 않으며, 객체 정의와 트랙을 짧은 배열로 담아 gzip 압축이 잘 되도록 만듭니다.
+    """
+    options = build_options(mni)
+    objects: List[List[Any]] = []
+    sections = []
+    t = 0.0
+    for section in (mni.get("visual") or {}).get("sections") or []:
+        first = len(objects)
+        tracks, end = _compile_section(section, t, objects, bool(options.get("optimize_timeline")))
+        sections.append({
+            "name": section.get("section_name"),
+            "start": _round(t),
+            "end": _round(end),
+            # 섹션이 끝나면 섹션의 객체를 화면에서 지움 (Manim 섹션 영상을 이어 붙인 것과 같은 동작)
+            "objects": [first, len(objects)],
+            "tracks": [[_round(a), _round(b), op, obj] for a, b, op, obj in tracks],
+        })
+        t = end
+    return {
+        "format": KEYFRAME_FORMAT,
+        "version": KEYFRAME_VERSION,
+        "hash_key": compute_hash_key(mni),
+        "duration": _round(t),
+        "theme": options.get("theme", "dark"),
+        "resolution": options.get("resolution"),
+        "kinds": list(KINDS),
+        "ops": list(OPS),
+        "objects": objects,
+        "sections": sections,
+    }
+
+
+class KeyframeCache:
+    """
+    hash_key → 직렬화된(그리고 gzip 압축된) 타임라인 LRU 캐시
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, mni: Dict[str, Any]) -> Tuple[str, bytes, bytes]:
+        """
+        Returns:
+            Tuple[str, bytes, bytes]: (hash_key, JSON 바이트, gzip 바이트)
+        """
+        hash_key = compute_hash_key(mni)
+        with self._lock:
+            entry = self._entries.get(hash_key)
+            if entry is not None:
+                self._entries.move_to_end(hash_key)
+                return (hash_key,) + entry
+        body = json.dumps(compile_keyframes(mni), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = (body, gzip.compress(body, compresslevel=9, mtime=0))
+        with self._lock:
+            self._entries[hash_key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return (hash_key,) + entry
+
+
+keyframe_cache = KeyframeCache()
+
+
+def is_client_rendered(mni: Dict[str, Any]) -> bool:
+    return (mni.get("visual") or {}).get("type") in CLIENT_VISUAL_TYPES
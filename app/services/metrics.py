@@ -0,0 +1,204 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.schemas.job import PipelineStage
+from app.services.mni_store import load_mni, save_mni
+
+# 히스토그램 버킷 상한 (ms). 마지막 버킷은 +Inf
+HISTOGRAM_BUCKETS_MS: List[float] = [
+    1, 5, 10, 25, 50, 100, 250, 500,
+    1_000, 2_500, 5_000, 10_000, 30_000, 60_000, 120_000, 300_000, 600_000,
+]
+
+
+class Histogram:
+    """
+    고정 버킷 지연시간 히스토그램
+    """
+
+    def __init__(self, buckets: List[float] = HISTOGRAM_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        버킷 상한 기준의 근사 분위수를 반환합니다.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else None,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                **{f"le_{int(b)}": self.counts[i] for i, b in enumerate(self.buckets)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class StageMetrics:
+    """
+    단계별 처리 시간·캐시 적중 집계 (프로세스 단위)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.failures: Dict[str, int] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_lookups: Dict[str, int] = {}
+
+    def observe(self, stage: str, elapsed_ms: float, ok: bool = True) -> None:
+        with self._lock:
+            self.histograms.setdefault(stage, Histogram()).observe(elapsed_ms)
+            if not ok:
+                self.failures[stage] = self.failures.get(stage, 0) + 1
+
+    def observe_cache(self, stage: str, hit: bool) -> None:
+        with self._lock:
+            self.cache_lookups[stage] = self.cache_lookups.get(stage, 0) + 1
+            if hit:
+                self.cache_hits[stage] = self.cache_hits.get(stage, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for stage in set(self.histograms) | set(self.cache_lookups):
+                lookups = self.cache_lookups.get(stage, 0)
+                hits = self.cache_hits.get(stage, 0)
+                stages[stage] = {
+                    "latency": self.histograms[stage].snapshot() if stage in self.histograms else None,
+                    "failures": self.failures.get(stage, 0),
+                    "cache": {
+                        "lookups": lookups,
+                        "hits": hits,
+                        "hit_rate": round(hits / lookups, 4) if lookups else None,
+                    },
+                }
+            return stages
+
+
+stage_metrics = StageMetrics()
+
+
+def _job_metrics(job: Dict[str, Any]) -> Dict[str, Any]:
+    return job.setdefault("metadata", {}).setdefault("metrics", {"stage_ms": {}, "cache_hit": {}})
+
+
+@contextmanager
+def stage_timer(job: Dict[str, Any], stage: PipelineStage) -> Iterator[None]:
+    """
+    단계 실행 시간을 고해상도 타이머로 측정해 작업 메타데이터와 집계 히스토그램에 기록합니다.
+
+    async 코드에서도 `with stage_timer(job, stage): await ...` 형태로 사용할 수 있습니다.
+    """
+    metrics = _job_metrics(job)
+    before = dict(metrics["stage_ms"])
+    start = time.perf_counter_ns()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+        # 안에서 따로 측정한 단계(렌더 중 이어 붙이기 등)는 빼서 total_ms에 두 번 더해지지 않도록 함
+        elapsed_ms -= sum(
+            ms - before.get(name, 0.0)
+            for name, ms in metrics["stage_ms"].items()
+            if name != stage.value and ms != before.get(name)
+        )
+        metrics["stage_ms"][stage.value] = round(elapsed_ms, 3)
+        metrics["total_ms"] = round(sum(metrics["stage_ms"].values()), 3)
+        stage_metrics.observe(stage.value, elapsed_ms, ok)
+
+
+def stage_recorded(job: Dict[str, Any], stage: PipelineStage) -> bool:
+    """
+    이번 실행에서 단계 시간이 이미 기록되었는지 (예: 렌더 단계 안에서 측정한 이어 붙이기)
+    """
+    return stage.value in _job_metrics(job)["stage_ms"]
+
+
+def clear_stage_metrics(job: Dict[str, Any], stages: List[PipelineStage]) -> None:
+    """
+    다시 실행할 단계의 이전 측정값을 지웁니다.
+    """
+    metrics = job.get("metadata", {}).get("metrics")
+    if not metrics:
+        return
+    for stage in stages:
+        metrics["stage_ms"].pop(stage.value, None)
+        metrics["cache_hit"].pop(stage.value, None)
+    metrics["total_ms"] = round(sum(metrics["stage_ms"].values()), 3)
+
+
+def mark_cache_hit(job: Dict[str, Any], stage: PipelineStage, hit: bool) -> None:
+    """
+    단계가 캐시로 처리되었는지 기록합니다.
+    """
+    _job_metrics(job)["cache_hit"][stage.value] = hit
+    stage_metrics.observe_cache(stage.value, hit)
+
+
+def mark_verify_pass(job: Dict[str, Any], passed: bool) -> None:
+    _job_metrics(job)["verify_pass"] = passed
+
+
+def build_mni_metrics(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    작업 메타데이터에 쌓인 측정값을 .mni `metrics` 블록 형태로 변환합니다.
+    """
+    metrics = job.get("metadata", {}).get("metrics") or {}
+    stage_ms = metrics.get("stage_ms", {})
+    cache_hit = metrics.get("cache_hit", {})
+    render_ms = stage_ms.get(PipelineStage.RENDER.value)
+    return {
+        "verify_pass": metrics.get("verify_pass"),
+        "render_ms": int(round(render_ms)) if render_ms is not None else None,
+        "cache_hit": cache_hit.get(PipelineStage.RENDER.value, False),
+        "stage_ms": stage_ms,
+        "stage_cache_hit": cache_hit,
+        "total_ms": metrics.get("total_ms"),
+    }
+
+
+def write_mni_metrics(job: Dict[str, Any]) -> bool:
+    """
+    작업의 측정값을 저장된 .mni 파일의 `metrics` 블록에 기록합니다.
+    """
+    mni_file_id = job.get("mni_file_id")
+    mni = load_mni(mni_file_id) if mni_file_id else None
+    if mni is None:
+        return False
+    mni["metrics"] = build_mni_metrics(job)
+    save_mni(mni_file_id, mni)
+    return True
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import msgpack
+
+from app.core.config import settings
+
+logger = logging.getLogger("api.mni_binary")
+
+# 바이너리 .mni: MAGIC(4) + 사전 id(8) + MessagePack의 CRC32(4) + raw deflate(MessagePack)
+# (zlib 형식은 미리 정의 사전을 쓸 때 압축 해제 준비 비용이 커서 헤더와 체크섬을 직접 둠)
+MAGIC = b"MNI\x01"
+NO_DICTIONARY = b"\x00" * 8
+HEADER = struct.Struct(">4s8sI")
+WBITS = -15
+MNI_BINARY_MEDIA_TYPE = "application/x-mni-binary"
+# zlib 창 크기보다 긴 사전은 앞부분이 쓰이지 않음
+DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+# 사전에 넣을 값 조각의 최대 길이 (긴 값은 파일마다 달라 효과가 적음)
+MAX_FRAGMENT_BYTES = 256
+
+
+def is_binary_mni(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _fragments(value: Any, found: set) -> None:
+    # MessagePack으로 인코딩했을 때 그대로 나오는 조각 (키, 키+짧은 값, 짧은 문자열 값)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            packed_key = msgpack.packb(key)
+            found.add(packed_key)
+            if isinstance(item, (dict, list)):
+                _fragments(item, found)
+                continue
+            packed = msgpack.packb(item)
+            if len(packed) <= MAX_FRAGMENT_BYTES:
+                found.add(packed_key + packed)
+                if isinstance(item, str):
+                    found.add(packed)
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                _fragments(item, found)
+            elif isinstance(item, str):
+                packed = msgpack.packb(item)
+                if len(packed) <= MAX_FRAGMENT_BYTES:
+                    found.add(packed)
+
+
+def train_dictionary(samples: Iterable[Dict[str, Any]], size: int = DICTIONARY_SIZE) -> Tuple[bytes, int]:
+    """
+    .mni 표본에서 zlib 미리 정의 사전을 만들고 (사전, 표본 수)를 반환합니다.
+
+    두 개 이상의 파일에 나오는 조각(키 이름, action·rule 이름, 자주 쓰는 옵션 값 등)을
+    (파일 수 × 길이) 순으로 골라 담습니다. zlib는 사전 끝에 가까운 조각을 더 짧게 참조하므로
+    가장 자주 나오는 조각을 끝에 둡니다.
+    """
+    counts: Counter = Counter()
+    total = 0
+    for sample in samples:
+        found: set = set()
+        _fragments(sample, found)
+        counts.update(found)
+        total += 1
+    ranked = sorted(
+        (fragment for fragment, count in counts.items() if count >= 2 or total < 2),
+        key=lambda fragment: (counts[fragment] * len(fragment), fragment),
+        reverse=True,
+    )
+    chosen, used = [], 0
+    for fragment in ranked:
+        if used + len(fragment) > size:
+            continue
+        chosen.append(fragment)
+        used += len(fragment)
+    return b"".join(reversed(chosen)), total
+
+
+def dictionary_id(dictionary: bytes) -> bytes:
+    return hashlib.sha256(dictionary).digest()[:8]
+
+
+class MniDictionaryStore:
+    """
+    zlib 미리 정의 사전 저장소
+
+    사전은 id(내용 해시)별 파일로 보관하고 지우지 않으므로, 새 사전을 학습한 뒤에도
+    이전 사전으로 인코딩한 .mni를 읽을 수 있습니다. 새로 인코딩할 때는 current 파일이 가리키는 사전을 씁니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._dictionaries: Dict[bytes, bytes] = {NO_DICTIONARY: b""}
+        self._current: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def _path(self, dict_id: bytes) -> str:
+        return os.path.join(self.root, f"{dict_id.hex()}.zdict")
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def get(self, dict_id: bytes) -> bytes:
+        """
+        Raises:
+            ValueError: 저장소에 없는 사전인 경우
+        """
+        with self._lock:
+            dictionary = self._dictionaries.get(dict_id)
+            if dictionary is None:
+                try:
+                    with open(self._path(dict_id), "rb") as f:
+                        dictionary = f.read()
+                except FileNotFoundError:
+                    raise ValueError(f"Unknown .mni dictionary: {dict_id.hex()}") from None
+                self._dictionaries[dict_id] = dictionary
+            return dictionary
+
+    def current(self) -> Tuple[bytes, bytes]:
+        """
+        새로 인코딩할 때 쓰는 (사전 id, 사전). 학습한 사전이 없으면 사전 없이 압축합니다.
+        """
+        if self._current is None:
+            try:
+                with open(os.path.join(self.root, "current"), "r", encoding="utf-8") as f:
+                    self._current = bytes.fromhex(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                self._current = NO_DICTIONARY
+        try:
+            return self._current, self.get(self._current)
+        except ValueError:
+            logger.warning(f"Current .mni dictionary {self._current.hex()} is missing, compressing without it")
+            self._current = NO_DICTIONARY
+            return NO_DICTIONARY, b""
+
+    def install(self, dictionary: bytes) -> bytes:
+        """
+        사전을 저장하고 이후 인코딩에 쓰도록 지정한 뒤 id를 반환합니다.
+        """
+        dict_id = dictionary_id(dictionary)
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            self._write(self._path(dict_id), dictionary)
+            self._write(os.path.join(self.root, "current"), dict_id.hex().encode("ascii"))
+            self._dictionaries[dict_id] = dictionary
+            self._current = dict_id
+        return dict_id
+
+
+mni_dictionaries = MniDictionaryStore(settings.MNI_DICTIONARY_DIR)
+
+
+def encode_mni_binary(mni: Dict[str, Any]) -> bytes:
+    """
+    .mni를 MessagePack으로 인코딩하고 현재 사전으로 압축합니다.
+    """
+    dict_id, dictionary = mni_dictionaries.current()
+    if dictionary:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, WBITS)
+    packed = msgpack.packb(mni, use_bin_type=True)
+    return HEADER.pack(MAGIC, dict_id, zlib.crc32(packed)) + compressor.compress(packed) + compressor.flush()
+
+
+def decode_mni_binary(data: bytes) -> Dict[str, Any]:
+    """
+    encode_mni_binary로 만든 바이트를 .mni dict로 되돌립니다.
+
+    Raises:
+        ValueError: 바이너리 .mni가 아니거나 손상된 경우, 사전을 찾을 수 없는 경우
+    """
+    if len(data) < HEADER.size or not is_binary_mni(data):
+        raise ValueError("Not a binary .mni")
+    _, dict_id, checksum = HEADER.unpack_from(data)
+    dictionary = mni_dictionaries.get(dict_id)
+    try:
+        decompressor = zlib.decompressobj(WBITS, zdict=dictionary) if dictionary else zlib.decompressobj(WBITS)
+        packed = decompressor.decompress(data[HEADER.size:]) + decompressor.flush()
+        if zlib.crc32(packed) != checksum:
+            raise ValueError("checksum mismatch")
+        mni = msgpack.unpackb(packed, raw=False)
+    except (zlib.error, ValueError) as exc:
+        raise ValueError(f"Invalid binary .mni: {exc}") from exc
+    if not isinstance(mni, dict):
+        raise ValueError("Invalid binary .mni: expected a map")
+    return mni
@@ -0,0 +1,170 @@
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+
+from app.schemas.mni import MNIFile, VisualStepPayload
+from app.services.mni_binary import MNI_BINARY_MEDIA_TYPE, encode_mni_binary, mni_dictionaries, train_dictionary
+from app.services.mni_store import iter_mni, load_mni, mni_version
+from app.services.timeline import step_payload
+
+# core schema와 validator는 모듈을 불러올 때 한 번만 만듦
+_MNI_ADAPTER = TypeAdapter(MNIFile)
+# 섹션의 step 전체를 한 번에 검증 (action 판별과 action별 검증은 pydantic-core 안에서 처리)
+_STEPS_ADAPTER = TypeAdapter(List[VisualStepPayload])
+MAX_REPORTED_ERRORS = 20
+JSON_MEDIA_TYPE = "application/json"
+
+
+class MniValidationError(ValueError):
+    """
+    .mni 검증 오류. errors는 [{"loc": [...], "msg": ...}] 형식입니다.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors[:MAX_REPORTED_ERRORS]
+        super().__init__("; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in self.errors))
+
+
+def _errors(exc: ValidationError, prefix: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+    return [{"loc": [*prefix, *e["loc"]], "msg": e["msg"]} for e in exc.errors()]
+
+
+def validate_mni(data: Union[bytes, str, Dict[str, Any]]) -> MNIFile:
+    """
+    .mni를 검증합니다. 바이트/문자열은 먼저 JSON으로 파싱합니다.
+    (현재 pydantic-core의 validate_json은 proof_tape 유니온이 길면 json.loads + validate_python보다 느림)
+
+    MNIFile은 visual step을 Dict로만 받으므로, 섹션마다 step을 action별 payload 모델로 한 번 더 검증합니다.
+
+    Raises:
+        MniValidationError: 스키마나 step payload가 올바르지 않은 경우
+    """
+    if isinstance(data, (bytes, str)):
+        try:
+            data = json.loads(data)
+        except ValueError as exc:
+            raise MniValidationError([{"loc": [], "msg": f"Invalid JSON: {exc}"}]) from exc
+    try:
+        mni = _MNI_ADAPTER.validate_python(data)
+    except ValidationError as exc:
+        raise MniValidationError(_errors(exc)) from exc
+
+    errors: List[Dict[str, Any]] = []
+    for i, section in enumerate(mni.visual.sections):
+        try:
+            _STEPS_ADAPTER.validate_python([step_payload(step) for step in section.steps])
+        except ValidationError as exc:
+            errors.extend(_errors(exc, ("visual", "sections", i, "steps")))
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+    if errors:
+        raise MniValidationError(errors)
+    return mni
+
+
+def dump_mni(mni: Dict[str, Any]) -> bytes:
+    """
+    .mni를 JSON 바이트로 직렬화합니다. (pydantic-core 직렬화기, UTF-8 그대로)
+    """
+    return to_json(mni)
+
+
+# 응답 형식별 인코더
+MNI_ENCODERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    JSON_MEDIA_TYPE: dump_mni,
+    MNI_BINARY_MEDIA_TYPE: encode_mni_binary,
+}
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Accept 헤더에서 지원하는 .mni 형식 중 q 값이 가장 높은 것을 고릅니다. (없으면 JSON)
+    """
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type.lower() in MNI_ENCODERS and q > best_q:
+            best, best_q = media_type.lower(), q
+    return best
+
+
+def train_mni_dictionary(max_files: int = 2000) -> Dict[str, Any]:
+    """
+    저장된 .mni로 바이너리 형식의 압축 사전을 학습해 이후 인코딩에 적용하고,
+    학습에 쓴 파일 기준 JSON/바이너리 크기를 반환합니다.
+    """
+    samples = [mni for _, mni in itertools.islice(iter_mni(), max_files)]
+    dictionary, count = train_dictionary(samples)
+    dictionary_id = mni_dictionaries.install(dictionary)
+    json_bytes = sum(len(dump_mni(mni)) for mni in samples)
+    binary_bytes = sum(len(encode_mni_binary(mni)) for mni in samples)
+    return {
+        "dictionary_id": dictionary_id.hex(),
+        "dictionary_bytes": len(dictionary),
+        "samples": count,
+        "json_bytes": json_bytes,
+        "binary_bytes": binary_bytes,
+        "ratio": round(json_bytes / binary_bytes, 2) if binary_bytes else None,
+    }
+
+
+class MniBytesCache:
+    """
+    (mni_file_id, 파일 버전, variant, 형식) → 직렬화된 .mni 바이트 LRU 캐시
+
+    파일이 다시 저장되면 버전이 바뀌므로 따로 무효화할 필요가 없습니다.
+    variant는 같은 파일에 요청마다 덧붙이는 값(작업 metrics 등)을 구분합니다.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Any, str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        mni_file_id: str,
+        prepare: Callable[[Dict[str, Any]], Dict[str, Any]],
+        variant: str = "",
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> Optional[bytes]:
+        """
+        저장된 .mni에 prepare를 적용해 media_type 형식으로 직렬화한 바이트를 반환합니다. 파일이 없으면 None을 반환합니다.
+        """
+        version = mni_version(mni_file_id)
+        if version is None:
+            return None
+        key = (mni_file_id, version, variant, media_type)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+        mni = load_mni(mni_file_id)
+        if mni is None:
+            return None
+        body = MNI_ENCODERS[media_type](prepare(mni))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = body
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+
+mni_bytes_cache = MniBytesCache()
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import time
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.mni_store import decode_mni, encode_mni, write_mni_file
+from app.services.render_workers import WarmWorkerPool, serve_tasks
+from app.utils.mni_migrate import MIGRATION_VERSION, migrate_mni
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경
+    fcntl = None
+
+logger = logging.getLogger("api.mni_migration")
+
+# 워커 하나에 한 번에 보내는 파일 수
+MIGRATION_BATCH_FILES = 64
+MIGRATION_BATCH_TIMEOUT_SEC = 300
+MIGRATION_WORKER_MAX_TASKS = 1000
+
+# 체크포인트에 완료로 기록하는 상태 (error는 다음 실행에서 다시 시도)
+_DONE_STATUSES = ("migrated", "unchanged", "skipped")
+
+# 이 프로세스가 잡고 있는 체크포인트 락 (fcntl이 없는 환경에서도 프로세스 안의 중복 실행은 막음)
+_local_locks: Set[str] = set()
+
+# (mni_file_id, 경로, 체크포인트에 기록된 sha256)
+MigrationTask = Tuple[str, str, Optional[str]]
+
+
+def _stat_version(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def migrate_file(path: str, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    .mni 파일 하나를 Full 형식으로 바꿔 같은 형식(MNI_STORE_FORMAT)으로 다시 씁니다.
+
+    파일 해시가 체크포인트의 해시와 같으면 읽지 않고 건너뛰고, 변환해도 바뀌는 것이 없으면 쓰지 않습니다.
+    읽은 뒤 다른 곳에서 파일을 저장했으면 덮어쓰지 않고 오류로 반환합니다. (다음 실행에서 다시 변환)
+    """
+    before = _stat_version(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == expected_sha256:
+        return {"status": "skipped", "sha256": digest}
+    mni = decode_mni(data)
+    if not isinstance(mni, dict):
+        raise ValueError("A .mni file must be a JSON object")
+    migrated = migrate_mni(mni)
+    if migrated == mni:
+        return {"status": "unchanged", "sha256": digest}
+    encoded = encode_mni(migrated)
+    if _stat_version(path) != before:
+        return {"status": "error", "sha256": None, "error": "Modified during migration"}
+    write_mni_file(path, encoded)
+    return {"status": "migrated", "sha256": hashlib.sha256(encoded).hexdigest(), "from": mni.get("schema_version")}
+
+
+def run_migration_batch(tasks: List[MigrationTask]) -> List[Dict[str, Any]]:
+    results = []
+    for mni_file_id, path, expected in tasks:
+        try:
+            result = migrate_file(path, expected)
+        except FileNotFoundError:
+            result = {"status": "error", "sha256": None, "error": "Not found"}
+        except (OSError, ValueError) as exc:
+            # 깨진 파일 하나 때문에 배치 전체가 멈추지 않도록 파일별 오류로 보고
+            result = {"status": "error", "sha256": None, "error": str(exc)}
+        results.append({"mni_file_id": mni_file_id, **result})
+    return results
+
+
+def _migration_worker_main(conn, spawned_at: float, max_tasks: int, max_rss_mb: int) -> None:
+    """
+    .mni 변환 워커 프로세스 본체
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def run_task(kind: str, args: tuple) -> Any:
+        if kind == "migrate":
+            return run_migration_batch(*args)
+        raise ValueError(f"Unknown migration worker task: {kind}")
+
+    serve_tasks(conn, spawned_at, [], run_task, max_tasks, max_rss_mb)
+
+
+class MigrationCheckpoint:
+    """
+    변환을 마친 파일과 그때의 파일 해시를 JSONL로 기록합니다.
+
+    배치가 끝날 때마다 한 줄씩 덧붙이고 fsync하므로, 중간에 멈춰도 다시 실행하면 남은 파일부터 이어서 변환합니다.
+    다른 MIGRATION_VERSION으로 기록한 줄은 무시합니다. (규칙이 바뀌면 모든 파일을 다시 확인)
+    같은 체크포인트에 두 변환이 동시에 기록하지 않도록 acquire()로 "{체크포인트}.lock" 파일에 배타 락을 겁니다.
+    (다른 API 워커 프로세스의 변환과도 겹치지 않음)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, str] = {}
+        self._lock_file: Optional[IO[str]] = None
+
+    def acquire(self) -> bool:
+        """
+        체크포인트 락을 겁니다. 다른 변환이 이미 락을 잡고 있으면 기다리지 않고 False를 반환합니다.
+        """
+        if self._lock_file is not None:
+            return False
+        lock_path = self.path + ".lock"
+        if lock_path in _local_locks:
+            return False
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        f = open(lock_path, "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                return False
+        _local_locks.add(lock_path)
+        self._lock_file = f
+        return True
+
+    def release(self) -> None:
+        if self._lock_file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+        _local_locks.discard(self.path + ".lock")
+        self._lock_file = None
+
+    def load(self) -> None:
+        self.done = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 기록 도중 멈춘 마지막 줄
+                        continue
+                    if entry.get("version") == MIGRATION_VERSION and entry.get("status") in _DONE_STATUSES:
+                        self.done[entry["mni_file_id"]] = entry["sha256"]
+        except FileNotFoundError:
+            pass
+
+    def record(self, results: List[Dict[str, Any]]) -> None:
+        lines = [
+            json.dumps({
+                "mni_file_id": result["mni_file_id"],
+                "sha256": result["sha256"],
+                "status": result["status"],
+                "version": MIGRATION_VERSION,
+            }) + "\n"
+            for result in results
+            if result["status"] in _DONE_STATUSES
+        ]
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        for result in results:
+            if result["status"] in _DONE_STATUSES:
+                self.done[result["mni_file_id"]] = result["sha256"]
+
+    def reset(self) -> None:
+        self.done = {}
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class MniMigration:
+    """
+    .mni 저장소 전체를 MVP → Full 형식으로 일괄 변환합니다.
+
+    파일 목록만 부모 프로세스에서 나누고, 읽기·변환·쓰기는 변환 워커 프로세스(WarmWorkerPool 재사용)에서
+    배치 단위로 실행하므로 파일 내용이 API 프로세스를 거치지 않습니다. 워커 수의 두 배까지 배치를 미리 보내고
+    끝난 배치 순서대로 결과를 내보냅니다.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        batch_size: int = MIGRATION_BATCH_FILES,
+    ):
+        self.directory = directory or settings.MNI_STORE_DIR
+        self.checkpoint = MigrationCheckpoint(checkpoint_path or settings.MNI_MIGRATION_CHECKPOINT)
+        self.workers = workers or settings.MNI_MIGRATION_WORKERS or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.stats: Dict[str, int] = {"files": 0, "migrated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+
+    def _tasks(self) -> List[MigrationTask]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(".mni"))
+        return [
+            (name[:-len(".mni")], os.path.join(self.directory, name), self.checkpoint.done.get(name[:-len(".mni")]))
+            for name in names
+        ]
+
+    async def _migrate_batch(self, pool: WarmWorkerPool, batch: List[MigrationTask]) -> List[Dict[str, Any]]:
+        try:
+            return await pool.call("migrate", (batch,), MIGRATION_BATCH_TIMEOUT_SEC)
+        except Exception as exc:
+            # 타임아웃·워커 크래시: 배치의 파일은 완료로 기록하지 않으므로 다음 실행에서 다시 시도
+            logger.error(f"Migration batch failed: {exc}")
+            return [{"mni_file_id": mni_file_id, "status": "error", "sha256": None, "error": str(exc)} for mni_file_id, _, _ in batch]
+
+    async def _finish(self, task: asyncio.Task) -> List[Dict[str, Any]]:
+        results = task.result()
+        await asyncio.to_thread(self.checkpoint.record, results)
+        for result in results:
+            self.stats["files"] += 1
+            self.stats["errors" if result["status"] == "error" else result["status"]] += 1
+        return results
+
+    async def run(self, restart: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        파일별 결과를 배치가 끝나는 대로 내보내고 마지막에 {"summary": ...}를 내보냅니다.
+        restart=True면 체크포인트를 지우고 모든 파일을 다시 확인합니다.
+        """
+        start = time.perf_counter()
+        if restart:
+            await asyncio.to_thread(self.checkpoint.reset)
+        else:
+            await asyncio.to_thread(self.checkpoint.load)
+        tasks = await asyncio.to_thread(self._tasks)
+        pool = WarmWorkerPool(
+            min(self.workers, max(1, -(-len(tasks) // self.batch_size))),
+            MIGRATION_WORKER_MAX_TASKS,
+            0,
+            target=_migration_worker_main,
+            label="migration",
+        )
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            for i in range(0, len(tasks), self.batch_size):
+                in_flight.add(asyncio.create_task(self._migrate_batch(pool, tasks[i:i + self.batch_size])))
+                if len(in_flight) < pool.size * 2:
+                    continue
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for result in await self._finish(task):
+                        yield result
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for result in await self._finish(task):
+                        yield result
+        finally:
+            # 클라이언트가 연결을 끊은 경우 남은 배치는 취소 (체크포인트에 없으므로 다음 실행에서 이어서 진행)
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            await asyncio.to_thread(pool.shutdown)
+        elapsed = time.perf_counter() - start
+        yield {
+            "summary": {
+                **self.stats,
+                "elapsed_sec": round(elapsed, 2),
+                "files_per_sec": round(self.stats["files"] / elapsed, 1) if elapsed else None,
+            }
+        }
+
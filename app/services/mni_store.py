@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.services.mni_binary import MAGIC, decode_mni_binary, encode_mni_binary, is_binary_mni
+from app.utils.mni_stream import MniElement, aiter_mni_elements, mni_elements
+
+# .mni를 스트리밍으로 읽을 때 한 번에 읽는 크기
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def _path(mni_file_id: str) -> str:
+    if not mni_file_id or "/" in mni_file_id or "\\" in mni_file_id or mni_file_id.startswith("."):
+        raise ValueError(f"Invalid mni_file_id: {mni_file_id}")
+    return os.path.join(settings.MNI_STORE_DIR, f"{mni_file_id}.mni")
+
+
+def decode_mni(data: bytes) -> Dict[str, Any]:
+    """
+    .mni 바이트를 dict로 읽습니다. JSON과 바이너리 형식은 앞부분으로 판별합니다.
+
+    Raises:
+        ValueError: 올바른 .mni가 아닌 경우
+    """
+    if is_binary_mni(data):
+        return decode_mni_binary(data)
+    return json.loads(data)
+
+
+def encode_mni(content: Dict[str, Any]) -> bytes:
+    """
+    MNI_STORE_FORMAT 형식으로 .mni를 인코딩합니다.
+    """
+    if settings.MNI_STORE_FORMAT == "binary":
+        return encode_mni_binary(content)
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def load_mni(mni_file_id: str) -> Optional[Dict[str, Any]]:
+    """
+    로컬 .mni 저장소에서 파일 내용을 읽습니다. 없으면 None을 반환합니다.
+
+    Raises:
+        ValueError: 파일이 올바른 .mni가 아닌 경우
+    """
+    try:
+        with open(_path(mni_file_id), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return decode_mni(data)
+
+
+async def _read_chunks(path: str, chunk_size: int) -> AsyncIterator[bytes]:
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        f.close()
+
+
+async def stream_mni(mni_file_id: str, chunk_size: int = READ_CHUNK_BYTES) -> AsyncIterator[MniElement]:
+    """
+    저장된 .mni를 (경로, 값) 원소 단위로 읽는 대로 내보냅니다. (app.utils.mni_stream 참고)
+    파일 전체를 메모리에 올리지 않으므로 큰 파일도 proof step·섹션부터 처리를 시작할 수 있습니다.
+
+    Raises:
+        FileNotFoundError: .mni 파일이 없는 경우
+        MniStreamError: 올바른 JSON 객체가 아닌 경우
+    """
+    path = _path(mni_file_id)
+    with open(path, "rb") as f:
+        binary = is_binary_mni(f.read(len(MAGIC)))
+    if binary:
+        # 바이너리 .mni는 압축을 통째로 풀어야 하므로 읽은 뒤 원소로 나눔
+        mni = await asyncio.to_thread(load_mni, mni_file_id)
+        for element in mni_elements(mni):
+            yield element
+        return
+    async for element in aiter_mni_elements(_read_chunks(path, chunk_size)):
+        yield element
+
+
+def write_mni_file(path: str, data: bytes) -> None:
+    """
+    인코딩한 .mni를 원자적으로(같은 디렉터리의 임시 파일 → rename) 씁니다.
+    같은 노드의 여러 워커 프로세스가 동시에 읽어도 깨진 파일을 보지 않습니다.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def save_mni(mni_file_id: str, content: Dict[str, Any]) -> None:
+    """
+    .mni 파일을 원자적으로 저장합니다. MNI_STORE_FORMAT이 binary이면 바이너리 형식으로 저장합니다.
+    """
+    data = encode_mni(content)
+    os.makedirs(settings.MNI_STORE_DIR, exist_ok=True)
+    write_mni_file(_path(mni_file_id), data)
+
+
+def mni_version(mni_file_id: str) -> Optional[Tuple[int, int, int]]:
+    """
+    저장된 .mni 파일의 버전 (inode, 수정 시각 ns, 크기). 없으면 None을 반환합니다.
+
+    save_mni는 새 파일로 교체하므로 저장할 때마다 버전이 바뀝니다.
+    """
+    try:
+        stat = os.stat(_path(mni_file_id))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def iter_mni() -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    저장된 모든 .mni 파일을 (mni_file_id, content) 형태로 순회합니다.
+    """
+    if not os.path.isdir(settings.MNI_STORE_DIR):
+        return
+    for name in sorted(os.listdir(settings.MNI_STORE_DIR)):
+        if name.endswith(".mni"):
+            mni_file_id = name[:-len(".mni")]
+            content = load_mni(mni_file_id)
+            if content is not None:
+                yield mni_file_id, content
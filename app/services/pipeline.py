@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from app.schemas.job import PipelineStage
+from app.schemas.mni import VerificationStatus
+from app.services.cost_model import estimate_job
+from app.services.job_queue import job_queue
+from app.services.keyframes import is_client_rendered, keyframe_cache
+from app.services.metrics import mark_cache_hit, mark_verify_pass
+from app.services.mni_store import load_mni, mni_version, save_mni, stream_mni
+from app.services.render_executor import render_mni
+from app.services.renderer import build_options
+from app.services.retry import PermanentError
+from app.services.step_verifier import proof_steps
+from app.services.timeline import timeline_report
+from app.services.verifier import verification_pool
+from app.utils.mni_hash import run_hashing
+
+logger = logging.getLogger("api.pipeline")
+
+# proof_tape를 읽는 대로 이 개수씩 묶어 검증 워커에 보냄
+STREAM_BATCH_STEPS = 256
+
+# 파이프라인 단계 핸들러 등록 (app.main에서 임포트)
+
+
+@job_queue.register_handler(PipelineStage.VERIFY)
+async def verify_stage(job: Dict[str, Any]) -> None:
+    """
+    .mni의 verification.sympy.code와 proof_tape의 각 변환(expr_in → expr_out)을 샌드박스 검증 워커에서 확인합니다.
+
+    proof_tape는 .mni를 끝까지 읽기 전에 읽은 step부터 STREAM_BATCH_STEPS개씩 검증 워커에 보냅니다.
+    """
+    if not job.get("mni_file_id") or mni_version(job["mni_file_id"]) is None:
+        logger.info(f"Job {job['id']} has no .mni yet, skipping verification")
+        return
+    summary: Dict[str, Any] = {}
+    passed = True
+    sympy_check = None
+    batches: List[asyncio.Task] = []
+    batch: List[Dict[str, Any]] = []
+    try:
+        async for path, value in stream_mni(job["mni_file_id"]):
+            if path[0] == "proof_tape" and len(path) == 2:
+                batch.extend(proof_steps([value]))
+                if len(batch) >= STREAM_BATCH_STEPS:
+                    batches.append(asyncio.create_task(verification_pool.verify_steps(batch)))
+                    batch = []
+            elif path == ("verification",) and isinstance(value, dict):
+                sympy_check = value.get("sympy")
+        if batch:
+            batches.append(asyncio.create_task(verification_pool.verify_steps(batch)))
+    except BaseException:
+        for task in batches:
+            task.cancel()
+        raise
+
+    code = sympy_check.get("code") if isinstance(sympy_check, dict) else None
+    if code:
+        result = await verification_pool.verify(code)
+        # verification은 hash_key에 포함되지 않으므로 렌더 캐시에 영향 없음
+        mni = load_mni(job["mni_file_id"])
+        mni["verification"]["sympy"] = {**sympy_check, "status": result["status"], "artifacts": result["artifacts"]}
+        save_mni(job["mni_file_id"], mni)
+        summary.update({k: result[k] for k in ("status", "error", "elapsed_ms")})
+        # 렌더링은 실제로 틀린 풀이(fail)만 막음 (error·timeout은 검증 환경 문제일 수 있음)
+        passed = result["status"] != VerificationStatus.FAIL.value
+
+    results = [result for results in await asyncio.gather(*batches) for result in results]
+    if results:
+        failed = [r for r in results if r["status"] not in (VerificationStatus.PASS.value, VerificationStatus.SKIPPED.value)]
+        summary["proof_steps"] = {
+            "total": len(results),
+            "passed": sum(1 for r in results if r["status"] == VerificationStatus.PASS.value),
+            # 규칙상 식 동치를 확인하지 않은 step 수 (vertex, solve 등)
+            "skipped": sum(1 for r in results if r["status"] == VerificationStatus.SKIPPED.value),
+            # 판정 저장소에서 가져와 다시 검증하지 않은 step 수
+            "cached": sum(1 for r in results if r.get("cached")),
+            "failed": [{k: r[k] for k in ("step", "status", "error")} for r in failed],
+        }
+        passed = passed and not any(r["status"] == VerificationStatus.FAIL.value for r in failed)
+
+    if summary:
+        summary["passed"] = passed
+        job["metadata"]["verification"] = summary
+        mark_verify_pass(job, passed)
+        # 검증 코드를 실행하지 않고 모든 step을 판정 저장소에서 가져왔으면 캐시 적중
+        mark_cache_hit(job, PipelineStage.VERIFY, not code and bool(results) and all(r.get("cached") for r in results))
+
+
+@job_queue.register_handler(PipelineStage.RENDER)
+async def render_stage(job: Dict[str, Any]) -> None:
+    """
+    .mni를 영상으로 렌더링합니다. 같은 hash_key의 결과물이 캐시에 있으면 렌더링을 건너뜁니다.
+    """
+    mni = load_mni(job["mni_file_id"]) if job.get("mni_file_id") else None
+    if mni is None:
+        # IR 생성 단계가 아직 .mni를 만들지 않은 작업
+        logger.info(f"Job {job['id']} has no .mni yet, skipping render")
+        return
+    if (job["metadata"].get("verification") or {}).get("passed") is False:
+        # 검증에서 틀린 것으로 판정된(fail) 풀이는 렌더링하지 않음 (수정 후 PATCH하면 검증부터 다시 실행)
+        raise PermanentError("Verification failed, not rendering the .mni")
+    # 실제 측정값과 비교할 수 있도록 렌더 직전 예측값 기록
+    estimate_job(job, mni)
+    job["metadata"]["timeline"] = timeline_report((mni.get("visual") or {}).get("sections") or [], build_options(mni))
+    if is_client_rendered(mni):
+        # ThreeJS 등 브라우저에서 재생하는 visual은 영상 대신 키프레임 타임라인만 생성
+        job["metadata"]["hash_key"], body, _ = await run_hashing(keyframe_cache.get, mni)
+        job["metadata"]["output"] = "keyframes"
+        job["metadata"]["keyframes_bytes"] = len(body)
+        return
+    if job["metadata"].get("preview"):
+        # 미리보기 작업은 저해상도로 렌더링 (promote 시 같은 .mni로 최종 렌더)
+        job["metadata"]["preview_video_path"] = await render_mni(mni, job, preview=True)
+    else:
+        job["metadata"]["video_path"] = await render_mni(mni, job)
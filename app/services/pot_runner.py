@@ -0,0 +1,257 @@
+import ast
+import copy
+import hashlib
+import logging
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.mni import VerificationStatus
+from app.services.expression_cache import SYMPY_VERSION
+from app.services.render_workers import WarmWorkerPool, serve_tasks
+from app.services.retry import TransientError
+from app.services.verifier import run_sandboxed, sandbox_namespace, setup_sandbox_worker
+from app.utils.mni_hash import canonical_dumps
+
+logger = logging.getLogger("api.pot_runner")
+
+# 셀 실행 방식이 바뀌면 올림 (이전 셀 출력 캐시 무효화)
+POT_VERSION = 1
+SUPPORTED_LANGS = {"python"}
+MAX_RESULT_CHARS = 4096
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(canonical_dumps(value).encode("utf-8")).hexdigest()
+
+
+def _normalize_source(source: str) -> str:
+    # 줄바꿈 형식과 끝 공백 차이는 같은 셀로 취급
+    return "\n".join(line.rstrip() for line in str(source).replace("\r\n", "\n").split("\n")).strip("\n")
+
+
+def pot_cells(pot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    structure.pot.cells를 셀 객체 목록으로 반환합니다. MVP 문자열 셀은 {"source": 문자열}로 바꿉니다.
+    """
+    return [cell if isinstance(cell, dict) else {"source": str(cell)} for cell in pot.get("cells") or []]
+
+
+def chain_hashes(pot: Dict[str, Any]) -> List[str]:
+    """
+    셀마다 그 셀과 모든 위쪽 셀의 소스로 만든 체인 해시를 계산합니다.
+
+    한 셀이 바뀌면 그 셀과 아래쪽 셀의 해시만 바뀌므로, 해시가 같은 셀은 이전 출력을 그대로 씁니다.
+    """
+    previous = _digest({"lang": pot.get("lang", "python"), "sympy": SYMPY_VERSION, "version": POT_VERSION})
+    hashes = []
+    for cell in pot_cells(pot):
+        previous = _digest({"previous": previous, "source": _normalize_source(cell.get("source", ""))})
+        hashes.append(previous)
+    return hashes
+
+
+def _with_result_name(source: str) -> str:
+    # 마지막 문장이 식이면 그 값을 _에 담아 셀 결과로 보여줌 (Jupyter와 같은 방식)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        # 실행 시 SyntaxError로 보고됨
+        return source
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = tree.body[-1]
+        tree.body[-1] = ast.copy_location(ast.Assign(targets=[ast.Name(id="_", ctx=ast.Store())], value=last.value), last)
+        return ast.unparse(ast.fix_missing_locations(tree))
+    return source
+
+
+def run_cell(source: str, namespace: Dict[str, Any], cpu_sec: float) -> Dict[str, Any]:
+    """
+    셀 하나를 커널의 namespace에서 실행하고 {status, stdout, result, error, elapsed_ms}를 반환합니다.
+    """
+    start = time.perf_counter()
+    namespace.pop("_", None)
+    status, error, stdout = run_sandboxed(_with_result_name(source), namespace, cpu_sec, "<pot>")
+    value = namespace.get("_")
+    return {
+        "status": status.value,
+        "stdout": stdout,
+        "result": None if value is None else str(value)[:MAX_RESULT_CHARS],
+        "error": error,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def _snapshot(namespace: Dict[str, Any]) -> Dict[str, Any]:
+    # 아래쪽 셀이 리스트 등을 제자리에서 바꿔도 이전 상태가 변하지 않도록 값마다 복사
+    state = {}
+    for name, value in namespace.items():
+        if name == "__builtins__" or isinstance(value, (types.ModuleType, types.FunctionType, type)):
+            state[name] = value
+            continue
+        try:
+            state[name] = copy.deepcopy(value)
+        except Exception:
+            state[name] = value
+    return state
+
+
+def _pot_kernel_main(conn, spawned_at: float, max_tasks: int, max_rss_mb: int) -> None:
+    """
+    PoT 커널 프로세스 본체
+
+    검증 워커와 같은 샌드박스(허용 모듈만 import, 셀마다 CPU 시간 제한, 메모리 제한, 환경 변수·비밀 설정값 없음)에서 셀을 실행하고,
+    셀을 실행한 직후의 변수 상태를 체인 해시별로 보관합니다. 다음 실행은 바뀐 셀 바로 위 상태에서 이어갑니다.
+    """
+    setup_sandbox_worker()
+    snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def run_cells(cells: List[Tuple[str, str]], start: int, cpu_sec: float) -> Dict[str, Any]:
+        # start 바로 위까지의 상태가 남아 있는 가장 가까운 셀부터 다시 실행
+        base = next((i for i in range(start - 1, -1, -1) if cells[i][0] in snapshots), -1)
+        if base >= 0:
+            snapshots.move_to_end(cells[base][0])
+            namespace = _snapshot(snapshots[cells[base][0]])
+        else:
+            namespace = sandbox_namespace("__pot__")
+        outputs, replayed, failed = [], 0, None
+        for i in range(base + 1, len(cells)):
+            chain_hash, source = cells[i]
+            if failed is not None:
+                outputs.append({
+                    "status": VerificationStatus.ERROR.value,
+                    "stdout": "",
+                    "result": None,
+                    "error": f"Skipped: cell {failed} did not pass",
+                    "elapsed_ms": 0,
+                    "skipped": True,
+                })
+                continue
+            output = run_cell(source, namespace, cpu_sec)
+            if output["status"] == VerificationStatus.PASS.value:
+                snapshots[chain_hash] = _snapshot(namespace)
+                if len(snapshots) > settings.POT_SNAPSHOTS:
+                    snapshots.popitem(last=False)
+            else:
+                failed = i
+            if i >= start:
+                outputs.append(output)
+            else:
+                # 상태를 되살리기 위해 다시 실행한 위쪽 셀 (출력은 이미 있음)
+                replayed += 1
+        return {"outputs": outputs, "replayed": replayed}
+
+    def run_task(kind: str, args: tuple) -> Any:
+        if kind == "run_cells":
+            return run_cells(*args)
+        raise ValueError(f"Unknown PoT kernel task: {kind}")
+
+    serve_tasks(conn, spawned_at, ["sympy"], run_task, max_tasks, 0)
+
+
+class PotRunner:
+    """
+    structure.pot 셀 실행기
+
+    셀 출력은 체인 해시(그 셀 + 위쪽 셀 전체)로 캐시합니다. 편집 후에는 해시가 처음 달라진 셀부터
+    아래쪽 셀만 상주 커널 프로세스에서 다시 실행하고, 그 위쪽 셀은 캐시된 출력을 그대로 씁니다.
+    .mni 셀에 기록된 outputs/hash도 캐시로 사용합니다.
+    """
+
+    def __init__(self, size: int):
+        self.workers = WarmWorkerPool(
+            size,
+            settings.VERIFY_WORKER_MAX_TASKS,
+            0,
+            target=_pot_kernel_main,
+            label="pot",
+        )
+        self._outputs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.counts: Dict[str, int] = {"runs": 0, "cells": 0, "cached": 0, "executed": 0, "replayed": 0}
+
+    def start(self) -> None:
+        self.workers.start()
+
+    def _remember(self, chain_hash: str, output: Dict[str, Any]) -> None:
+        self._outputs[chain_hash] = output
+        self._outputs.move_to_end(chain_hash)
+        if len(self._outputs) > settings.POT_OUTPUT_CACHE_SIZE:
+            self._outputs.popitem(last=False)
+
+    def _cached(self, cell: Dict[str, Any], chain_hash: str) -> Optional[Dict[str, Any]]:
+        if cell.get("hash") == chain_hash and isinstance(cell.get("outputs"), dict):
+            return cell["outputs"]
+        output = self._outputs.get(chain_hash)
+        if output is not None:
+            self._outputs.move_to_end(chain_hash)
+        return output
+
+    async def run(self, pot: Dict[str, Any], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        셀을 실행하고 셀 순서대로 {index, id, hash, cached, outputs}를 반환합니다.
+        캐시할 수 없는 출력(시간 초과 이후)은 hash가 None입니다.
+
+        Raises:
+            ValueError: 지원하지 않는 lang인 경우
+        """
+        lang = pot.get("lang", "python")
+        if lang not in SUPPORTED_LANGS:
+            raise ValueError(f"Unsupported PoT language: {lang}")
+        timeout = timeout or settings.POT_TIMEOUT_SEC
+        cells = pot_cells(pot)
+        hashes = chain_hashes(pot)
+        outputs = [self._cached(cell, chain_hash) for cell, chain_hash in zip(cells, hashes)]
+        # 체인 해시라서 처음 달라진 셀 아래쪽은 모두 다시 실행
+        start = next((i for i, output in enumerate(outputs) if output is None), len(cells))
+        uncacheable: Optional[int] = None
+
+        if start < len(cells):
+            sources = [(chain_hash, _normalize_source(cell.get("source", ""))) for cell, chain_hash in zip(cells, hashes)]
+            try:
+                payload = await self.workers.call("run_cells", (sources, start, settings.POT_CPU_SEC), timeout)
+            except TransientError:
+                payload = {"replayed": 0, "outputs": [{
+                    "status": VerificationStatus.TIMEOUT.value,
+                    "stdout": "",
+                    "result": None,
+                    "error": f"wall-clock time limit ({timeout}s) exceeded",
+                    "elapsed_ms": timeout * 1000,
+                }] * (len(cells) - start)}
+            for i, output in enumerate(payload["outputs"], start):
+                # 시간 초과(와 그 때문에 건너뛴 셀)는 다시 실행하면 달라질 수 있으므로 캐시하지 않음
+                if uncacheable is None and output["status"] == VerificationStatus.TIMEOUT.value:
+                    uncacheable = i
+                if uncacheable is None:
+                    self._remember(hashes[i], output)
+                outputs[i] = output
+            self.counts["executed"] += len(cells) - start
+            self.counts["replayed"] += payload["replayed"]
+
+        self.counts["runs"] += 1
+        self.counts["cells"] += len(cells)
+        self.counts["cached"] += start
+        return [
+            {
+                "index": i,
+                "id": cell.get("id"),
+                "hash": None if uncacheable is not None and i >= uncacheable else chain_hash,
+                "cached": i < start,
+                "outputs": output,
+            }
+            for i, (cell, chain_hash, output) in enumerate(zip(cells, hashes, outputs))
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.workers.snapshot(),
+            "runs": dict(self.counts),
+            "output_cache_entries": len(self._outputs),
+        }
+
+    def shutdown(self) -> None:
+        self.workers.shutdown()
+
+
+pot_runner = PotRunner(settings.POT_KERNELS)
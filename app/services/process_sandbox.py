@@ -0,0 +1,142 @@
+import ctypes
+import logging
+import os
+import platform
+import struct
+from typing import List, Optional
+
+from app.core.config import settings
+
+try:
+    import pwd
+except ImportError:  # Windows 로컬 개발 환경
+    pwd = None
+
+logger = logging.getLogger("api.process_sandbox")
+
+# 샌드박스 워커에서 지우는 설정값 (키·비밀번호·접속 문자열)
+SECRET_SETTINGS = (
+    "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_KEY", "GOOGLE_CLIENT_SECRET", "KAKAO_CLIENT_SECRET",
+    "SECRET_KEY", "JOB_STORE_URL",
+)
+
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWNET = 0x40000000
+_PR_SET_NO_NEW_PRIVS = 38
+_PR_SET_SECCOMP = 22
+_SECCOMP_MODE_FILTER = 2
+_SECCOMP_RET_ALLOW = 0x7FFF0000
+_SECCOMP_RET_ERRNO = 0x00050000
+_EPERM = 1
+_X32_SYSCALL_BIT = 0x40000000
+
+# 아키텍처별 (AUDIT_ARCH, 막을 시스템 호출 번호)
+# socket, connect, execve, execveat, ptrace, process_vm_readv/writev, unshare, mount
+_SECCOMP_DENY = {
+    "x86_64": (0xC000003E, (41, 42, 59, 322, 101, 310, 311, 272, 165)),
+    "aarch64": (0xC00000B7, (198, 203, 221, 281, 117, 270, 271, 97, 40)),
+}
+
+
+def _libc():
+    # 파이썬 실행 파일에 이미 링크된 libc를 씀 (ldconfig 등 외부 프로그램을 실행하지 않음)
+    return ctypes.CDLL(None, use_errno=True)
+
+
+def _clear_environment() -> None:
+    os.environ.clear()
+    for name in SECRET_SETTINGS:
+        if hasattr(settings, name):
+            object.__setattr__(settings, name, "")
+    # os.environ을 비워도 프로세스 시작 시 받은 환경 변수 블록은 메모리와 /proc/self/environ에 남으므로 0으로 덮어씀
+    with open("/proc/self/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    env_start, env_end = int(fields[-3]), int(fields[-2])
+    if env_end > env_start:
+        ctypes.memset(env_start, 0, env_end - env_start)
+
+
+def _isolate_network(libc) -> None:
+    # 네트워크 네임스페이스를 새로 만들어 외부 연결을 끊음 (root가 아니면 사용자 네임스페이스와 함께)
+    flags = _CLONE_NEWNET if os.geteuid() == 0 else _CLONE_NEWUSER | _CLONE_NEWNET
+    if libc.unshare(flags) != 0:
+        raise OSError(ctypes.get_errno(), "unshare failed")
+
+
+def _drop_privileges(user: str) -> None:
+    entry = pwd.getpwnam(user)
+    os.setgroups([])
+    os.setgid(entry.pw_gid)
+    os.setuid(entry.pw_uid)
+
+
+def _seccomp_filter(arch: int, denied: List[int]) -> bytes:
+    # struct sock_filter {u16 code; u8 jt; u8 jf; u32 k}
+    def stmt(code: int, k: int, jt: int = 0, jf: int = 0) -> bytes:
+        return struct.pack("HBBI", code, jt, jf, k)
+
+    ld_abs, jeq, jge, ret = 0x20, 0x15, 0x35, 0x06
+    deny_at = 4 + len(denied) + 1
+    program = [
+        stmt(ld_abs, 4),  # seccomp_data.arch
+        stmt(jeq, arch, 0, deny_at - 2),  # 다른 ABI로 들어온 호출은 거부
+        stmt(ld_abs, 0),  # seccomp_data.nr
+        stmt(jge, _X32_SYSCALL_BIT, deny_at - 4, 0),
+    ]
+    for i, nr in enumerate(denied):
+        program.append(stmt(jeq, nr, deny_at - (4 + i) - 1, 0))
+    program.append(stmt(ret, _SECCOMP_RET_ALLOW))
+    program.append(stmt(ret, _SECCOMP_RET_ERRNO | _EPERM))
+    return b"".join(program)
+
+
+def _install_seccomp(libc) -> None:
+    arch, denied = _SECCOMP_DENY[platform.machine()]
+    program = _seccomp_filter(arch, list(denied))
+    buffer = ctypes.create_string_buffer(program, len(program))
+
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.c_void_p)]
+
+    fprog = SockFprog(len(program) // 8, ctypes.cast(buffer, ctypes.c_void_p))
+    if libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "PR_SET_NO_NEW_PRIVS failed")
+    if libc.prctl(_PR_SET_SECCOMP, _SECCOMP_MODE_FILTER, ctypes.byref(fprog), 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "PR_SET_SECCOMP failed")
+
+
+def harden_process(user: Optional[str] = None) -> List[str]:
+    """
+    샌드박스 워커 프로세스를 운영체제 수준에서 격리하고, 적용된 단계 이름 목록을 반환합니다.
+
+    1. 환경 변수와 비밀 설정값 삭제
+    2. 네트워크 네임스페이스 분리
+    3. root로 실행 중이면 권한 없는 사용자(VERIFY_SANDBOX_USER)로 전환
+    4. seccomp로 소켓·프로세스 실행·ptrace 계열 시스템 호출 차단
+
+    Linux 전용이며, 컨테이너 권한 등으로 실패한 단계는 경고만 남기고 나머지 단계를 계속 적용합니다.
+    워커가 이미 열어 둔 파일(작업 파이프, 표현식 캐시)은 권한을 낮춘 뒤에도 계속 쓸 수 있습니다.
+    """
+    sandbox_user = settings.VERIFY_SANDBOX_USER if user is None else user
+    applied = []
+    try:
+        _clear_environment()
+        applied.append("environment")
+    except (OSError, ValueError, IndexError) as exc:
+        logger.warning(f"Sandbox environment scrub incomplete: {exc}")
+    try:
+        libc = _libc()
+    except (OSError, TypeError) as exc:
+        logger.warning(f"Sandbox hardening unavailable (libc): {exc}")
+        return applied
+    steps = [("network", lambda: _isolate_network(libc))]
+    if sandbox_user and pwd is not None and os.geteuid() == 0:
+        steps.append(("user", lambda: _drop_privileges(sandbox_user)))
+    steps.append(("seccomp", lambda: _install_seccomp(libc)))
+    for name, step in steps:
+        try:
+            step()
+            applied.append(name)
+        except (OSError, KeyError, AttributeError) as exc:
+            logger.warning(f"Sandbox hardening step {name!r} failed: {exc}")
+    return applied
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경
+    fcntl = None
+
+logger = logging.getLogger("api.render_cache")
+
+FillFunc = Callable[[str], Awaitable[None]]
+
+
+def _safe_key(key: str) -> str:
+    # hash_key("QF001:...:v1")의 콜론은 Windows 경로에서 쓸 수 없으므로 치환
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+    if not safe or safe.startswith("."):
+        raise ValueError(f"Invalid cache key: {key}")
+    return safe
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    hash_key 기반 렌더 결과물(최종 mp4, 섹션별 중간 영상) 캐시
+
+    - 로컬 디스크: {root}/objects/{key}/{name} + {name}.meta.json(sha256, size)
+    - 스토리지 버킷(선택): 로컬에 없으면 버킷에서 내려받고, 새로 채운 항목은 버킷에도 올립니다.
+    - 용량 관리: 바이트 예산을 넘으면 마지막 사용 시각(mtime)이 오래된 항목부터 삭제 (LRU)
+    - 동시 채우기 방지: 같은 키는 프로세스 내 asyncio.Lock + 파일 락으로 한 번만 렌더링
+    """
+
+    def __init__(self, root: str, max_bytes: int, bucket: Optional[str] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        # 키별 락과 그 락을 기다리거나 잡고 있는 수 (아무도 없으면 지워 계속 쌓이지 않도록 함)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, "objects", _safe_key(key))
+
+    def path(self, key: str, name: str) -> str:
+        return os.path.join(self._entry_dir(key), _safe_key(name))
+
+    def get(self, key: str, name: str) -> Optional[str]:
+        """
+        무결성(크기·sha256)을 확인한 뒤 캐시된 파일 경로를 반환합니다. 손상된 항목은 삭제합니다.
+        """
+        path = self.path(key, name)
+        try:
+            with open(f"{path}.meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if os.path.getsize(path) != meta["size"] or _sha256_file(path) != meta["sha256"]:
+                raise ValueError("checksum mismatch")
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, OSError) as exc:
+            logger.warning(f"Dropping corrupted cache entry {key}/{name}: {exc}")
+            self._remove(path)
+            return None
+        # LRU 기준 시각 갱신
+        now = time.time()
+        os.utime(path, (now, now))
+        return path
+
+    def put(self, key: str, name: str, src_path: str) -> str:
+        """
+        파일을 캐시에 원자적으로(임시 파일 → rename) 저장합니다.
+        """
+        path = self.path(key, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(src_path, tmp)
+            os.chmod(tmp, 0o644)
+            meta = {"sha256": _sha256_file(tmp), "size": os.path.getsize(tmp), "created_at": time.time()}
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with open(f"{path}.meta.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{path}.meta.json.tmp", f"{path}.meta.json")
+        self.evict(keep=path)
+        return path
+
+    def _remove(self, path: str) -> None:
+        for p in (path, f"{path}.meta.json"):
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        바이트 예산을 넘으면 가장 오래 사용되지 않은 파일부터 삭제합니다. 삭제한 바이트 수를 반환합니다.
+        (keep은 방금 저장한 파일로, 삭제 대상에서 제외합니다)
+        """
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "objects")):
+            for filename in filenames:
+                if filename.endswith((".meta.json", ".tmp")):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            freed += size
+        return freed
+
+    @contextmanager
+    def _file_lock(self, key: str, name: str) -> Iterator[None]:
+        # 같은 노드의 다른 워커 프로세스와 중복 렌더링을 막기 위한 락
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.join(self.root, "locks"), exist_ok=True)
+        lock_path = os.path.join(self.root, "locks", f"{_safe_key(key)}.{_safe_key(name)}.lock")
+        with open(lock_path, "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    async def _download(self, key: str, name: str) -> Optional[str]:
+        if not self.bucket:
+            return None
+        url = f"{settings.SUPABASE_URL}/storage/v1/object/{self.bucket}/{_safe_key(key)}/{_safe_key(name)}"
+        headers = {"apikey": settings.SUPABASE_SERVICE_KEY, "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}"}
+        try:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                response = await client.get(url, headers=headers)
+            if response.status_code != 200:
+                return None
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".download") as f:
+                f.write(response.content)
+            try:
+                return await asyncio.to_thread(self.put, key, name, f.name)
+            finally:
+                os.unlink(f.name)
+        except httpx.HTTPError as exc:
+            logger.warning(f"Render cache download failed for {key}/{name}: {exc}")
+            return None
+
+    async def _upload(self, key: str, name: str, path: str) -> None:
+        if not self.bucket:
+            return
+        url = f"{settings.SUPABASE_URL}/storage/v1/object/{self.bucket}/{_safe_key(key)}/{_safe_key(name)}"
+        headers = {
+            "apikey": settings.SUPABASE_SERVICE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+            "Content-Type": "video/mp4",
+            "x-upsert": "true",
+        }
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                response = await client.post(url, headers=headers, content=content)
+            if response.status_code not in [200, 201]:
+                logger.warning(f"Render cache upload failed for {key}/{name}: {response.text}")
+        except httpx.HTTPError as exc:
+            logger.warning(f"Render cache upload failed for {key}/{name}: {exc}")
+
+    async def lookup(self, key: str, name: str) -> Optional[str]:
+        """
+        로컬 → 버킷 순으로 캐시를 조회합니다.
+        """
+        path = await asyncio.to_thread(self.get, key, name)
+        if path is None:
+            path = await self._download(key, name)
+        return path
+
+    @asynccontextmanager
+    async def _key_lock(self, lock_key: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(lock_key, asyncio.Lock())
+        self._lock_users[lock_key] = self._lock_users.get(lock_key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[lock_key] -= 1
+            if not self._lock_users[lock_key]:
+                del self._lock_users[lock_key]
+                del self._locks[lock_key]
+
+    async def get_or_fill(self, key: str, name: str, fill: FillFunc) -> Tuple[str, bool]:
+        """
+        캐시된 파일을 반환하고, 없으면 fill(출력 경로)로 한 번만 만들어 저장합니다.
+
+        Returns:
+            Tuple[str, bool]: (캐시 파일 경로, 캐시 적중 여부)
+        """
+        async with self._key_lock(f"{key}/{name}"):
+            path = await self.lookup(key, name)
+            if path is not None:
+                return path, True
+
+            # 다른 프로세스가 채우는 중이면 파일 락에서 기다린 뒤 다시 확인
+            lock_cm = self._file_lock(key, name)
+            await asyncio.to_thread(lock_cm.__enter__)
+            try:
+                path = await asyncio.to_thread(self.get, key, name)
+                if path is not None:
+                    return path, True
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    out_path = os.path.join(tmpdir, _safe_key(name))
+                    await fill(out_path)
+                    path = await asyncio.to_thread(self.put, key, name, out_path)
+            finally:
+                lock_cm.__exit__(None, None, None)
+
+        await self._upload(key, name, path)
+        return path, False
+
+
+render_cache = RenderCache(
+    settings.RENDER_CACHE_DIR,
+    settings.RENDER_CACHE_MAX_BYTES,
+    settings.RENDER_CACHE_BUCKET,
+)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.job import FailureKind, PipelineStage
+from app.services.metrics import mark_cache_hit, stage_timer
+from app.services.cost_model import cost_model
+from app.services.render_cache import render_cache
+from app.services.renderer import (
+    FINAL_ARTIFACT,
+    PREVIEW_ARTIFACT,
+    PREVIEW_SEGMENT_ARTIFACT,
+    SEGMENT_ARTIFACT,
+    RenderError,
+    build_options,
+    concat_segments,
+    preview_options,
+    section_cache_key,
+)
+from app.services.render_workers import WarmWorkerPool
+from app.services.retry import TransientError, classify_failure
+from app.utils.mni_hash import compute_hash_key, run_hashing
+
+logger = logging.getLogger("api.render")
+
+
+class SectionRenderResult(BaseModel):
+    index: int
+    section_name: str
+    cache_key: str
+    path: Optional[str] = None
+    cache_hit: bool = False
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+    transient: bool = False
+
+
+class SectionRenderError(RenderError):
+    """
+    일부 섹션 렌더링이 실패한 경우. 성공한 섹션은 캐시에 남아 재시도 시 다시 렌더링하지 않습니다.
+    """
+
+    def __init__(self, results: List[SectionRenderResult]):
+        self.results = results
+        failed = [f"{r.section_name}: {r.error}" for r in results if r.error]
+        super().__init__(f"{len(failed)} section(s) failed to render: " + "; ".join(failed))
+
+
+class RenderExecutor:
+    """
+    visual.sections를 상주 렌더 워커 풀에 나눠 렌더링하는 실행기
+
+    섹션마다 독립된 워커 프로세스에서 Manim을 실행하므로 멀티 섹션 문제의 렌더링 시간은
+    코어 수에 비례해 줄어들고, 한 섹션의 실패(또는 워커 프로세스 크래시)가 다른 섹션에 영향을 주지 않습니다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.workers = WarmWorkerPool(
+            self.max_workers,
+            settings.RENDER_WORKER_MAX_TASKS,
+            settings.RENDER_WORKER_MAX_RSS_MB,
+        )
+
+    def start(self) -> None:
+        self.workers.start()
+
+    async def _render_one(
+        self,
+        index: int,
+        section: Dict[str, Any],
+        options: Dict[str, Any],
+        visual_type: str,
+        preview: bool = False,
+    ) -> SectionRenderResult:
+        # 캐시 키는 최종 렌더 옵션 기준 섹션 해시, 미리보기는 같은 키 아래 다른 이름으로 저장
+        key = section_cache_key(section, options, visual_type)
+        name = PREVIEW_SEGMENT_ARTIFACT if preview else SEGMENT_ARTIFACT
+        render_options = preview_options(options) if preview else options
+        result = SectionRenderResult(index=index, section_name=section.get("section_name", f"section_{index}"), cache_key=key)
+        start = time.perf_counter_ns()
+        try:
+            result.path, result.cache_hit = await render_cache.get_or_fill(
+                key, name, lambda out_path: self.workers.render(section, render_options, out_path)
+            )
+        except Exception as exc:
+            logger.warning(f"Section {result.section_name} failed to render: {exc}")
+            result.error = str(exc) or exc.__class__.__name__
+            result.transient = classify_failure(exc) == FailureKind.TRANSIENT
+        result.elapsed_ms = round((time.perf_counter_ns() - start) / 1_000_000, 3)
+        return result
+
+    async def render_sections(self, mni: Dict[str, Any], preview: bool = False) -> List[SectionRenderResult]:
+        """
+        모든 섹션을 병렬로 렌더링(또는 캐시에서 조회)해 섹션 순서대로 결과를 반환합니다.
+        """
+        options = build_options(mni)
+        visual = mni.get("visual") or {}
+        visual_type = visual.get("type", "ManimScene")
+        sections = list(enumerate(visual.get("sections") or []))
+        # 예상 비용이 큰 섹션부터 워커에 배정 (LPT), 결과는 원래 순서로 정렬
+        sections.sort(key=lambda item: cost_model.predict_section(item[1], options), reverse=True)
+        tasks = [
+            asyncio.create_task(self._render_one(index, section, options, visual_type, preview))
+            for index, section in sections
+        ]
+        results = await asyncio.gather(*tasks)
+        return sorted(results, key=lambda r: r.index)
+
+    def shutdown(self) -> None:
+        self.workers.shutdown()
+
+
+render_executor = RenderExecutor(settings.RENDER_PROCESSES)
+
+
+async def render_mni(mni: Dict[str, Any], job: Optional[Dict[str, Any]] = None, preview: bool = False) -> str:
+    """
+    .mni 전체를 렌더링해 최종 mp4 경로를 반환합니다.
+
+    build.hash_key가 같은 결과물이 캐시에 있으면 렌더링을 건너뛰고 metrics.cache_hit을 기록합니다.
+    없으면 섹션을 병렬로 렌더링한 뒤 원래 순서대로 이어 붙입니다.
+    preview=True이면 저해상도·저프레임으로 렌더링하고 같은 hash_key 아래 미리보기 영상으로 따로 캐시합니다.
+    """
+    hash_key = await run_hashing(compute_hash_key, mni)
+
+    async def fill(out_path: str) -> None:
+        results = await render_executor.render_sections(mni, preview)
+        if any(r.error for r in results):
+            error = SectionRenderError(results)
+            # 타임아웃 등 일시적 실패가 섞여 있으면 재시도 대상 (성공한 섹션은 캐시에서 재사용)
+            if any(r.transient for r in results if r.error):
+                raise TransientError(str(error)) from error
+            raise error
+        # 이어 붙이기는 렌더 캐시 채우기 안에서 실행되므로 여기서 assemble 단계 시간으로 측정
+        with stage_timer(job, PipelineStage.ASSEMBLE) if job is not None else nullcontext():
+            await asyncio.to_thread(concat_segments, [r.path for r in results], out_path)
+
+    path, hit = await render_cache.get_or_fill(hash_key, PREVIEW_ARTIFACT if preview else FINAL_ARTIFACT, fill)
+    if job is not None:
+        mark_cache_hit(job, PipelineStage.RENDER, hit)
+        job["metadata"]["hash_key"] = hash_key
+    return path
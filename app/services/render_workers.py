@@ -0,0 +1,260 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import pickle
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.renderer import RenderError, render_section, render_section_inprocess
+from app.services.retry import TransientError
+from app.services.scene_compiler import scene_compiler
+from app.services.tex_cache import tex_cache
+
+try:
+    import resource
+except ImportError:  # Windows 로컬 개발 환경
+    resource = None
+
+logger = logging.getLogger("api.render_workers")
+
+# 워커 시작 시 미리 import할 렌더링 스택 (설치되지 않은 모듈은 건너뜀)
+PRELOAD_MODULES = ("sympy", "numpy", "jinja2", "manim")
+
+
+def _rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    # Linux 기준 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _preload() -> List[str]:
+    loaded = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError:
+            pass
+    # Jinja2 템플릿도 미리 컴파일
+    scene_compiler.template
+    # 노드 공유 TeX 캐시를 거치도록 manim의 TeX 컴파일 함수 교체
+    tex_cache.install()
+    return loaded
+
+
+def _run_task(kind: str, args: tuple, inprocess: bool) -> Any:
+    if kind == "render":
+        return render_section_inprocess(*args) if inprocess else render_section(*args)
+    if kind == "prewarm_tex":
+        return tex_cache.prewarm(*args)
+    raise ValueError(f"Unknown render worker task: {kind}")
+
+
+def serve_tasks(
+    conn,
+    spawned_at: float,
+    modules: List[str],
+    run_task: Callable[[str, tuple], Any],
+    max_tasks: int,
+    max_rss_mb: int,
+) -> None:
+    """
+    워커 프로세스의 작업 루프. 준비 완료를 알린 뒤 파이프로 (작업 종류, 인자)를 받아 실행합니다.
+    """
+    conn.send(("ready", {"startup_ms": (time.time() - spawned_at) * 1000, "modules": modules}))
+
+    tasks = 0
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        kind, args = task
+        try:
+            result = ("ok", run_task(kind, args))
+        except Exception as exc:
+            try:
+                pickle.dumps(exc)
+            except Exception:
+                exc = RenderError(str(exc))
+            result = ("error", exc)
+        tasks += 1
+        rss = _rss_mb()
+        recycle = tasks >= max_tasks or (max_rss_mb > 0 and rss >= max_rss_mb)
+        conn.send(result + ({"tasks": tasks, "rss_mb": round(rss, 1), "recycle": recycle},))
+        if recycle:
+            break
+    conn.close()
+
+
+def _worker_main(conn, spawned_at: float, max_tasks: int, max_rss_mb: int) -> None:
+    """
+    상주 렌더 워커 프로세스 본체
+    """
+    # Ctrl+C는 부모 프로세스가 처리하고 워커는 shutdown에서 정리
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    modules = _preload()
+    inprocess = "manim" in modules
+    serve_tasks(conn, spawned_at, modules, lambda kind, args: _run_task(kind, args, inprocess), max_tasks, max_rss_mb)
+
+
+class WarmWorker:
+    def __init__(self, ctx, target: Callable, max_tasks: int, max_rss_mb: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=target,
+            args=(child_conn, time.time(), max_tasks, max_rss_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.startup_ms = 0.0
+        self.modules: List[str] = []
+
+    def wait_ready(self, timeout: float) -> None:
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise TransientError("Render worker did not start in time")
+        try:
+            _, info = self.conn.recv()
+        except EOFError as exc:
+            raise RenderError("Render worker exited during startup") from exc
+        self.ready = True
+        self.startup_ms = info["startup_ms"]
+        self.modules = info["modules"]
+
+    def call(self, task: tuple, timeout: float) -> tuple:
+        self.conn.send(task)
+        if not self.conn.poll(timeout):
+            raise TransientError(f"Worker task timed out after {timeout}s")
+        try:
+            return self.conn.recv()
+        except EOFError as exc:
+            raise RenderError(f"Render worker crashed (exitcode={self.process.exitcode})") from exc
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class WarmWorkerPool:
+    """
+    렌더링 스택(manim, sympy, numpy, Jinja2)을 미리 import해 둔 상주 워커 프로세스 풀
+
+    작업마다 새 파이썬 프로세스를 띄우면 첫 프레임 전에 수 초의 import 비용이 들기 때문에,
+    워커를 미리 띄워 두고 파이프로 작업을 전달합니다. 워커는 N개 작업 처리 후 또는 메모리 기준을 넘으면 새 프로세스로 교체됩니다.
+    절약한 시작 비용은 snapshot()의 startup_saved_ms로 확인할 수 있습니다.
+    target으로 다른 워커 본체(예: SymPy 검증 워커)를 지정하면 같은 풀 구조를 재사용합니다.
+    """
+
+    def __init__(self, size: int, max_tasks: int, max_rss_mb: int, target: Callable = _worker_main, label: str = "render"):
+        self.size = size
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.target = target
+        self.label = label
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[WarmWorker] = []
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {"tasks": 0, "recycled": 0, "killed": 0, "startup_saved_ms": 0.0}
+
+    def _spawn(self) -> WarmWorker:
+        worker = WarmWorker(self._ctx, self.target, self.max_tasks, self.max_rss_mb)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker: WarmWorker, kill: bool = False) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.stop(kill=kill)
+
+    def start(self) -> None:
+        """
+        워커 프로세스를 미리 띄웁니다. (준비 완료는 첫 작업 시 확인하므로 서버 시작을 막지 않음)
+        """
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(self._spawn())
+        logger.info(f"Started {self.size} warm {self.label} worker(s)")
+
+    async def render(self, section: Dict[str, Any], options: Dict[str, Any], out_path: str, timeout: Optional[float] = None) -> str:
+        return await self.call("render", (section, options, out_path), timeout)
+
+    async def call(self, kind: str, args: tuple, timeout: Optional[float] = None) -> Any:
+        """
+        유휴 워커 하나에서 작업을 실행하고 결과를 반환합니다.
+        """
+        self.start()
+        timeout = timeout or settings.RENDER_TIMEOUT_SEC
+        worker = await self._idle.get()
+        result = None
+        try:
+            await asyncio.to_thread(worker.wait_ready, timeout)
+            startup_ms = worker.startup_ms
+            result = await asyncio.to_thread(worker.call, (kind, args), timeout)
+        finally:
+            if result is None or result[2]["recycle"]:
+                if result is None:
+                    # 타임아웃·크래시 워커는 상태를 알 수 없으므로 강제 종료
+                    self._stats["killed"] += 1
+                else:
+                    logger.info(f"Recycling {self.label} worker pid={worker.process.pid} after {result[2]['tasks']} task(s), rss={result[2]['rss_mb']}MB")
+                    self._stats["recycled"] += 1
+                await asyncio.to_thread(self._retire, worker, result is None)
+                worker = self._spawn()
+            self._idle.put_nowait(worker)
+
+        status, payload, _ = result
+        self._stats["tasks"] += 1
+        # 콜드 프로세스였다면 작업마다 치렀을 시작 비용
+        self._stats["startup_saved_ms"] += startup_ms
+        if status == "error":
+            raise payload
+        return payload
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = [
+                {"pid": w.process.pid, "ready": w.ready, "startup_ms": round(w.startup_ms, 1), "modules": w.modules}
+                for w in self._workers
+            ]
+        ready = [w["startup_ms"] for w in workers if w["ready"]]
+        return {
+            "size": self.size,
+            "workers": workers,
+            "tasks": int(self._stats["tasks"]),
+            "recycled": int(self._stats["recycled"]),
+            "killed": int(self._stats["killed"]),
+            "avg_startup_ms": round(sum(ready) / len(ready), 1) if ready else None,
+            "startup_saved_ms": round(self._stats["startup_saved_ms"], 1),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+        self._idle = None
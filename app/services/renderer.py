@@ -0,0 +1,180 @@
+import glob
+import os
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.retry import PermanentError, TransientError
+from app.services.scene_compiler import scene_compiler
+from app.utils.mni_hash import compute_section_hash
+
+FINAL_ARTIFACT = "final.mp4"
+SEGMENT_ARTIFACT = "segment.mp4"
+# 미리보기는 같은 hash_key 아래 다른 이름으로 캐시
+PREVIEW_ARTIFACT = "preview.mp4"
+PREVIEW_SEGMENT_ARTIFACT = "preview-segment.mp4"
+
+
+class RenderError(PermanentError):
+    """
+    Manim/ffmpeg 실행 실패 (같은 입력으로 재시도해도 실패)
+    """
+
+
+def build_options(mni: Dict[str, Any]) -> Dict[str, Any]:
+    options = {"fps": 30, "resolution": "1400x800", "theme": "dark"}
+    options.update(((mni.get("build") or {}).get("options")) or {})
+    return options
+
+
+def preview_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    레이아웃 확인용 저해상도·저프레임 렌더 옵션을 반환합니다.
+    """
+    width, height = str(options.get("resolution", "1400x800")).lower().split("x")
+    scale = settings.PREVIEW_SCALE
+    # H.264는 짝수 해상도만 지원
+    preview_width = max(2, int(int(width) * scale) // 2 * 2)
+    preview_height = max(2, int(int(height) * scale) // 2 * 2)
+    return {
+        **options,
+        "resolution": f"{preview_width}x{preview_height}",
+        "fps": min(int(options.get("fps", 30)), settings.PREVIEW_FPS),
+    }
+
+
+def section_cache_key(section: Dict[str, Any], options: Dict[str, Any], visual_type: str = "ManimScene") -> str:
+    return f"section-{compute_section_hash(section, options, visual_type)}"
+
+
+def scene_source(section: Dict[str, Any], options: Dict[str, Any]) -> str:
+    """
+    visual.sections[] 한 개를 Manim Scene 코드로 변환합니다. (섹션 해시 기준으로 메모이즈)
+    """
+    return scene_compiler.compile_section(section, options)
+
+
+def render_section(section: Dict[str, Any], options: Dict[str, Any], out_path: str, timeout: Optional[float] = None) -> str:
+    """
+    섹션 한 개를 Manim으로 렌더링해 out_path(mp4)에 저장합니다. (동기 함수, 스레드/프로세스에서 실행)
+    """
+    width, height = str(options.get("resolution", "1400x800")).lower().split("x")
+    with tempfile.TemporaryDirectory() as workdir:
+        scene_file = os.path.join(workdir, "scene.py")
+        with open(scene_file, "w", encoding="utf-8") as f:
+            f.write(scene_source(section, options))
+        cmd = [
+            settings.MANIM_BIN, "render", scene_file, "SectionScene",
+            "--format", "mp4",
+            "--resolution", f"{width},{height}",
+            "--frame_rate", str(options.get("fps", 30)),
+            "--media_dir", workdir,
+            "--output_file", "segment",
+            "--disable_caching",
+            "--progress_bar", "none",
+        ]
+        try:
+            subprocess.run(cmd, cwd=workdir, check=True, capture_output=True, timeout=timeout or settings.RENDER_TIMEOUT_SEC)
+        except subprocess.TimeoutExpired as exc:
+            raise TransientError(f"Manim render timed out after {exc.timeout}s") from exc
+        except subprocess.CalledProcessError as exc:
+            raise RenderError(f"Manim render failed: {exc.stderr.decode(errors='replace')[-2000:]}") from exc
+        except FileNotFoundError as exc:
+            raise RenderError(f"Manim executable not found: {settings.MANIM_BIN}") from exc
+
+        _collect_output(workdir, out_path)
+    return out_path
+
+
+def render_section_inprocess(section: Dict[str, Any], options: Dict[str, Any], out_path: str) -> str:
+    """
+    manim이 이미 import된 프로세스(상주 렌더 워커) 안에서 섹션을 렌더링합니다.
+
+    CLI를 띄우지 않으므로 manim/numpy import 비용을 매번 치르지 않습니다. 타임아웃은 호출한 쪽에서 워커를 종료해 처리합니다.
+    """
+    from manim import tempconfig
+
+    width, height = str(options.get("resolution", "1400x800")).lower().split("x")
+    with tempfile.TemporaryDirectory() as workdir:
+        scene_file = os.path.join(workdir, "scene.py")
+        source = scene_source(section, options)
+        with open(scene_file, "w", encoding="utf-8") as f:
+            f.write(source)
+        overrides = {
+            "input_file": scene_file,
+            "media_dir": workdir,
+            "output_file": "segment",
+            "format": "mp4",
+            "pixel_width": int(width),
+            "pixel_height": int(height),
+            "frame_rate": float(options.get("fps", 30)),
+            "disable_caching": True,
+            "progress_bar": "none",
+            "write_to_movie": True,
+        }
+        try:
+            with tempconfig(overrides):
+                namespace: Dict[str, Any] = {"__name__": "scene"}
+                exec(compile(source, scene_file, "exec"), namespace)
+                namespace["SectionScene"]().render()
+        except Exception as exc:
+            raise RenderError(f"Manim render failed: {exc}") from exc
+        _collect_output(workdir, out_path)
+    return out_path
+
+
+def _collect_output(workdir: str, out_path: str) -> None:
+    outputs = glob.glob(os.path.join(workdir, "videos", "**", "segment.mp4"), recursive=True)
+    if not outputs:
+        raise RenderError("Manim finished without producing a video")
+    os.replace(outputs[0], out_path)
+
+
+def concat_segments(segments: List[str], out_path: str) -> str:
+    """
+    섹션 영상을 순서대로 이어 붙입니다. (재인코딩 없이 ffmpeg concat demuxer 사용)
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+        for segment in segments:
+            escaped = os.path.abspath(segment).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+        list_file = f.name
+    try:
+        subprocess.run(
+            [settings.FFMPEG_BIN, "-y", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", out_path],
+            check=True, capture_output=True, timeout=settings.RENDER_TIMEOUT_SEC,
+        )
+    except subprocess.CalledProcessError as exc:
+        raise RenderError(f"ffmpeg concat failed: {exc.stderr.decode(errors='replace')[-2000:]}") from exc
+    except FileNotFoundError as exc:
+        raise RenderError(f"ffmpeg executable not found: {settings.FFMPEG_BIN}") from exc
+    finally:
+        os.unlink(list_file)
+    return out_path
+
+
+def diff_sections(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    두 .mni의 섹션별 해시를 비교합니다.
+
+    새 .mni의 각 섹션에 대해 이전 .mni에 같은 해시의 섹션이 있었는지(=캐시된 영상을 재사용할 수 있는지)를 반환합니다.
+    """
+    old_options = build_options(old)
+    old_visual = old.get("visual") or {}
+    old_keys = {
+        section_cache_key(section, old_options, old_visual.get("type", "ManimScene"))
+        for section in old_visual.get("sections") or []
+    }
+    options = build_options(new)
+    visual = new.get("visual") or {}
+    result = []
+    for index, section in enumerate(visual.get("sections") or []):
+        key = section_cache_key(section, options, visual.get("type", "ManimScene"))
+        result.append({
+            "index": index,
+            "section_name": section.get("section_name"),
+            "cache_key": key,
+            "changed": key not in old_keys,
+        })
+    return result
@@ -0,0 +1,97 @@
+import asyncio
+import random
+from typing import Dict, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from app.schemas.job import FailureKind, PipelineStage
+
+
+class TransientError(Exception):
+    """
+    재시도하면 성공할 수 있는 일시적 실패 (네트워크, 타임아웃, 외부 서비스 과부하 등)
+    """
+
+
+class PermanentError(Exception):
+    """
+    재시도해도 결과가 같은 영구적 실패 (인식 불가 이미지, 잘못된 .mni 등)
+    """
+
+
+# 명시적으로 분류되지 않은 예외 중 일시적 실패로 취급할 타입
+TRANSIENT_EXCEPTIONS = (
+    TimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+)
+
+
+def classify_failure(exc: BaseException) -> FailureKind:
+    """
+    예외를 일시적/영구적 실패로 분류합니다.
+
+    Args:
+        exc: 단계 실행 중 발생한 예외
+
+    Returns:
+        FailureKind: 실패 유형
+    """
+    if isinstance(exc, PermanentError):
+        return FailureKind.PERMANENT
+    if isinstance(exc, TransientError) or isinstance(exc, TRANSIENT_EXCEPTIONS):
+        return FailureKind.TRANSIENT
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        if code == 429 or code >= 500:
+            return FailureKind.TRANSIENT
+    return FailureKind.PERMANENT
+
+
+class RetryPolicy(BaseModel):
+    max_attempts: int = 3
+    base_delay_sec: float = 1.0
+    max_delay_sec: float = 60.0
+    multiplier: float = 2.0
+    # 0이면 지터 없음, 1이면 [0, delay] 구간 전체에서 무작위 (full jitter)
+    jitter: float = 0.5
+
+    def should_retry(self, attempt: int, kind: FailureKind) -> bool:
+        """
+        attempt번째 시도가 실패했을 때 다시 시도할지 판단합니다.
+        """
+        return kind == FailureKind.TRANSIENT and attempt < self.max_attempts
+
+    def compute_delay(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """
+        attempt번째 실패 후 다음 시도까지 대기할 시간(초)을 계산합니다.
+
+        지수 백오프 값에서 jitter 비율만큼을 무작위로 깎아 재시도가 한꺼번에 몰리지 않게 합니다.
+        """
+        rng = rng or random
+        delay = min(self.max_delay_sec, self.base_delay_sec * (self.multiplier ** max(attempt - 1, 0)))
+        return delay - rng.uniform(0, self.jitter * delay)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# 단계별 재시도 정책
+STAGE_RETRY_POLICIES: Dict[PipelineStage, RetryPolicy] = {
+    PipelineStage.INPUT: RetryPolicy(max_attempts=2, base_delay_sec=2.0),
+    PipelineStage.STRUCTURE: RetryPolicy(max_attempts=4, base_delay_sec=2.0, max_delay_sec=120.0),
+    PipelineStage.VERIFY: RetryPolicy(max_attempts=2, base_delay_sec=1.0),
+    PipelineStage.IR_BUILD: RetryPolicy(max_attempts=2, base_delay_sec=0.5),
+    PipelineStage.RENDER: RetryPolicy(max_attempts=3, base_delay_sec=5.0, max_delay_sec=300.0),
+    PipelineStage.ASSEMBLE: RetryPolicy(max_attempts=3, base_delay_sec=2.0),
+    PipelineStage.UPLOAD: RetryPolicy(max_attempts=6, base_delay_sec=1.0, max_delay_sec=120.0, jitter=1.0),
+}
+
+
+def get_retry_policy(stage: PipelineStage) -> RetryPolicy:
+    """
+    단계에 해당하는 재시도 정책을 반환합니다.
+    """
+    return STAGE_RETRY_POLICIES.get(stage, DEFAULT_RETRY_POLICY)
@@ -0,0 +1,243 @@
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+
+from app.core.config import settings
+from app.schemas.mni import VisualAction
+from app.services.retry import PermanentError
+from app.services.timeline import beat_wait, plan_beats, step_payload
+from app.utils.curve_sampling import sample_curve
+from app.utils.mni_hash import compute_section_hash
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "manim")
+SECTION_TEMPLATE = "section_scene.py.j2"
+
+THEME_BACKGROUNDS = {"dark": "#000000", "light": "#FFFFFF"}
+# CreateAxes 없이 그래프/점을 그릴 때와 x_range/y_range 생략 시 쓰는 축 범위
+DEFAULT_AXES_RANGE = [-5.0, 5.0]
+
+# 섹션 해시 → 생성 코드 (LRU)
+CODE_CACHE_SIZE = 1024
+
+
+class SceneCompileError(PermanentError):
+    """
+    visual 섹션을 Manim 코드로 변환할 수 없는 경우 (지원하지 않는 action, 잘못된 수식 등)
+    """
+
+
+def _py_literal(value: Any) -> str:
+    # 템플릿에 들어가는 값은 파이썬 리터럴로만 출력 (코드 주입 방지)
+    if isinstance(value, bool) or value is None:
+        return repr(value)
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_py_literal(v) for v in value) + "]"
+    raise SceneCompileError(f"Unsupported literal: {type(value).__name__}")
+
+
+def _number(value: Any, field: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError) as exc:
+        raise SceneCompileError(f"{field} must be a number: {value!r}") from exc
+    # nan·inf는 repr이 파이썬 리터럴이 아니므로 생성 코드에 넣을 수 없음
+    if not math.isfinite(number):
+        raise SceneCompileError(f"{field} must be a finite number: {value!r}")
+    return number
+
+
+def _range(value: Any, field: str) -> List[float]:
+    if not isinstance(value, (list, tuple)) or len(value) not in (2, 3):
+        raise SceneCompileError(f"{field} must be [min, max] or [min, max, step]: {value!r}")
+    return [_number(v, field) for v in value]
+
+
+def plot_segments(function: str, x_range: List[float], y_range: List[float]) -> List[List[List[float]]]:
+    """
+    PlotFunction 곡선을 미리 샘플링한 점 구간 목록으로 변환합니다. (렌더러·키프레임 공용)
+    """
+    try:
+        return sample_curve(function, x_range[:2], y_range[:2])
+    except ValueError as exc:
+        raise SceneCompileError(str(exc)) from exc
+
+
+def _lower_step(index: int, step: Dict[str, Any], axes: Dict[str, List[float]], defined: Set[str]) -> Dict[str, Any]:
+    """
+    step 하나를 템플릿 변수로 변환합니다. 값 검증과 수식 변환은 여기서 끝내고 템플릿은 출력만 담당합니다.
+
+    axes는 현재 축 범위로, CreateAxes를 만나면 갱신합니다.
+    defined는 섹션 안에서 지금까지 objects에 등록된 id로, 객체를 만드는 step을 만나면 추가합니다.
+    """
+    payload = step_payload(step)
+    try:
+        action = VisualAction(payload.get("action"))
+    except ValueError as exc:
+        raise SceneCompileError(f"Unsupported visual action: {payload.get('action')}") from exc
+
+    var = f"s{index}"
+    lowered: Dict[str, Any] = {
+        "action": action.value,
+        "index": index + 1,
+        "var": var,
+        "name": str(payload.get("id") or f"step_{index}"),
+        "color": str(payload.get("color", "WHITE")).upper(),
+        "wait": _number(payload["wait"], "wait") if payload.get("wait") else None,
+        "defines": True,
+    }
+    # 같은 beat의 step들은 한 self.play()에 애니메이션을 모아 동시에 재생
+    if action in (VisualAction.CREATE_AXES, VisualAction.PLOT_FUNCTION):
+        lowered["animations"] = [f"Create({var})"]
+    elif action == VisualAction.HIGHLIGHT_POINT:
+        lowered["animations"] = [f"FadeIn({var})", f"Indicate({var})"]
+    elif action == VisualAction.CREATE_TEX:
+        lowered["animations"] = [f"Write({var})"]
+    else:
+        lowered["animations"] = [f"{action.value}({var})"]
+    if action == VisualAction.CREATE_AXES:
+        lowered["x_range"] = axes["x_range"] = _range(payload.get("x_range", DEFAULT_AXES_RANGE), "x_range")
+        lowered["y_range"] = axes["y_range"] = _range(payload.get("y_range", DEFAULT_AXES_RANGE), "y_range")
+    elif action == VisualAction.PLOT_FUNCTION:
+        lowered["segments"] = plot_segments(str(payload.get("function", "x")), axes["x_range"], axes["y_range"])
+    elif action == VisualAction.HIGHLIGHT_POINT:
+        point = payload.get("point", [0, 0])
+        if not isinstance(point, (list, tuple)) or len(point) < 2:
+            raise SceneCompileError(f"point must be [x, y]: {point!r}")
+        lowered["x"] = _number(point[0], "point")
+        lowered["y"] = _number(point[1], "point")
+    elif action == VisualAction.CREATE_TEX:
+        lowered["tex"] = str(payload.get("tex", ""))
+    else:
+        target = payload.get("target")
+        lowered["defines"] = action == VisualAction.FADE_IN and bool(payload.get("tex"))
+        if lowered["defines"]:
+            lowered["ref"] = f"MathTex({_py_literal(str(payload['tex']))})"
+        elif target:
+            if str(target) not in defined:
+                raise SceneCompileError(f"Unknown target: {target!r}")
+            lowered["ref"] = f"objects[{_py_literal(str(target))}]"
+        elif index == 0:
+            raise SceneCompileError(f"{action.value} has no object to animate")
+        else:
+            lowered["ref"] = "last"
+    if lowered["defines"]:
+        defined.add(lowered["name"])
+    return lowered
+
+
+class SceneCompiler:
+    """
+    MNIFile.visual → Manim Scene 코드 컴파일러
+
+    GPT 없이 결정적으로 코드를 생성합니다. Jinja2 템플릿은 한 번만 컴파일해 두고(바이트코드는 디스크에 캐시),
+    생성된 코드는 섹션 해시 기준으로 메모이즈하므로 같은 섹션의 코드는 다시 만들지 않습니다.
+    build.options.optimize_timeline이 켜져 있으면 독립적인 step을 한 self.play()로 합칩니다.
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR, bytecode_dir: Optional[str] = None, cache_size: int = CODE_CACHE_SIZE):
+        bytecode_cache = None
+        if bytecode_dir:
+            os.makedirs(bytecode_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=bytecode_cache,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            autoescape=False,
+        )
+        self.env.filters["py"] = _py_literal
+        self._template = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = self.env.get_template(SECTION_TEMPLATE)
+        return self._template
+
+    def compile_section(
+        self,
+        section: Dict[str, Any],
+        options: Dict[str, Any],
+        visual_type: str = "ManimScene",
+        class_name: str = "SectionScene",
+    ) -> str:
+        """
+        visual.sections[] 한 개를 Manim Scene 코드로 변환합니다.
+        """
+        key = f"{class_name}:{compute_section_hash(section, options, visual_type)}"
+        with self._lock:
+            code = self._cache.get(key)
+            if code is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return code
+
+        theme = options.get("theme", "dark")
+        axes = {"x_range": DEFAULT_AXES_RANGE, "y_range": DEFAULT_AXES_RANGE}
+        steps = section.get("steps") or []
+        # 섹션마다 새 Scene이므로 target으로 쓸 수 있는 id도 섹션 안에서 정의된 것뿐
+        defined: Set[str] = set()
+        lowered = [_lower_step(i, step, axes, defined) for i, step in enumerate(steps)]
+        optimize = bool(options.get("optimize_timeline"))
+        beats = []
+        for beat in plan_beats(steps, optimize):
+            wait = lowered[beat[-1]]["wait"]
+            if optimize:
+                wait = beat_wait(steps, beat, optimize) or None
+            beats.append({"steps": [lowered[i] for i in beat], "wait": wait})
+        code = self.template.render(
+            class_name=class_name,
+            background=THEME_BACKGROUNDS.get(theme, theme or "#000000"),
+            default_range=DEFAULT_AXES_RANGE,
+            beats=beats,
+        )
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = code
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return code
+
+    def compile_mni(self, mni: Dict[str, Any], options: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        .mni의 모든 섹션을 컴파일합니다. 섹션마다 Section{n} 클래스를 만듭니다.
+        """
+        visual = mni.get("visual") or {}
+        visual_type = visual.get("type", "ManimScene")
+        return [
+            {
+                "section_name": section.get("section_name", f"section_{i}"),
+                "scene": f"Section{i + 1}",
+                "code": self.compile_section(section, options, visual_type, f"Section{i + 1}"),
+            }
+            for i, section in enumerate(visual.get("sections") or [])
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+scene_compiler = SceneCompiler(bytecode_dir=os.path.join(settings.RENDER_CACHE_DIR, "jinja"))
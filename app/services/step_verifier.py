@@ -0,0 +1,148 @@
+import re
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import sympy as sp
+
+from app.schemas.mni import VerificationStatus
+from app.services.expression_cache import expression_cache
+
+# 판정 방식이 바뀌면 올림 (저장된 ProofStep 판정 무효화)
+VERIFIER_VERSION = 2
+# expr_in과 expr_out이 같은 식이어야 하는 변환 규칙. 그 밖의 규칙(vertex, solve, substitute 등)은
+# 입력과 결과가 같은 식이 아니므로 확인하지 않고 skipped로 기록
+EQUIVALENCE_RULES = {
+    "rewrite", "given", "complete_square", "expand", "factor", "simplify", "collect", "cancel",
+    "distribute", "combine", "rationalize", "identity", "trig_identity",
+}
+# 등식·부등식 표기 (식 동치로 비교할 수 없음)
+_RELATION = re.compile(r"(?<![<>!=])=(?!=)|[<>]")
+# 수치 비교 표본 (고정 시드라 같은 step은 항상 같은 결과)
+SAMPLE_POINTS = 32
+SAMPLE_RANGE = 3.0
+MAX_VARIABLES = 8
+# 정의역 밖(nan, inf)을 빼고 남아야 하는 최소 표본 수
+MIN_VALID_POINTS = 8
+RTOL = 1e-7
+ATOL = 1e-9
+
+_rng = np.random.default_rng(20240917)
+_REAL_POINTS = _rng.uniform(-SAMPLE_RANGE, SAMPLE_RANGE, (MAX_VARIABLES, SAMPLE_POINTS))
+# 실수 표본에서 대부분 정의되지 않는 식(sqrt(x - 5), log(-x) 등)은 복소수 표본으로 비교
+_COMPLEX_POINTS = _REAL_POINTS + 1j * _rng.uniform(-SAMPLE_RANGE, SAMPLE_RANGE, (MAX_VARIABLES, SAMPLE_POINTS))
+
+
+def proof_steps(proof_tape: List[Any]) -> List[Dict[str, Any]]:
+    # 문자열 항목(MVP 형식)은 검증할 변환 쌍이 없으므로 제외
+    return [step for step in proof_tape or [] if isinstance(step, dict) and "expr_in" in step and "expr_out" in step]
+
+
+@lru_cache(maxsize=8192)
+def _compiled(expr: str, names: Tuple[str, ...]) -> Tuple[Callable, bool]:
+    """
+    정규화된 수식 → (NumPy 벡터화 함수, 유리함수 여부)
+    """
+    parsed = expression_cache.parse(expr)
+    symbols = [sp.Symbol(name) for name in names]
+    return sp.lambdify(symbols, parsed, "numpy"), bool(parsed.is_rational_function(*symbols))
+
+
+def _evaluate(f: Callable, points: np.ndarray) -> Optional[np.ndarray]:
+    try:
+        with np.errstate(all="ignore"):
+            values = np.asarray(f(*points), dtype=complex)
+    except Exception:
+        # lambdify가 NumPy로 옮기지 못한 함수 등
+        return None
+    # 상수식은 스칼라를 반환
+    return np.broadcast_to(values, (points.shape[1],))
+
+
+@lru_cache(maxsize=16384)
+def numeric_equivalent(left: str, right: str) -> Tuple[Optional[bool], bool]:
+    """
+    정규화된 두 수식을 무작위 표본점에서 한꺼번에 계산해 비교합니다. (표본이 고정이므로 결과를 메모이즈)
+
+    Returns:
+        Tuple[Optional[bool], bool]: (같으면 True, 다르면 False, 판단할 수 없으면 None; 양쪽 모두 유리함수인지)
+    """
+    names = tuple(sorted(
+        {s.name for s in expression_cache.parse(left).free_symbols}
+        | {s.name for s in expression_cache.parse(right).free_symbols}
+    ))
+    if len(names) > MAX_VARIABLES:
+        return None, False
+    f_left, rational_left = _compiled(left, names)
+    f_right, rational_right = _compiled(right, names)
+    min_valid = MIN_VALID_POINTS if names else 1
+
+    for points in (_REAL_POINTS, _COMPLEX_POINTS):
+        points = points[:len(names)]
+        a, b = _evaluate(f_left, points), _evaluate(f_right, points)
+        if a is None or b is None:
+            return None, False
+        valid = np.isfinite(a) & np.isfinite(b)
+        if np.count_nonzero(valid) < min_valid:
+            continue
+        a, b = a[valid], b[valid]
+        close = np.abs(a - b) <= ATOL + RTOL * np.maximum(np.abs(a), np.abs(b))
+        return bool(close.all()), rational_left and rational_right
+    return None, False
+
+
+def _rule_name(rule: Any) -> str:
+    return "_".join(str(rule or "rewrite").strip().lower().replace("-", " ").split())
+
+
+def _skip_reason(step: Dict[str, Any]) -> Optional[str]:
+    rule = _rule_name(step.get("rule"))
+    if rule not in EQUIVALENCE_RULES:
+        return f"rule {rule!r} is not an equivalence rewrite"
+    if _RELATION.search(str(step["expr_in"])) or _RELATION.search(str(step["expr_out"])):
+        return "equations and inequalities are not checked"
+    return None
+
+
+def verify_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ProofStep 하나의 expr_in과 expr_out이 같은 식인지 확인합니다.
+
+    EQUIVALENCE_RULES의 규칙만 확인하고, 그 밖의 규칙과 등식·부등식 step은 skipped로 기록합니다.
+    먼저 NumPy로 표본점에서 비교해 다르면 바로 fail로 끝냅니다. 같게 나온 유리함수(다항식 포함)는
+    무작위 표본 비교만으로 충분하므로 pass로 끝내고, 그 밖의 함수이거나 수치로 판단할 수 없으면
+    SymPy 기호 비교(표현식 캐시 사용)로 넘깁니다. method에 어느 쪽으로 판정했는지 기록합니다.
+    """
+    start = time.perf_counter()
+    skipped = _skip_reason(step)
+    if skipped is not None:
+        return {
+            "step": step.get("step"),
+            "status": VerificationStatus.SKIPPED.value,
+            "method": None,
+            "error": skipped,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+    status, error, method = VerificationStatus.PASS, None, "numeric"
+    try:
+        left = expression_cache.normalize(step["expr_in"])
+        right = expression_cache.normalize(step["expr_out"])
+        same, rational = numeric_equivalent(left, right)
+        if same is False:
+            status = VerificationStatus.FAIL
+        elif not (same and rational):
+            method = "symbolic"
+            if not expression_cache.equivalent(left, right):
+                status = VerificationStatus.FAIL
+    except ValueError as exc:
+        status, error = VerificationStatus.ERROR, str(exc)
+    except Exception as exc:
+        status, error = VerificationStatus.ERROR, f"{type(exc).__name__}: {exc}"
+    return {
+        "step": step.get("step"),
+        "status": status.value,
+        "method": method,
+        "error": error,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
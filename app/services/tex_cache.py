@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.mni_store import iter_mni
+from app.services.render_cache import RenderCache
+from app.services.timeline import step_payload
+
+logger = logging.getLogger("api.tex_cache")
+
+GLYPH_ARTIFACT = "glyph.svg"
+
+
+def tex_cache_key(expression: str, environment: Optional[str], template_body: str) -> str:
+    """
+    TeX 소스 + 환경 + 템플릿(프리앰블) 기준 콘텐츠 주소
+    """
+    h = hashlib.sha256()
+    for part in (template_body, environment or "", expression):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return f"tex-{h.hexdigest()[:40]}"
+
+
+class TexGlyphCache:
+    """
+    컴파일된 TeX → SVG 캐시 (노드의 모든 렌더 워커가 파일시스템으로 공유)
+
+    Manim은 섹션마다 임시 media_dir에서 렌더링하므로 자체 Tex 캐시가 매번 사라집니다.
+    워커 프로세스의 tex_to_svg_file을 감싸 같은 TeX는 latex/dvisvgm을 다시 실행하지 않게 합니다.
+    저장은 RenderCache와 같은 방식(원자적 쓰기, sha256 검증, mtime 기반 LRU)을 사용합니다.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.store = RenderCache(root, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._installed = False
+
+    def wrap(self, compile_svg):
+        """
+        manim.utils.tex_file_writing.tex_to_svg_file을 캐시를 거치도록 감쌉니다.
+        """
+        def cached_tex_to_svg_file(expression: str, environment: Optional[str] = None, tex_template=None) -> Path:
+            from manim import config
+
+            template = tex_template or config["tex_template"]
+            body = getattr(template, "body", None) or getattr(template, "_body", "")
+            key = tex_cache_key(expression, environment, body)
+            path = self.store.get(key, GLYPH_ARTIFACT)
+            if path is not None:
+                self.hits += 1
+                return Path(path)
+            self.misses += 1
+            svg = compile_svg(expression, environment=environment, tex_template=tex_template)
+            try:
+                return Path(self.store.put(key, GLYPH_ARTIFACT, str(svg)))
+            except OSError as exc:
+                # 캐시 저장 실패는 렌더링을 막지 않음
+                logger.warning(f"TeX cache write failed for {key}: {exc}")
+                return Path(svg)
+
+        return cached_tex_to_svg_file
+
+    def install(self) -> bool:
+        """
+        현재 프로세스(상주 렌더 워커)에 캐시를 설치합니다. manim이 없으면 False를 반환합니다.
+        """
+        if self._installed:
+            return True
+        try:
+            from manim.mobject.text import tex_mobject
+            from manim.utils import tex_file_writing
+        except ImportError:
+            return False
+        cached = self.wrap(tex_file_writing.tex_to_svg_file)
+        # tex_mobject는 함수를 직접 import해 쓰므로 양쪽 모두 교체
+        tex_file_writing.tex_to_svg_file = cached
+        tex_mobject.tex_to_svg_file = cached
+        self._installed = True
+        return True
+
+    def prewarm(self, expressions: List[str]) -> Dict[str, Any]:
+        """
+        MathTex를 미리 만들어 캐시를 채웁니다. (manim이 설치된 워커 프로세스에서 실행)
+        """
+        if not self.install():
+            return {"requested": len(expressions), "compiled": 0, "cached": 0, "failed": 0, "skipped": "manim not installed"}
+        from manim import MathTex, tempconfig
+
+        hits, misses = self.hits, self.misses
+        failed = 0
+        with tempfile.TemporaryDirectory() as workdir, tempconfig({"media_dir": workdir}):
+            for expression in expressions:
+                try:
+                    MathTex(expression)
+                except Exception as exc:
+                    failed += 1
+                    logger.warning(f"TeX prewarm failed for {expression!r}: {exc}")
+        return {
+            "requested": len(expressions),
+            "compiled": self.misses - misses - failed,
+            "cached": self.hits - hits,
+            "failed": failed,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+def common_tex_expressions(limit: int = 200) -> List[str]:
+    """
+    저장된 .mni의 CreateTex/FadeIn(tex) 중 자주 쓰이는 TeX 문자열을 빈도순으로 반환합니다.
+    """
+    counts: Counter = Counter()
+    for _, mni in iter_mni():
+        for section in (mni.get("visual") or {}).get("sections") or []:
+            for step in section.get("steps") or []:
+                tex = step_payload(step).get("tex")
+                if isinstance(tex, str) and tex.strip():
+                    counts[tex] += 1
+    return [tex for tex, _ in counts.most_common(limit)]
+
+
+tex_cache = TexGlyphCache(settings.TEX_CACHE_DIR, settings.TEX_CACHE_MAX_BYTES)
@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Optional, Set
+
+from app.schemas.mni import VisualAction
+
+# Manim self.play() 기본 run_time (렌더러·키프레임·비용 모델 공용)
+PLAY_SEC = 1.0
+
+# 새 객체를 만드는 action (objects[id]에 등록됨)
+CREATING_ACTIONS = {
+    VisualAction.CREATE_AXES.value,
+    VisualAction.PLOT_FUNCTION.value,
+    VisualAction.HIGHLIGHT_POINT.value,
+    VisualAction.CREATE_TEX.value,
+}
+# 현재 축(axes)의 좌표계를 쓰는 action
+AXES_ACTIONS = {VisualAction.PLOT_FUNCTION.value, VisualAction.HIGHLIGHT_POINT.value}
+
+
+def step_payload(step: Dict[str, Any]) -> Dict[str, Any]:
+    # VisualStep 형태({action, params})와 평탄한 형태({action, ...payload}) 모두 지원
+    params = step.get("params")
+    return {**params, **step} if isinstance(params, dict) else dict(step)
+
+
+def step_wait(payload: Dict[str, Any]) -> float:
+    try:
+        return float(payload.get("wait") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def step_dependencies(steps: List[Dict[str, Any]]) -> List[Set[int]]:
+    """
+    step마다 먼저 끝나야 하는 step 인덱스 집합을 계산합니다.
+
+    - target/last로 참조하는 객체를 만든 step
+    - PlotFunction/HighlightPoint는 직전 CreateAxes
+    - 같은 객체를 애니메이션하는 앞선 step (한 객체의 애니메이션은 순서대로)
+    """
+    deps: List[Set[int]] = []
+    defined: Dict[str, int] = {}
+    touched: Dict[int, List[int]] = {}
+    axes_step: Optional[int] = None
+    for i, step in enumerate(steps):
+        payload = step_payload(step)
+        action = payload.get("action")
+        name = str(payload.get("id") or f"step_{i}")
+        required: Set[int] = set()
+        if action in CREATING_ACTIONS or (action == VisualAction.FADE_IN.value and payload.get("tex")):
+            obj = i
+            if action in AXES_ACTIONS and axes_step is not None:
+                required.add(axes_step)
+        elif payload.get("target"):
+            # 없는 target은 컴파일 단계에서 오류 처리
+            obj = defined.get(str(payload["target"]), i)
+        else:
+            obj = i - 1 if i else i
+        if obj != i:
+            required.add(obj)
+        required.update(touched.get(obj, []))
+        touched.setdefault(obj, []).append(i)
+        if action in CREATING_ACTIONS:
+            defined[name] = i
+        if action == VisualAction.CREATE_AXES.value:
+            axes_step = i
+        deps.append(required)
+    return deps
+
+
+def plan_beats(steps: List[Dict[str, Any]], optimize: bool = False) -> List[List[int]]:
+    """
+    step들을 동시에 재생할 묶음(beat) 목록으로 나눕니다.
+
+    optimize가 False면 step 하나가 beat 하나입니다(기존 순차 재생).
+    True면 서로 의존하지 않는 연속 step을 한 self.play()로 합칩니다.
+    wait가 있는 step 뒤에서는 항상 끊으므로 의도한 멈춤은 유지됩니다.
+    """
+    if not optimize:
+        return [[i] for i in range(len(steps))]
+    deps = step_dependencies(steps)
+    beats: List[List[int]] = []
+    for i, step in enumerate(steps):
+        current = beats[-1] if beats else None
+        if (
+            current is not None
+            and not deps[i].intersection(current)
+            and step_wait(step_payload(steps[current[-1]])) <= 0
+        ):
+            current.append(i)
+        else:
+            beats.append([i])
+    return beats
+
+
+def beat_wait(steps: List[Dict[str, Any]], beat: List[int], optimize: bool = False) -> float:
+    # beat 뒤의 대기 시간 (마지막 step의 wait, 최적화 시 0 이하 wait는 제거)
+    wait = step_wait(step_payload(steps[beat[-1]]))
+    return max(wait, 0.0) if optimize else wait
+
+
+def section_seconds(steps: List[Dict[str, Any]], optimize: bool = False) -> float:
+    return sum(
+        PLAY_SEC + beat_wait(steps, beat, optimize)
+        for beat in plan_beats(steps, optimize)
+    )
+
+
+def timeline_report(sections: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    타임라인 최적화로 줄어드는 프레임 수를 계산합니다.
+
+    applied는 build.options.optimize_timeline 적용 여부이며, 꺼져 있어도 절감 가능한 프레임 수를 보여줍니다.
+    """
+    fps = float(options.get("fps", 30))
+    before = after = 0.0
+    beats_before = beats_after = 0
+    for section in sections:
+        steps = section.get("steps") or []
+        before += section_seconds(steps)
+        after += section_seconds(steps, optimize=True)
+        beats_before += len(steps)
+        beats_after += len(plan_beats(steps, optimize=True))
+    return {
+        "applied": bool(options.get("optimize_timeline")),
+        "frames_before": round(before * fps),
+        "frames_optimized": round(after * fps),
+        "frames_saved": round((before - after) * fps),
+        "beats_before": beats_before,
+        "beats_optimized": beats_after,
+    }
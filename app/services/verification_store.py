@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.schemas.mni import VerificationStatus
+from app.services.expression_cache import SYMPY_VERSION
+from app.services.step_verifier import VERIFIER_VERSION
+
+logger = logging.getLogger("api.verification_store")
+
+# step_hash의 키 규칙이 바뀌면 올립니다.
+KEY_VERSION = 3
+# 저장된 판정이 유효한 버전 (SymPy나 step 판정 방식, 키 규칙이 바뀌면 이전 행은 무효)
+STORE_VERSION = f"{SYMPY_VERSION}/{VERIFIER_VERSION}/k{KEY_VERSION}"
+# 입력만으로 결과가 정해지는 판정만 저장 (error·timeout은 워커 상태에 따라 달라질 수 있음)
+STORED_STATUSES = {VerificationStatus.PASS.value, VerificationStatus.FAIL.value}
+# 결과에서 저장하는 필드 (step 번호·소요 시간은 호출마다 다름)
+STORED_FIELDS = ("status", "method", "error")
+
+
+def _collapse(value: Any) -> str:
+    return " ".join(str(value or "").split())
+
+
+def step_hash(step: Dict[str, Any]) -> str:
+    """
+    {rule, expr_in, expr_out}의 정규화된 해시
+
+    식은 공백만 정리한 문자열로 해시합니다. API 프로세스에서 부르므로 SymPy로 파싱하지 않음
+    ("9**9**9" 같은 입력을 계산하지 않도록). 식 자체의 비교는 샌드박스 워커에서 합니다.
+    """
+    canonical = {
+        "rule": _collapse(step.get("rule")),
+        "expr_in": _collapse(step["expr_in"]),
+        "expr_out": _collapse(step["expr_out"]),
+    }
+    text = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VerificationStore:
+    """
+    ProofStep 판정 결과 저장소
+
+    같은 {rule, expr_in, expr_out}은 다시 검증하지 않도록 판정(pass/fail)을 SQLite 파일에 저장하고,
+    최근 항목은 프로세스 내 LRU에 둡니다. 시작 시 warm()으로 최근 판정을 메모리 맵 읽기로 한꺼번에 올립니다.
+    SymPy 버전이나 판정 방식(VERIFIER_VERSION)이 바뀌면 이전 판정은 처음 열 때 지웁니다.
+    """
+
+    def __init__(self, path: Optional[str], memory_size: int = 200000, mmap_mb: int = 256):
+        self.path = path
+        self.memory_size = memory_size
+        self.mmap_mb = mmap_mb
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.warmed = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # 읽기는 read() 복사 대신 메모리 맵으로
+            conn.execute(f"PRAGMA mmap_size={self.mmap_mb * 1024 * 1024}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verification_results ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            deleted = conn.execute("DELETE FROM verification_results WHERE version != ?", (STORE_VERSION,)).rowcount
+            conn.commit()
+            if deleted:
+                logger.info(f"Dropped {deleted} verification result(s) from an older SymPy/verifier version")
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def warm(self) -> int:
+        """
+        최근 저장된 판정을 memory_size개까지 메모리에 올리고 올린 수를 반환합니다.
+        """
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return 0
+            try:
+                rows = conn.execute(
+                    "SELECT key, value FROM verification_results ORDER BY rowid DESC LIMIT ?",
+                    (self.memory_size,),
+                ).fetchall()
+            except sqlite3.Error as exc:
+                logger.warning(f"Verification store warmup failed: {exc}")
+                return 0
+            # 오래된 것부터 넣어 최근 항목이 LRU 뒤쪽에 오도록
+            for key, value in reversed(rows):
+                if key not in self._memory:
+                    self._remember(key, json.loads(value))
+            self.warmed = len(rows)
+        logger.info(f"Warmed {len(rows)} verification result(s)")
+        return len(rows)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        저장된 판정을 {key: 결과}로 반환합니다. 없는 key는 빠집니다.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    found[key] = value
+                else:
+                    missing.append(key)
+            conn = self._db()
+            if conn is not None and missing:
+                unique = list(dict.fromkeys(missing))
+                try:
+                    for i in range(0, len(unique), 500):
+                        chunk = unique[i:i + 500]
+                        rows = conn.execute(
+                            f"SELECT key, value FROM verification_results WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk,
+                        ).fetchall()
+                        for key, value in rows:
+                            found[key] = json.loads(value)
+                            self._remember(key, found[key])
+                except sqlite3.Error as exc:
+                    logger.warning(f"Verification store lookup failed: {exc}")
+            for key in missing:
+                if key in found:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """
+        판정을 저장합니다. pass/fail이 아닌 결과는 저장하지 않습니다.
+        """
+        rows = []
+        with self._lock:
+            for key, result in results.items():
+                if result.get("status") not in STORED_STATUSES:
+                    continue
+                value = {k: result.get(k) for k in STORED_FIELDS}
+                self._remember(key, value)
+                rows.append((key, STORE_VERSION, json.dumps(value, ensure_ascii=False)))
+            conn = self._db()
+            if conn is None or not rows:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO verification_results (key, version, value) VALUES (?, ?, ?)", rows
+                )
+                conn.commit()
+            except sqlite3.Error as exc:
+                # 저장 실패는 검증 결과에 영향 없음
+                logger.warning(f"Verification store write failed: {exc}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "version": STORE_VERSION,
+                "entries": len(self._memory),
+                "warmed": self.warmed,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / total, 4) if total else None,
+            }
+
+
+verification_store = VerificationStore(
+    settings.VERIFICATION_STORE_PATH,
+    settings.VERIFICATION_STORE_MEMORY_SIZE,
+    settings.VERIFICATION_STORE_MMAP_MB,
+)
@@ -0,0 +1,448 @@
+import ast
+import builtins
+import contextlib
+import importlib
+import io
+import logging
+import os
+import signal
+import asyncio
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.mni import VerificationStatus
+from app.services.expression_cache import cache_stats, expression_cache
+from app.services.process_sandbox import harden_process
+from app.services.render_workers import WarmWorkerPool, serve_tasks
+from app.services.retry import TransientError
+from app.services.step_verifier import verify_step
+from app.services.verification_store import step_hash, verification_store
+from app.utils.expressions import restricted_parse_expr
+
+try:
+    import resource
+except ImportError:  # Windows 로컬 개발 환경
+    resource = None
+
+logger = logging.getLogger("api.verifier")
+
+# 검증 코드에서 import할 수 있는 모듈 (하위 모듈도 이름 그대로 적어야 허용, 접두사로 허용하지 않음)
+ALLOWED_MODULES = {
+    "sympy", "sympy.abc", "mpmath", "math", "cmath", "fractions", "decimal",
+    "itertools", "functools", "operator", "collections", "numbers",
+}
+# 허용 모듈에서도 꺼낼 수 없는 이름 (파일·외부 프로그램·임의 코드 실행, 이름 문자열로 속성 읽기)
+BLOCKED_MODULE_ATTRIBUTES = {
+    "lambdify", "preview", "init_session", "init_printing", "test", "doctest",
+    "cplot", "splot", "attrgetter", "methodcaller",
+}
+# 검증 코드에서 쓸 수 없는 내장 함수
+BLOCKED_BUILTINS = {
+    "open", "exec", "eval", "compile", "input", "breakpoint", "exit", "quit",
+    "help", "globals", "locals", "vars", "memoryview", "__import__",
+    "getattr", "setattr", "delattr", "dir",
+}
+# 검증 코드에서 접근할 수 없는 속성 (문자열 서식으로 임의 속성 읽기, 실행 중인 프레임 접근)
+BLOCKED_ATTRIBUTES = {
+    "format", "format_map", "gi_frame", "gi_code", "ag_frame", "ag_code", "cr_frame", "cr_code",
+    "f_back", "f_builtins", "f_code", "f_globals", "f_locals", "tb_frame", "tb_next",
+}
+MAX_STDOUT_CHARS = 64 * 1024
+MAX_ARTIFACTS = 50
+# 워커 한 번 호출에 보내는 ProofStep 수
+STEP_BATCH_SIZE = 64
+
+
+class CpuTimeExceeded(BaseException):
+    # 검증 코드의 except Exception에 잡히지 않도록 BaseException을 상속
+    pass
+
+
+_module_proxies: Dict[str, types.ModuleType] = {}
+
+
+def _module_proxy(name: str) -> types.ModuleType:
+    """
+    허용 모듈의 공개 이름만 담은 대리 모듈을 반환합니다.
+
+    하위 모듈은 ALLOWED_MODULES에 있는 것만 대리 모듈로 넣으므로 sympy.external 같은 경로로 다른 모듈에 닿을 수 없습니다.
+    """
+    proxy = _module_proxies.get(name)
+    if proxy is not None:
+        return proxy
+    module = importlib.import_module(name)
+    proxy = types.ModuleType(name, module.__doc__)
+    for attr, value in vars(module).items():
+        if attr.startswith("_") or attr.startswith("plot") or attr in BLOCKED_MODULE_ATTRIBUTES:
+            continue
+        if isinstance(value, types.ModuleType):
+            continue
+        setattr(proxy, attr, value)
+    for allowed in ALLOWED_MODULES:
+        parent, _, child = allowed.rpartition(".")
+        if parent == name:
+            setattr(proxy, child, _module_proxy(allowed))
+    _module_proxies[name] = proxy
+    return proxy
+
+
+def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name not in ALLOWED_MODULES:
+        raise ImportError(f"import of {name!r} is not allowed in verification code")
+    # import a.b는 a를, from a.b import c는 a.b를 돌려줌 (builtins.__import__와 같은 규칙)
+    return _module_proxy(name if fromlist else name.split(".")[0])
+
+
+def _safe_builtins() -> Dict[str, Any]:
+    safe = {k: v for k, v in vars(builtins).items() if k not in BLOCKED_BUILTINS}
+    safe["__import__"] = _guarded_import
+    return safe
+
+
+def check_code(code: str) -> Optional[str]:
+    """
+    검증 코드에 허용되지 않는 구문이 있으면 그 이유를, 없으면 None을 반환합니다.
+
+    밑줄로 시작하는 속성, 이중 밑줄로 시작하는 이름, 이중 밑줄이 든 문자열 상수를 거부합니다.
+    (getattr·str.format 등으로 이름을 조합하는 경로는 BLOCKED_BUILTINS·BLOCKED_ATTRIBUTES로 막음)
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        # 실행 시 SyntaxError로 보고됨
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and (node.attr.startswith("_") or node.attr in BLOCKED_ATTRIBUTES):
+            return f"attribute {node.attr!r} is not allowed in verification code"
+        if isinstance(node, ast.MatchClass) and any(attr.startswith("_") for attr in node.kwd_attrs):
+            return "private attributes are not allowed in verification code"
+        if isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes)):
+            if ("__" if isinstance(node.value, str) else b"__") in node.value:
+                return "dunder names are not allowed in verification code"
+        for field in ("id", "name", "arg", "asname"):
+            value = getattr(node, field, None)
+            if isinstance(value, str) and value.startswith("__"):
+                return "dunder names are not allowed in verification code"
+        if isinstance(node, (ast.Global, ast.Nonlocal)) and any(name.startswith("__") for name in node.names):
+            return "dunder names are not allowed in verification code"
+    return None
+
+
+def _on_cpu_limit(signum, frame):
+    raise CpuTimeExceeded()
+
+
+def _vm_mb() -> Optional[float]:
+    # 현재 가상 메모리 크기 (Linux만 지원)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _set_cpu_limit(seconds: Optional[float]) -> None:
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        # RLIMIT_CPU는 프로세스 누적 시간이므로 지금까지 쓴 시간에 더해 설정
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _set_file_limit(blocked: bool) -> None:
+    # 검증 코드 실행 중에는 파일을 만들 수 없음 (워커 자신의 표현식 캐시 쓰기는 허용)
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_FSIZE)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0 if blocked else hard, hard))
+
+
+def sandbox_namespace(name: str = "__verification__") -> Dict[str, Any]:
+    return {"__builtins__": _safe_builtins(), "__name__": name}
+
+
+def run_sandboxed(
+    code: str,
+    namespace: Dict[str, Any],
+    cpu_sec: float,
+    filename: str = "<verification>",
+) -> Tuple[VerificationStatus, Optional[str], str]:
+    """
+    코드를 namespace에서 CPU 시간 제한과 파일 쓰기 차단을 건 채 실행하고 (status, error, stdout)을 반환합니다.
+
+    assert 실패는 fail, CPU 시간 초과는 timeout, 그 밖의 예외는 error입니다.
+    """
+    rejected = check_code(code)
+    if rejected is not None:
+        return VerificationStatus.ERROR, rejected, ""
+    stdout = io.StringIO()
+    status, error = VerificationStatus.PASS, None
+    _set_cpu_limit(cpu_sec)
+    _set_file_limit(True)
+    try:
+        with contextlib.redirect_stdout(stdout):
+            exec(compile(code, filename, "exec"), namespace)
+    except AssertionError as exc:
+        status, error = VerificationStatus.FAIL, str(exc) or "assertion failed"
+    except CpuTimeExceeded:
+        status, error = VerificationStatus.TIMEOUT, f"CPU time limit ({cpu_sec}s) exceeded"
+    except MemoryError:
+        status, error = VerificationStatus.ERROR, "memory limit exceeded"
+    except Exception as exc:
+        status, error = VerificationStatus.ERROR, f"{type(exc).__name__}: {exc}"
+    finally:
+        _set_file_limit(False)
+        _set_cpu_limit(None)
+        # 다음 실행이 이전 실행의 SymPy 캐시로 메모리를 잃지 않도록 정리
+        from sympy.core.cache import clear_cache
+        clear_cache()
+    return status, error, stdout.getvalue()[:MAX_STDOUT_CHARS]
+
+
+def run_verification(code: str, cpu_sec: float) -> Dict[str, Any]:
+    """
+    검증 코드를 현재 프로세스(검증 워커)에서 실행하고 {status, artifacts, stdout, error, elapsed_ms}를 반환합니다.
+
+    코드가 `artifacts` 변수를 만들면 그 값을, 아니면 출력된 줄을 artifacts로 사용합니다.
+    """
+    start = time.perf_counter()
+    namespace = sandbox_namespace()
+    status, error, output = run_sandboxed(code, namespace, cpu_sec)
+    artifacts = namespace.get("artifacts")
+    if isinstance(artifacts, (list, tuple)):
+        artifacts = [str(a) for a in artifacts]
+    else:
+        artifacts = [line for line in output.splitlines() if line.strip()]
+    return {
+        "status": status.value,
+        "artifacts": artifacts[:MAX_ARTIFACTS],
+        "stdout": output,
+        "error": error,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def run_proof_steps(steps: List[Dict[str, Any]], cpu_sec: float) -> Dict[str, Any]:
+    """
+    ProofStep 목록을 현재 프로세스(검증 워커)에서 확인합니다. step마다 CPU 시간을 제한합니다.
+
+    Returns:
+        Dict[str, Any]: {"results": step별 결과, "cache": 이번 호출의 표현식 캐시 적중 수}
+    """
+    before = expression_cache.stats()
+    results = []
+    for step in steps:
+        _set_cpu_limit(cpu_sec)
+        try:
+            results.append(verify_step(step))
+        except CpuTimeExceeded:
+            results.append({
+                "step": step.get("step"),
+                "status": VerificationStatus.TIMEOUT.value,
+                "error": f"CPU time limit ({cpu_sec}s) exceeded",
+                "elapsed_ms": cpu_sec * 1000,
+            })
+        finally:
+            _set_cpu_limit(None)
+    expression_cache.flush()
+    after = expression_cache.stats()
+    return {
+        "results": results,
+        "cache": {k: after[k] - before[k] for k in ("memory_hits", "disk_hits", "misses")},
+    }
+
+
+def _restrict_sympy() -> None:
+    # sympify("...")와 parse_expr가 eval하는 문자열도 토큰 검사를 거쳐 내장 함수 없는 이름공간에서만 평가되도록 교체
+    import sympy
+    import sympy.parsing
+    import sympy.parsing.sympy_parser
+
+    for module in (sympy, sympy.parsing, sympy.parsing.sympy_parser):
+        module.parse_expr = restricted_parse_expr
+
+
+def setup_sandbox_worker() -> None:
+    """
+    샌드박스 워커 프로세스 시작 시 호출합니다.
+
+    SymPy를 미리 import하고 문자열 파싱을 제한한 뒤, 운영체제 수준 격리(harden_process: 환경 변수 삭제,
+    네트워크 분리, 권한 없는 사용자 전환, seccomp)와 CPU 시간 초과 신호, 메모리 제한을 설정합니다.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import sympy  # noqa: F401  (import 비용을 워커 시작 시 미리 치름)
+
+    _restrict_sympy()
+    for name in ALLOWED_MODULES:
+        _module_proxy(name)
+    expression_cache.open()
+    harden_process()
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        baseline = _vm_mb()
+        if baseline is not None:
+            limit = int((baseline + settings.VERIFY_MEMORY_MB) * 1024 ** 2)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _verify_worker_main(conn, spawned_at: float, max_tasks: int, max_rss_mb: int) -> None:
+    """
+    SymPy 검증 워커 프로세스 본체. SymPy를 미리 import한 뒤 메모리 제한을 걸고 작업을 받습니다.
+    """
+    setup_sandbox_worker()
+
+    def run_task(kind: str, args: tuple) -> Any:
+        if kind == "verify":
+            return run_verification(*args)
+        if kind == "proof_steps":
+            return run_proof_steps(*args)
+        raise ValueError(f"Unknown verification worker task: {kind}")
+
+    serve_tasks(conn, spawned_at, ["sympy"], run_task, max_tasks, 0)
+
+
+class VerificationPool:
+    """
+    verification.sympy.code를 샌드박스 워커 프로세스에서 실행하는 풀
+
+    워커는 SymPy를 미리 import해 두고(WarmWorkerPool 재사용), 실행마다 CPU 시간(RLIMIT_CPU)과
+    메모리(RLIMIT_AS) 제한을 겁니다. 벽시계 시간 제한을 넘기면 워커를 강제 종료하고 새로 띄우므로
+    simplify가 멈추지 않아도 API 이벤트 루프와 다른 검증은 영향을 받지 않습니다.
+    import는 허용 목록의 수학 모듈(공개 이름만 담은 대리 모듈)만 가능하고, 워커는 환경 변수·네트워크 없이
+    권한 없는 사용자와 seccomp 필터 아래에서 실행됩니다. (setup_sandbox_worker)
+    """
+
+    def __init__(self, size: int):
+        self.workers = WarmWorkerPool(
+            size,
+            settings.VERIFY_WORKER_MAX_TASKS,
+            0,
+            target=_verify_worker_main,
+            label="verification",
+        )
+        self.counts: Dict[str, int] = {status.value: 0 for status in VerificationStatus}
+        self.step_counts: Dict[str, int] = {status.value: 0 for status in VerificationStatus}
+        # 수치 비교만으로 끝난 step과 기호 비교까지 간 step 수
+        self.method_counts: Dict[str, int] = {"numeric": 0, "symbolic": 0}
+        # 워커 프로세스들의 표현식 캐시 적중 수 합계
+        self.cache_counts: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def start(self) -> None:
+        self.workers.start()
+
+    async def warm(self) -> None:
+        # 저장된 판정을 미리 메모리에 올림 (실패해도 검증은 디스크 조회로 동작)
+        try:
+            await asyncio.to_thread(verification_store.warm)
+        except Exception as exc:
+            logger.warning(f"Verification store warmup failed: {exc}")
+
+    async def verify(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        검증 코드를 실행합니다. 시간 초과·워커 크래시도 예외 대신 status로 반환합니다.
+        """
+        timeout = timeout or settings.VERIFY_TIMEOUT_SEC
+        start = time.perf_counter()
+        try:
+            result = await self.workers.call("verify", (code, settings.VERIFY_CPU_SEC), timeout)
+        except TransientError:
+            result = {
+                "status": VerificationStatus.TIMEOUT.value,
+                "artifacts": [],
+                "stdout": "",
+                "error": f"wall-clock time limit ({timeout}s) exceeded",
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        except Exception as exc:
+            logger.warning(f"Verification worker failed: {exc}")
+            result = {
+                "status": VerificationStatus.ERROR.value,
+                "artifacts": [],
+                "stdout": "",
+                "error": str(exc),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        self.counts[result["status"]] += 1
+        return result
+
+    async def _verify_batch(self, steps: List[Dict[str, Any]], timeout: float) -> List[Dict[str, Any]]:
+        try:
+            payload = await self.workers.call("proof_steps", (steps, settings.VERIFY_CPU_SEC), timeout)
+        except TransientError:
+            if len(steps) > 1:
+                # 어느 step이 멈췄는지 모르므로 하나씩 다시 실행
+                return [result for step in steps for result in await self._verify_batch([step], timeout)]
+            return [{
+                "step": steps[0].get("step"),
+                "status": VerificationStatus.TIMEOUT.value,
+                "error": f"wall-clock time limit ({timeout}s) exceeded",
+                "elapsed_ms": timeout * 1000,
+            }]
+        for key, value in payload["cache"].items():
+            self.cache_counts[key] += value
+        return payload["results"]
+
+    async def verify_steps(
+        self,
+        steps: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        use_store: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        ProofStep(expr_in → expr_out) 목록을 여러 워커에 나눠 확인하고 입력 순서대로 결과를 반환합니다.
+
+        판정 저장소에 있는 step은 워커에 보내지 않고 저장된 판정을 돌려주며(cached=True), 새 판정은 저장합니다.
+        use_store=False면 저장된 판정을 읽지 않고 모두 다시 검증합니다.
+        """
+        timeout = timeout or settings.VERIFY_TIMEOUT_SEC
+        keys = [step_hash(step) for step in steps]
+        stored = await asyncio.to_thread(verification_store.get_many, keys) if use_store else {}
+        # 같은 목록 안의 중복 step도 한 번만 검증
+        pending: Dict[str, Dict[str, Any]] = {}
+        for key, step in zip(keys, steps):
+            if key not in stored:
+                pending.setdefault(key, step)
+
+        todo = list(pending.values())
+        batches = [todo[i:i + STEP_BATCH_SIZE] for i in range(0, len(todo), STEP_BATCH_SIZE)]
+        results = await asyncio.gather(*(self._verify_batch(batch, timeout) for batch in batches))
+        fresh = dict(zip(pending, (result for batch in results for result in batch)))
+        if fresh:
+            await asyncio.to_thread(verification_store.put_many, fresh)
+        for result in fresh.values():
+            self.step_counts[result["status"]] += 1
+            if result.get("method") in self.method_counts:
+                self.method_counts[result["method"]] += 1
+
+        flat = []
+        for key, step in zip(keys, steps):
+            if key in fresh:
+                flat.append({**fresh[key], "step": step.get("step"), "cached": False})
+            else:
+                flat.append({"step": step.get("step"), **stored[key], "elapsed_ms": 0, "cached": True})
+        return flat
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.workers.snapshot(),
+            "results": dict(self.counts),
+            "proof_steps": {**self.step_counts, "methods": dict(self.method_counts)},
+            "expression_cache": cache_stats(**self.cache_counts),
+            "result_store": verification_store.stats(),
+        }
+
+    def shutdown(self) -> None:
+        self.workers.shutdown()
+
+
+verification_pool = VerificationPool(settings.VERIFY_WORKERS or os.cpu_count() or 1)
@@ -0,0 +1,162 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import sympy as sp
+
+from app.utils.expressions import normalize_expression, parse_expression
+
+# 초기 균등 샘플 수와 적응 세분화 최대 단계 (최소 간격 = 구간 / (INITIAL_SAMPLES * 2^MAX_DEPTH))
+INITIAL_SAMPLES = 64
+MAX_DEPTH = 8
+# 허용 오차 (축 범위 대비 비율): 세분화 기준이자 RDP 단순화 epsilon
+DEFAULT_TOLERANCE = 1e-3
+# 최소 간격까지 세분화한 구간에서 y가 이 비율 이상 튀면 불연속(계단, 점근선)으로 보고 선을 끊음
+JUMP_FRACTION = 0.02
+PRECISION = 4
+
+Segment = List[List[float]]
+
+
+def _evaluate(f, xs: np.ndarray) -> np.ndarray:
+    with np.errstate(all="ignore"):
+        ys = np.asarray(f(xs))
+    if ys.shape != xs.shape:
+        # 상수 함수는 스칼라를 반환
+        ys = np.broadcast_to(ys, xs.shape)
+    if np.iscomplexobj(ys):
+        ys = np.where(np.abs(ys.imag) < 1e-12, ys.real, np.nan)
+    return ys.astype(float)
+
+
+def _rdp(points: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Ramer–Douglas–Peucker 단순화 (정규화 좌표 기준)
+    """
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > epsilon:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return points[keep]
+
+
+@lru_cache(maxsize=1024)
+def _sample_cached(
+    expression: str,
+    x_range: Tuple[float, float],
+    y_range: Optional[Tuple[float, float]],
+    tolerance: float,
+) -> Tuple[Tuple[Tuple[float, float], ...], ...]:
+    expr = parse_expression(expression)
+    symbols = sorted(expr.free_symbols, key=lambda s: s.name)
+    if len(symbols) > 1:
+        raise ValueError(f"Expected a single variable: {expression!r}")
+    f = sp.lambdify(symbols or [sp.Symbol("x")], expr, "numpy")
+
+    lo, hi = x_range
+    xs = np.linspace(lo, hi, INITIAL_SAMPLES + 1)
+    ys = _evaluate(f, xs)
+
+    # y 스케일: 축 범위가 있으면 그것을, 없으면 초기 샘플의 분포로 추정
+    if y_range is not None:
+        y_lo, y_hi = y_range
+        span = (y_hi - y_lo) or 1.0
+        window = (y_lo - span, y_hi + span)
+    else:
+        finite = ys[np.isfinite(ys)]
+        span = float(np.ptp(np.percentile(finite, [5, 95]))) if finite.size else 1.0
+        span = span or 1.0
+        window = (-np.inf, np.inf)
+
+    def valid(values: np.ndarray) -> np.ndarray:
+        return np.isfinite(values) & (values >= window[0]) & (values <= window[1])
+
+    for _ in range(MAX_DEPTH):
+        ok = valid(ys)
+        mid = (xs[:-1] + xs[1:]) / 2
+        y_mid = _evaluate(f, mid)
+        ok_mid = valid(y_mid)
+        both = ok[:-1] & ok[1:]
+        err = np.abs(y_mid - (ys[:-1] + ys[1:]) / 2) / span
+        refine = (both & ok_mid & (err > tolerance))
+        # 정의역 경계·창 밖으로 나가는 지점, 양 끝은 정의되지만 가운데가 구멍인 구간
+        refine |= ok[:-1] != ok[1:]
+        refine |= both & ~ok_mid
+        if not refine.any():
+            break
+        at = np.nonzero(refine)[0] + 1
+        xs = np.insert(xs, at, mid[refine])
+        ys = np.insert(ys, at, y_mid[refine])
+
+    ok = valid(ys)
+    min_dx = (hi - lo) / (INITIAL_SAMPLES * 2 ** MAX_DEPTH)
+    jump = (np.diff(xs) <= min_dx * 1.5) & (np.abs(np.diff(ys)) / span > JUMP_FRACTION)
+    segments = []
+    start = None
+    for i in range(len(xs)):
+        if not ok[i]:
+            if start is not None and i - start >= 2:
+                segments.append((start, i))
+            start = None
+            continue
+        if start is None:
+            start = i
+        if i + 1 < len(xs) and jump[i]:
+            if i + 1 - start >= 2:
+                segments.append((start, i + 1))
+            start = None
+    if start is not None and len(xs) - start >= 2:
+        segments.append((start, len(xs)))
+
+    x_span = (hi - lo) or 1.0
+    result = []
+    for s, e in segments:
+        points = np.column_stack(((xs[s:e] - lo) / x_span, ys[s:e] / span))
+        simplified = _rdp(points, tolerance)
+        result.append(tuple(
+            (round(float(x * x_span + lo), PRECISION), round(float(y * span), PRECISION))
+            for x, y in simplified
+        ))
+    return tuple(result)
+
+
+def sample_curve(
+    expression: str,
+    x_range: Sequence[float],
+    y_range: Optional[Sequence[float]] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Segment]:
+    """
+    함수 그래프를 NumPy로 한꺼번에 평가해 [[x, y], ...] 구간 목록으로 반환합니다.
+
+    곡률이 큰 곳과 불연속점 근처는 적응적으로 세분화하고, RDP로 점 수를 줄입니다.
+    정의되지 않거나 y_range에서 크게 벗어나는 곳, 불연속점에서는 구간을 나눕니다.
+    결과는 (정규화된 수식, 범위, 허용 오차) 기준으로 캐시합니다.
+
+    Raises:
+        ValueError: 수식을 해석할 수 없거나 변수가 두 개 이상인 경우
+    """
+    key_x = (float(x_range[0]), float(x_range[1]))
+    key_y = (float(y_range[0]), float(y_range[1])) if y_range is not None else None
+    segments = _sample_cached(normalize_expression(expression), key_x, key_y, float(tolerance))
+    return [[list(point) for point in segment] for segment in segments]
@@ -0,0 +1,180 @@
+import io
+import keyword
+import re
+import tokenize
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import sympy as sp
+from sympy.parsing.sympy_parser import (
+    convert_equals_signs,
+    convert_xor,
+    function_exponentiation,
+    implicit_application,
+    implicit_multiplication,
+    implicit_multiplication_application,
+    parse_expr,
+    rationalize,
+    split_symbols,
+    standard_transformations,
+)
+
+_TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application, convert_xor)
+# restricted_parse_expr에 넘길 수 있는 변환 규칙 (sympify가 쓰는 규칙 포함)
+_ALLOWED_TRANSFORMATIONS = frozenset(standard_transformations + (
+    convert_equals_signs, convert_xor, function_exponentiation, implicit_application,
+    implicit_multiplication, implicit_multiplication_application, rationalize, split_symbols,
+))
+
+# 수식에 쓰이는 문자만 허용 (따옴표·콜론·@ 등은 거부)
+_SAFE_EXPR = re.compile(r"^[0-9A-Za-z_+\-*/^()\[\]{}.,=<>!\s]+$")
+# 허용 문자·이름 규칙이나 파싱 오류 구분이 바뀌면 올립니다. (표현식 캐시에 저장된 이전 결과를 쓰지 않도록)
+PARSER_VERSION = 3
+# 식 길이 상한 (아주 긴 식의 파싱 비용 제한)
+MAX_EXPRESSION_LENGTH = 1000
+
+# parse_expr가 eval할 때 쓰는 이름공간. 파이썬 내장 함수는 두지 않고 수학 함수·상수와
+# 변환 규칙이 만들어 내는 생성자(Integer, Symbol 등)만 둡니다. 그 밖의 이름은 기호(Symbol/Function)가 됨
+_FUNCTIONS = (
+    "sin", "cos", "tan", "cot", "sec", "csc", "asin", "acos", "atan", "acot", "atan2",
+    "sinh", "cosh", "tanh", "asinh", "acosh", "atanh",
+    "exp", "log", "sqrt", "cbrt", "root", "Abs", "sign", "floor", "ceiling",
+    "factorial", "binomial", "gamma", "Min", "Max", "re", "im", "conjugate", "arg",
+    "Eq", "Ne", "Lt", "Le", "Gt", "Ge", "Piecewise",
+    "diff", "integrate", "limit", "Derivative", "Integral", "Limit", "Sum", "summation",
+    "pi", "E", "I", "oo", "zoo", "nan",
+    "Integer", "Float", "Rational", "Symbol", "Function",
+)
+_GLOBALS: Dict[str, Any] = {name: getattr(sp, name) for name in _FUNCTIONS}
+_GLOBALS.update({"ln": sp.log, "abs": sp.Abs, "min": sp.Min, "max": sp.Max, "__builtins__": {}})
+
+# 계산 비용에 상한이 없는 미적분 함수 (정규화용 이름공간에서 제외하고 기호 함수로 둠)
+_CALCULUS = {"diff", "integrate", "limit", "Derivative", "Integral", "Limit", "Sum", "summation"}
+# 식을 계산하지 않고 그대로 두는 생성자·상수
+_LITERALS = {"Symbol", "Function", "pi", "E", "I", "oo", "zoo", "nan", "__builtins__"}
+# 숫자 생성자 (auto_number가 쓰는 리터럴 인자만 받음. Integer(9**9**8)처럼 식을 받으면 값을 계산하게 됨)
+_NUMBERS = {"Integer", "Float", "Rational"}
+
+
+def _unevaluated(func: Any) -> Any:
+    def build(*args: Any, **kwargs: Any) -> Any:
+        return func(*args, **{**kwargs, "evaluate": False})
+    return build
+
+
+def _literal_only(func: Any) -> Any:
+    inert = sp.Function(func.__name__)
+
+    def build(*args: Any) -> Any:
+        if all(isinstance(arg, (int, float, str)) for arg in args):
+            return func(*args)
+        return inert(*args)
+    return build
+
+
+def _normalize_entry(name: str, value: Any) -> Any:
+    if name in _LITERALS:
+        return value
+    if name in _NUMBERS:
+        return _literal_only(value)
+    if name in _CALCULUS:
+        return sp.Function(name)
+    return _unevaluated(value)
+
+
+# normalize_expression(해시·캐시 키)용 이름공간. API 프로세스에서 제한 없이 실행되므로 식을 계산하지 않고
+# (evaluate=False) 모양만 정규화합니다. "9**9**8", "factorial(10**7)" 같은 입력도 계산하지 않음
+_NORMALIZE_GLOBALS: Dict[str, Any] = {name: _normalize_entry(name, value) for name, value in _GLOBALS.items()}
+_NORMALIZE_GLOBALS.update({name: _unevaluated(getattr(sp, name)) for name in ("Add", "Mul", "Pow")})
+
+
+class ExpressionSyntaxError(ValueError):
+    """입력 문자열만으로 정해지는 파싱 오류 (허용되지 않는 문자·토큰, 문법 오류)"""
+
+
+def _check_tokens(text: str) -> None:
+    # 속성 접근(x.attr), 파이썬 키워드(lambda, for 등), 밑줄로 시작하는 이름은 거부
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError) as exc:
+        raise ExpressionSyntaxError(f"Unsupported expression: {text!r}") from exc
+    for token in tokens:
+        if token.type == tokenize.OP and token.string == ".":
+            raise ExpressionSyntaxError(f"Attribute access is not allowed in expressions: {text!r}")
+        if token.type == tokenize.NAME and (keyword.iskeyword(token.string) or token.string.startswith("_")):
+            raise ExpressionSyntaxError(f"Name {token.string!r} is not allowed in expressions")
+        if token.type == tokenize.ERRORTOKEN and token.string == "!":
+            # 계승 표기(3!)는 파이썬 토큰이 아니므로 그대로 둠 (factorial_notation 변환이 처리)
+            continue
+        if token.type not in (tokenize.NAME, tokenize.NUMBER, tokenize.OP, tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER):
+            raise ExpressionSyntaxError(f"Unsupported expression: {text!r}")
+
+
+def _check_expression(expr: str) -> str:
+    text = " ".join(expr.split())
+    if not text or len(text) > MAX_EXPRESSION_LENGTH or not _SAFE_EXPR.match(text):
+        raise ExpressionSyntaxError(f"Unsupported expression: {expr!r}")
+    _check_tokens(text)
+    return text
+
+
+def parse_expression(expr: str) -> sp.Basic:
+    """
+    "x^2-4x+3" 같은 교과서식 수식 문자열을 SymPy 식으로 파싱합니다.
+
+    parse_expr는 내부적으로 eval을 사용하므로 토큰을 먼저 검사하고, 파이썬 내장 함수가 없는
+    이름공간(_GLOBALS)에서만 평가합니다.
+
+    Raises:
+        ExpressionSyntaxError: 허용되지 않는 문자·이름이 있거나 문법이 틀린 경우
+        ValueError: 그 밖의 이유로 파싱할 수 없는 경우
+    """
+    text = _check_expression(expr)
+    try:
+        return parse_expr(text, local_dict={}, global_dict=dict(_GLOBALS), transformations=_TRANSFORMATIONS, evaluate=True)
+    except (SyntaxError, tokenize.TokenError) as exc:
+        raise ExpressionSyntaxError(f"Cannot parse expression {expr!r}: {exc}") from exc
+    except Exception as exc:
+        raise ValueError(f"Cannot parse expression {expr!r}: {exc}") from exc
+
+
+def restricted_parse_expr(
+    s: str,
+    local_dict: Optional[Dict[str, Any]] = None,
+    transformations: Any = standard_transformations,
+    global_dict: Optional[Dict[str, Any]] = None,
+    evaluate: bool = True,
+) -> sp.Basic:
+    """
+    샌드박스 워커에서 sympy_parser.parse_expr 대신 쓰는 함수입니다. (sympify("...")도 이 함수를 거침)
+
+    parse_expression과 같은 토큰 검사를 하고, 호출한 쪽이 넘긴 global_dict는 무시한 채 _GLOBALS에서만 평가합니다.
+    """
+    if not isinstance(s, str):
+        raise ValueError(f"Unsupported expression: {s!r}")
+    if isinstance(transformations, str) or any(t not in _ALLOWED_TRANSFORMATIONS for t in transformations):
+        raise ValueError("Custom parser transformations are not allowed")
+    return parse_expr(
+        _check_expression(s),
+        local_dict=dict(local_dict or {}),
+        transformations=tuple(transformations),
+        global_dict=dict(_GLOBALS),
+        evaluate=evaluate,
+    )
+
+
+@lru_cache(maxsize=4096)
+def normalize_expression(expr: str) -> str:
+    """
+    수식 문자열을 SymPy로 파싱해 정규화된 문자열로 변환합니다.
+
+    "x^2-4x+3"과 "x**2 - 4*x + 3"은 같은 결과를 냅니다. 식은 계산하지 않으므로(evaluate=False)
+    항 순서·표기 차이만 없어지고 x+x와 2*x는 다른 문자열입니다. 파싱할 수 없는 문자열은
+    공백만 정리해 그대로 사용합니다.
+    """
+    try:
+        text = _check_expression(expr)
+        parsed = parse_expr(text, local_dict={}, global_dict=dict(_NORMALIZE_GLOBALS), transformations=_TRANSFORMATIONS, evaluate=False)
+        return sp.sstr(parsed, order="lex")
+    except Exception:
+        return " ".join(expr.split())
@@ -0,0 +1,115 @@
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """
+    RFC 6902 패치를 적용할 수 없는 경우
+    """
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    # RFC 6901 JSON Pointer
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(doc: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Operation on the document root is not supported")
+    target = doc
+    for token in tokens[:-1]:
+        target = _get_child(target, token)
+    return target, tokens[-1]
+
+
+def _get_child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path not found: {token!r}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token)]
+    raise JsonPatchError(f"Cannot traverse into {type(container).__name__}")
+
+
+def _get(doc: Any, pointer: str) -> Any:
+    target = doc
+    for token in _parse_pointer(pointer):
+        target = _get_child(target, token)
+    return target
+
+
+def _add(doc: Any, pointer: str, value: Any) -> None:
+    parent, token = _resolve_parent(doc, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to {type(parent).__name__}")
+
+
+def _remove(doc: Any, pointer: str) -> Any:
+    parent, token = _resolve_parent(doc, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: {pointer!r}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__}")
+
+
+def apply_patch(doc: Dict[str, Any], patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    RFC 6902 JSON Patch를 적용한 새 문서를 반환합니다. (원본은 변경하지 않음)
+
+    하나의 연산이라도 실패하면 JsonPatchError를 발생시키고 아무것도 적용하지 않습니다.
+    """
+    result = copy.deepcopy(doc)
+    for i, operation in enumerate(patch):
+        op = operation.get("op")
+        path = operation.get("path")
+        if not isinstance(path, str):
+            raise JsonPatchError(f"Operation {i}: missing 'path'")
+        try:
+            if op == "add":
+                _add(result, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                _remove(result, path)
+            elif op == "replace":
+                _remove(result, path)
+                _add(result, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                from_path = operation["from"]
+                if path.startswith(from_path + "/"):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                _add(result, path, _remove(result, from_path))
+            elif op == "copy":
+                _add(result, path, copy.deepcopy(_get(result, operation["from"])))
+            elif op == "test":
+                if _get(result, path) != operation["value"]:
+                    raise JsonPatchError(f"Test failed at {path!r}")
+            else:
+                raise JsonPatchError(f"Unsupported op: {op!r}")
+        except KeyError as exc:
+            raise JsonPatchError(f"Operation {i} ({op}): missing {exc.args[0]!r}") from exc
+        except JsonPatchError as exc:
+            raise JsonPatchError(f"Operation {i} ({op}): {exc}") from exc
+    return result
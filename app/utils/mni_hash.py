@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import math
+import re
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.utils.expressions import normalize_expression
+
+# 해시 규칙이 바뀌면 올립니다. (기존 캐시 키와 섞이지 않도록 hash_key에 포함)
+HASH_VERSION = 4
+
+T = TypeVar("T")
+
+
+class HashTimeoutError(ValueError):
+    """hash_key 계산이 MNI_HASH_TIMEOUT_SEC 안에 끝나지 않음"""
+
+# MVP 문자열 step의 변환 표기 ("x^2-4x+3 -> (x-2)^2-1")
+_ARROW = re.compile(r"\s*(?:->|=>|→|⇒)\s*")
+
+# 해시에 포함하지 않는 (렌더링에 영향이 없는) 단계 필드
+_NON_RENDER_STEP_KEYS = {"comment", "note", "notes"}
+
+
+def _normalize_number(value: float) -> Any:
+    if math.isnan(value) or math.isinf(value):
+        return str(value)
+    if float(value).is_integer():
+        return int(value)
+    # 부동소수점 표현 차이(0.1+0.2 등)를 흡수
+    return float(format(value, ".12g"))
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return _normalize_number(value)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, Enum):
+        return _canonical(value.value)
+    return str(value)
+
+
+def _canonical_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {k: v for k, v in step.items() if k not in _NON_RENDER_STEP_KEYS}
+    # VisualStep 형태({action, params})와 평탄한 형태({action, ...payload})를 같게 취급
+    params = payload.pop("params", None)
+    if isinstance(params, dict):
+        payload = {**params, **payload}
+    if isinstance(payload.get("function"), str):
+        payload["function"] = normalize_expression(payload["function"])
+    return _canonical(payload)
+
+
+def mvp_step_fields(step: str) -> Dict[str, str]:
+    """
+    MVP 문자열 step을 {rule, expr_in, expr_out}으로 나눕니다. (Full 형식 변환과 해시가 같은 규칙을 씀)
+
+    "a -> b"는 rewrite, 변환 쌍이 없는 문자열은 같은 식의 given입니다.
+    """
+    parts = _ARROW.split(step.strip(), maxsplit=1)
+    if len(parts) == 2 and parts[0] and parts[1]:
+        return {"rule": "rewrite", "expr_in": parts[0], "expr_out": parts[1]}
+    return {"rule": "given", "expr_in": step.strip(), "expr_out": step.strip()}
+
+
+def _canonical_proof_step(step: Any) -> Any:
+    # 문자열 step은 Full 형식으로 바꾼 객체와 같은 모양으로 정규화 (형식 변환으로 hash_key가 바뀌지 않도록)
+    if isinstance(step, str):
+        step = mvp_step_fields(step)
+    return {
+        "rule": _canonical(step.get("rule")),
+        "expr_in": normalize_expression(step.get("expr_in", "")),
+        "expr_out": normalize_expression(step.get("expr_out", "")),
+    }
+
+
+def _canonical_options(mni: Dict[str, Any]) -> Dict[str, Any]:
+    # BuildOptions 기본값을 채워 생략된 필드와 기본값을 같은 것으로 취급
+    options = {"fps": 30, "resolution": "1400x800", "theme": "dark"}
+    build = mni.get("build") or {}
+    options.update(build.get("options") or {})
+    return _canonical(options)
+
+
+def canonical_dumps(value: Any) -> str:
+    """
+    정렬된 키와 고정 구분자로 직렬화합니다. (프로세스·버전과 무관하게 같은 문자열)
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(canonical_dumps(value).encode("utf-8")).hexdigest()
+
+
+def canonical_render_payload(mni: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    .mni에서 렌더링에 영향을 주는 필드만 추려 정규화합니다.
+
+    문제ID + 정규화 수식(proof_tape) + visual + build.options만 포함하며
+    statement/metadata/verification/notes/metrics/build.hash_key/created_at 등은 제외합니다.
+    """
+    visual = mni.get("visual") or {}
+    return {
+        "problem_id": (mni.get("problem") or {}).get("id"),
+        "proof_tape": [_canonical_proof_step(s) for s in mni.get("proof_tape") or []],
+        "visual": {
+            "type": visual.get("type", "ManimScene"),
+            "sections": [
+                {
+                    "section_name": _canonical(section.get("section_name")),
+                    "steps": [_canonical_step(s) for s in section.get("steps") or []],
+                }
+                for section in visual.get("sections") or []
+            ],
+        },
+        "options": _canonical_options(mni),
+    }
+
+
+def compute_hash_key(mni: Dict[str, Any]) -> str:
+    """
+    .mni의 build.hash_key를 계산합니다. 형식: "{문제ID}:{sha256 32자}:v{HASH_VERSION}"
+    """
+    payload = canonical_render_payload(mni)
+    return f"{payload['problem_id']}:{_digest(payload)[:32]}:v{HASH_VERSION}"
+
+
+def compute_section_hash(section: Dict[str, Any], options: Optional[Dict[str, Any]] = None, visual_type: str = "ManimScene") -> str:
+    """
+    visual.sections[] 한 개의 해시를 계산합니다. (섹션 단위 캐시·증분 렌더 기준)
+    """
+    payload = {
+        "section_name": _canonical(section.get("section_name")),
+        "steps": [_canonical_step(s) for s in section.get("steps") or []],
+        "options": _canonical_options({"build": {"options": options or {}}}),
+        "type": visual_type,
+        "v": HASH_VERSION,
+    }
+    return _digest(payload)[:32]
+
+
+async def run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """
+    compute_hash_key를 부르는 작업(해시·키프레임 캐시 조회 등)을 이벤트 루프 밖 스레드에서 시간 제한을 두고 실행합니다.
+
+    시간을 넘기면 HashTimeoutError를 냅니다. 스레드는 강제로 멈출 수 없으므로 응답만 먼저 돌려주며,
+    정규화가 식을 계산하지 않으므로(evaluate=False) 이 제한은 예상 못 한 입력에 대한 안전장치입니다.
+    """
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(func, *args), settings.MNI_HASH_TIMEOUT_SEC)
+    except asyncio.TimeoutError as exc:
+        raise HashTimeoutError(f"hash_key computation exceeded {settings.MNI_HASH_TIMEOUT_SEC}s") from exc
@@ -0,0 +1,85 @@
+import copy
+from typing import Any, Dict, List, Optional
+
+from app.schemas.mni import SchemaVersion
+from app.utils.mni_hash import compute_hash_key, mvp_step_fields
+
+# 변환 규칙이 바뀌면 올립니다. (체크포인트와 provenance.migrations에 기록)
+MIGRATION_VERSION = 1
+
+# Full 스키마에서 추가된 확장 필드의 기본값 (metrics는 작업마다 새로 채우므로 제외)
+_EXTENSIONS: Dict[str, Any] = {
+    "publish": {"targets": []},
+    "i18n": {},
+    "assets": {},
+    "provenance": {},
+}
+
+
+def _promote_step(step: Any, position: int) -> Any:
+    if isinstance(step, dict):
+        if "step" in step:
+            return step
+        return {"step": position, **step}
+    if not isinstance(step, str):
+        return step
+    # 변환 쌍이 없는 문자열은 주어진 식(given)으로 둠 (같은 식이므로 검증 결과에 영향 없음)
+    return {"step": position, **mvp_step_fields(step)}
+
+
+def _promote_cell(cell: Any, position: int) -> Any:
+    if isinstance(cell, str):
+        return {"id": f"c{position}", "source": cell}
+    return cell
+
+
+def migrate_mni(mni: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    MVP .mni를 Full 형식으로 변환한 새 dict를 반환합니다. (.mni.txt의 MVP → Full 전환 규칙)
+
+    - proof_tape: 문자열 step → {step, rule, expr_in, expr_out} 객체
+    - verification.sympy: 문자열 → {code, status, artifacts}
+    - structure.pot.cells: 문자열 셀 → {id, source}
+    - structure(tot/pot), publish, i18n, assets, provenance 확장 필드 추가
+
+    이미 Full 형식인 파일은 그대로 돌려주므로 여러 번 적용해도 결과가 같습니다.
+    바뀐 내용이 있을 때만 provenance.migrations에 기록합니다. 렌더 결과는 같으므로 build.hash_key는 그대로 둡니다.
+
+    Raises:
+        ValueError: 변환 전후의 hash_key가 다른 경우 (변환 규칙과 해시 정규화가 어긋난 경우)
+    """
+    migrated = copy.deepcopy(mni)
+    source_version: Optional[str] = migrated.get("schema_version")
+    migrated["schema_version"] = SchemaVersion.FULL.value
+
+    proof_tape = migrated.get("proof_tape")
+    if isinstance(proof_tape, list):
+        migrated["proof_tape"] = [_promote_step(step, i + 1) for i, step in enumerate(proof_tape)]
+
+    verification = migrated.get("verification")
+    if isinstance(verification, dict) and isinstance(verification.get("sympy"), str):
+        verification["sympy"] = {"code": verification["sympy"], "status": None, "artifacts": []}
+
+    structure = migrated.get("structure")
+    if not isinstance(structure, dict):
+        structure = migrated["structure"] = {}
+    if not isinstance(structure.get("tot"), dict):
+        structure["tot"] = {"nodes": [], "edges": []}
+    pot = structure.get("pot")
+    if not isinstance(pot, dict):
+        pot = structure["pot"] = {"lang": "python", "cells": []}
+    cells: List[Any] = pot.get("cells") or []
+    pot["cells"] = [_promote_cell(cell, i + 1) for i, cell in enumerate(cells)]
+
+    for key, default in _EXTENSIONS.items():
+        if not isinstance(migrated.get(key), dict):
+            migrated[key] = copy.deepcopy(default)
+
+    if migrated == mni:
+        return migrated
+    before, after = compute_hash_key(mni), compute_hash_key(migrated)
+    if before != after:
+        raise ValueError(f"Migration would change hash_key ({before} -> {after})")
+    migrations = migrated["provenance"].setdefault("migrations", [])
+    migrations.append({"from": source_version, "to": SchemaVersion.FULL.value, "version": MIGRATION_VERSION})
+    return migrated
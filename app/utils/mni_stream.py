@@ -0,0 +1,291 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 원소 하나씩 나눠 읽는 배열 (그 밖의 값은 통째로 읽음)
+SPLIT_PATHS: Tuple[Tuple[str, ...], ...] = (
+    ("proof_tape",),
+    ("visual", "sections"),
+    ("structure", "tot", "nodes"),
+    ("structure", "tot", "edges"),
+    ("structure", "pot", "cells"),
+)
+
+# (경로, 값) 예: (("problem",), {...}), (("proof_tape", 3), {...}), (("visual", "sections", 0), {...})
+Path = Tuple[Any, ...]
+MniElement = Tuple[Path, Any]
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[ \t\r\n,\]}]")
+_DECODER = json.JSONDecoder()
+# 조각 경계에서 잘릴 수 있는 가장 긴 토큰 조각 (fals, \u12 등)
+_MAX_PARTIAL_TOKEN = 6
+
+
+class MniStreamError(ValueError):
+    """
+    .mni 바이트 스트림이 올바른 JSON 객체가 아닌 경우
+    """
+
+
+class _Frame:
+    # 원소 단위로 내려가 읽는 객체/배열
+    __slots__ = ("path", "is_array", "state", "key", "index")
+
+    def __init__(self, path: Path, is_array: bool):
+        self.path = path
+        self.is_array = is_array
+        self.state = "first"
+        self.key: Optional[str] = None
+        self.index = 0
+
+
+class MniStreamParser:
+    """
+    .mni 증분 파서
+
+    바이트 조각을 feed()로 넣으면 그때까지 다 읽은 원소를 (경로, 값)으로 반환합니다.
+    SPLIT_PATHS의 배열은 원소 하나씩, 나머지 값(problem, verification 등)은 통째로 반환하고,
+    나눠 읽는 배열과 그 상위 객체는 열리는 시점에 빈 값([] / {})으로 먼저 알립니다.
+    이미 반환한 부분은 버퍼에서 지우므로 메모리는 가장 큰 원소 하나(+ 조각 하나) 크기로 제한됩니다.
+    """
+
+    def __init__(self, split_paths: Iterable[Tuple[str, ...]] = SPLIT_PATHS):
+        split_paths = [tuple(path) for path in split_paths]
+        self._split = set(split_paths)
+        self._descend = {path[:i] for path in split_paths for i in range(1, len(path))}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._done = False
+        # 읽는 중인 값: [경로, 시작 위치, 마지막으로 디코딩을 시도한 길이]
+        self._capture: Optional[List[Any]] = None
+        self.bytes_read = 0
+        self.max_buffered = 0
+
+    def feed(self, chunk: bytes) -> List[MniElement]:
+        self.bytes_read += len(chunk)
+        try:
+            self._buf += self._decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            raise MniStreamError(f"Invalid UTF-8 in .mni stream: {exc}") from exc
+        return self._drain(False)
+
+    def close(self) -> List[MniElement]:
+        """
+        남은 원소를 반환합니다.
+
+        Raises:
+            MniStreamError: 스트림이 객체 중간에서 끝난 경우
+        """
+        try:
+            self._buf += self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as exc:
+            raise MniStreamError(f"Invalid UTF-8 in .mni stream: {exc}") from exc
+        elements = self._drain(True)
+        if not self._done:
+            raise MniStreamError(f"Unexpected end of .mni stream after {self.bytes_read} bytes")
+        return elements
+
+    def _error(self, message: str) -> MniStreamError:
+        return MniStreamError(f"{message} (near {self._buf[self._pos:self._pos + 20]!r})")
+
+    def _drain(self, final: bool) -> List[MniElement]:
+        elements: List[MniElement] = []
+        try:
+            while self._step(elements, final):
+                pass
+        finally:
+            self.max_buffered = max(self.max_buffered, len(self._buf))
+            # 반환한 앞부분은 버림
+            start = self._capture[1] if self._capture is not None else self._pos
+            if start:
+                self._buf = self._buf[start:]
+                self._pos -= start
+                if self._capture is not None:
+                    self._capture[1] -= start
+        return elements
+
+    def _string_end(self, start: int) -> int:
+        # start의 따옴표로 시작한 문자열이 끝난 다음 위치 (아직 안 끝났으면 -1)
+        scan = start + 1
+        while True:
+            match = _STRING_SPECIAL.search(self._buf, scan)
+            if match is None:
+                return -1
+            if match.group() == '"':
+                return match.end()
+            scan = match.end() + 1
+
+    def _decode(self, final: bool) -> Tuple[bool, Any, int]:
+        # 읽는 중인 값을 디코딩해 (완료 여부, 값, 끝난 다음 위치)를 반환
+        capture = self._capture
+        path, start, attempted = capture
+        buf = self._buf
+        if buf[start] not in '[{"':
+            # 숫자·true 등은 구분자가 보여야 끝났는지 알 수 있음
+            match = _SCALAR_END.search(buf, start)
+            if match is None:
+                return False, None, -1
+            end = match.start()
+        elif len(buf) - start < attempted * 2 and not final:
+            # 큰 값은 버퍼가 두 배로 늘 때마다 다시 시도 (전체 디코딩 비용이 선형이 되도록)
+            return False, None, -1
+        else:
+            end = None
+        try:
+            if end is None:
+                value, end = _DECODER.raw_decode(buf, start)
+            else:
+                value = json.loads(buf[start:end])
+        except json.JSONDecodeError as exc:
+            # 버퍼 끝에서 난 오류는 값이 아직 덜 온 것
+            if end is None and not final and (exc.msg.startswith("Unterminated string") or exc.pos >= len(buf) - _MAX_PARTIAL_TOKEN):
+                capture[2] = len(buf) - start
+                return False, None, -1
+            raise MniStreamError(f"Invalid JSON at {'.'.join(str(p) for p in path)}: {exc}") from exc
+        return True, value, end
+
+    def _pop(self) -> None:
+        self._pos += 1
+        self._stack.pop()
+        if not self._stack:
+            self._done = True
+
+    def _step(self, elements: List[MniElement], final: bool) -> bool:
+        # 한 단계 진행하면 True, 조각이 더 필요하면 False
+        if self._capture is not None:
+            complete, value, end = self._decode(final)
+            if not complete:
+                return False
+            elements.append((self._capture[0], value))
+            self._capture = None
+            self._pos = end
+            return True
+
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        if self._pos >= len(self._buf):
+            return False
+        char = self._buf[self._pos]
+        if self._done:
+            raise self._error("Unexpected data after the .mni object")
+        if not self._stack:
+            if char != "{":
+                raise self._error("A .mni stream must be a JSON object")
+            self._stack.append(_Frame((), False))
+            self._pos += 1
+            return True
+
+        frame = self._stack[-1]
+        closing = "]" if frame.is_array else "}"
+        if frame.state == "next":
+            if char == ",":
+                frame.state = "value" if frame.is_array else "key"
+                self._pos += 1
+            elif char == closing:
+                self._pop()
+            else:
+                raise self._error(f"Expected ',' or '{closing}'")
+            return True
+        if frame.state == "first" and char == closing:
+            self._pop()
+            return True
+
+        if frame.is_array:
+            path = frame.path + (frame.index,)
+            frame.index += 1
+        elif frame.state in ("first", "key"):
+            if char != '"':
+                raise self._error("Expected an object key")
+            end = self._string_end(self._pos)
+            if end < 0:
+                return False
+            frame.key = json.loads(self._buf[self._pos:end])
+            frame.state = "colon"
+            self._pos = end
+            return True
+        elif frame.state == "colon":
+            if char != ":":
+                raise self._error("Expected ':'")
+            frame.state = "value"
+            self._pos += 1
+            return True
+        else:
+            path = frame.path + (frame.key,)
+
+        frame.state = "next"
+        if (path in self._descend and char == "{") or (path in self._split and char == "["):
+            self._stack.append(_Frame(path, char == "["))
+            elements.append((path, [] if char == "[" else {}))
+            self._pos += 1
+        else:
+            self._capture = [path, self._pos, 0]
+        return True
+
+
+def iter_mni_elements(chunks: Iterable[bytes], split_paths: Iterable[Tuple[str, ...]] = SPLIT_PATHS) -> Iterator[MniElement]:
+    """
+    바이트 조각 순회자(파일 읽기, 다운로드 응답 등)에서 .mni 원소를 읽는 대로 내보냅니다.
+    """
+    parser = MniStreamParser(split_paths)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_mni_elements(
+    chunks: AsyncIterable[bytes],
+    split_paths: Iterable[Tuple[str, ...]] = SPLIT_PATHS,
+) -> AsyncIterator[MniElement]:
+    """
+    비동기 바이트 스트림(httpx의 aiter_bytes(), request.stream() 등)에서 .mni 원소를 읽는 대로 내보냅니다.
+    """
+    parser = MniStreamParser(split_paths)
+    async for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+    for element in parser.close():
+        yield element
+
+
+def mni_elements(mni: Dict[str, Any], split_paths: Iterable[Tuple[str, ...]] = SPLIT_PATHS) -> Iterator[MniElement]:
+    """
+    이미 읽은 .mni dict를 MniStreamParser와 같은 (경로, 값) 원소로 내보냅니다.
+    """
+    split_paths = [tuple(path) for path in split_paths]
+    split = set(split_paths)
+    descend = {path[:i] for path in split_paths for i in range(1, len(path))}
+
+    def walk(path: Path, value: Dict[str, Any]) -> Iterator[MniElement]:
+        for key, item in value.items():
+            child = path + (key,)
+            if child in descend and isinstance(item, dict):
+                yield child, {}
+                yield from walk(child, item)
+            elif child in split and isinstance(item, list):
+                yield child, []
+                for index, element in enumerate(item):
+                    yield child + (index,), element
+            else:
+                yield child, item
+
+    return walk((), mni)
+
+
+def assemble(elements: Iterable[MniElement]) -> Dict[str, Any]:
+    """
+    (경로, 값) 원소를 다시 하나의 .mni dict로 합칩니다.
+    """
+    mni: Dict[str, Any] = {}
+    for path, value in elements:
+        target: Any = mni
+        for key in path[:-1]:
+            target = target[-1] if isinstance(key, int) else target[key]
+        if isinstance(path[-1], int):
+            target.append(value)
+        else:
+            target[path[-1]] = value
+    return mni
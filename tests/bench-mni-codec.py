@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+.mni 검증·직렬화 벤치마크
+
+proof_tape / visual step 수를 바꿔 가며 기존 경로와 fast path의 처리량을 비교합니다.
+  parse: json.loads + MNIFile.model_validate (step payload 검증 없음)
+         + step마다 action별 validator 호출  vs  validate_mni(bytes) (같은 검증, 섹션 단위 판별 유니온)
+  dump:  jsonable_encoder + json.dumps (FastAPI 기본 응답)  vs  dump_mni  vs  바이트 캐시 적중
+  binary: 학습에 쓰지 않은 .mni의 JSON/바이너리 크기, json.loads vs decode_mni_binary
+
+사용법 (저장소 루트에서, .env 필요):
+    python tests/bench-mni-codec.py [REPEAT]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 바이트 캐시가 읽을 .mni는 임시 디렉터리에 저장
+os.environ["MNI_STORE_DIR"] = tempfile.mkdtemp(prefix="bench-mni-")
+os.environ["MNI_DICTIONARY_DIR"] = tempfile.mkdtemp(prefix="bench-mni-dict-")
+
+import msgpack  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.mni import STEP_PAYLOAD_TYPES, MNIFile, VisualAction  # noqa: E402
+from app.services.mni_binary import decode_mni_binary, encode_mni_binary, mni_dictionaries, train_dictionary  # noqa: E402
+from app.services.mni_codec import MniBytesCache, dump_mni, validate_mni  # noqa: E402
+from app.services.mni_store import save_mni  # noqa: E402
+from app.services.timeline import step_payload  # noqa: E402
+
+SIZES = (10, 100, 1000, 10000)
+RULES = ("factor", "expand", "complete_square", "vertex", "substitute", "simplify")
+COLORS = ("blue", "yellow", "red", "green")
+# 압축 사전 학습용 .mni 수
+CORPUS_FILES = 300
+
+
+def make_mni(steps, seed=0):
+    # seed마다 계수·규칙·색이 다른 .mni (같은 seed면 같은 내용)
+    rng = random.Random(seed)
+    proof_tape = []
+    for i in range(steps):
+        a, b = rng.randint(1, 9), rng.randint(1, 9)
+        if i % 4 == 0:
+            proof_tape.append(f"x^2 - {2 * a}x + {a * a}")
+        else:
+            proof_tape.append({"step": i + 1, "rule": rng.choice(RULES), "expr_in": f"x^2-{2 * a}x+{a * a - b}", "expr_out": f"(x-{a})^2-{b}", "comment": "완전제곱식"})
+    visual_steps = []
+    for i in range(max(steps // 2, 3)):
+        kind = i % 5
+        if kind == 0:
+            visual_steps.append({"action": "CreateAxes", "x_range": [-rng.randint(1, 5), rng.randint(5, 10)], "y_range": [-2, rng.randint(5, 20)]})
+        elif kind == 1:
+            visual_steps.append({"action": "PlotFunction", "function": f"x**2 - {rng.randint(1, 9)}*x + {rng.randint(1, 9)}", "color": rng.choice(COLORS)})
+        elif kind == 2:
+            visual_steps.append({"action": "HighlightPoint", "point": [rng.randint(-5, 5), rng.randint(-5, 5)], "color": rng.choice(COLORS), "wait": 0.5})
+        elif kind == 3:
+            visual_steps.append({"action": "CreateTex", "params": {"tex": f"y = (x-{rng.randint(1, 9)})^2"}})
+        else:
+            visual_steps.append({"action": "Indicate", "target": f"step_{i - 1}"})
+    a, b = rng.randint(1, 9), rng.randint(1, 9)
+    return {
+        "schema_version": "1.0",
+        "problem": {"id": f"BENCH{steps}_{seed}", "statement": f"함수 y = x^2 - {2 * a}x + {b}의 꼭짓점을 구하라", "metadata": {}},
+        "proof_tape": proof_tape,
+        "visual": {"type": "ManimScene", "sections": [{"section_name": "Graph", "steps": visual_steps}]},
+        "verification": {"sympy": {"code": "import sympy as sp", "status": "pass", "artifacts": []}},
+        "build": {"options": {"fps": 30, "resolution": "1400x800", "theme": "dark"}},
+    }
+
+
+def measure(fn, repeat):
+    # 다섯 번 반복한 묶음 중 가장 빠른 값 (GC·다른 프로세스 영향 제외)
+    fn()
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+STEP_ADAPTERS = {action: TypeAdapter(payload_type) for action, payload_type in STEP_PAYLOAD_TYPES.items()}
+
+
+def validate_naive(body):
+    # step payload까지 검증하는 단순한 방법: JSON 파싱 → MNIFile → step마다 action별 validator 호출
+    mni = MNIFile.model_validate(json.loads(body))
+    for section in mni.visual.sections:
+        for step in section.steps:
+            payload = step_payload(step)
+            STEP_ADAPTERS[VisualAction(payload["action"])].validate_python(payload)
+
+
+def row(label, seconds, size):
+    print(f"  {label:<28} {seconds * 1e3:9.3f}ms  {size / seconds / 1024 ** 2:8.1f}MB/s")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cache = MniBytesCache()
+    for steps in SIZES:
+        mni = make_mni(steps)
+        body = json.dumps(mni, ensure_ascii=False).encode("utf-8")
+        save_mni(f"bench{steps}", mni)
+        n = max(2, repeat * 100 // steps)
+        print(f"{steps} proof steps, {len(body) / 1024:.1f}KB, {n} runs")
+        row("parse: loads+model_validate", measure(lambda: MNIFile.model_validate(json.loads(body)), n), len(body))
+        row("parse: + step loop", measure(lambda: validate_naive(body), n), len(body))
+        row("parse: validate_mni(bytes)", measure(lambda: validate_mni(body), n), len(body))
+        row("dump: jsonable_encoder+dumps", measure(lambda: json.dumps(jsonable_encoder(mni), ensure_ascii=False).encode("utf-8"), n), len(body))
+        row("dump: dump_mni", measure(lambda: dump_mni(mni), n), len(body))
+        row("dump: bytes cache hit", measure(lambda: cache.get(f"bench{steps}", lambda m: m), n), len(body))
+
+    # 바이너리 형식: 작은 파일이 대부분인 문제 은행을 흉내 낸 표본으로 사전 학습
+    rng = random.Random(1)
+    corpus = [make_mni(rng.choice((3, 5, 8, 12, 20, 40)), seed=i) for i in range(CORPUS_FILES)]
+    dictionary, _ = train_dictionary(corpus)
+    mni_dictionaries.install(dictionary)
+    print(f"binary: dictionary {len(dictionary) / 1024:.1f}KB trained on {CORPUS_FILES} files")
+    for steps in (3, 5) + SIZES:
+        # 학습에 쓰지 않은 파일로 측정
+        mni = make_mni(steps, seed=100000 + steps)
+        body = json.dumps(mni, ensure_ascii=False).encode("utf-8")
+        binary = encode_mni_binary(mni)
+        assert decode_mni_binary(binary) == mni and MNIFile.model_validate(decode_mni_binary(binary)) == MNIFile.model_validate(mni)
+        plain = len(zlib.compress(msgpack.packb(mni), 9))
+        n = max(2, repeat * 100 // steps)
+        print(
+            f"{steps} proof steps: json {len(body)}B, binary {len(binary)}B ({len(body) / len(binary):.1f}x smaller, "
+            f"{len(body) / plain:.1f}x without dictionary)"
+        )
+        row("decode: json.loads", measure(lambda: json.loads(body), n), len(body))
+        row("decode: decode_mni_binary", measure(lambda: decode_mni_binary(binary), n), len(body))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+SymPy 표현식 캐시 벤치마크
+
+교과서식 ProofStep 10,000개(같은 수식이 반복되는 실제 proof_tape 분포를 흉내 냄)를
+콜드(빈 캐시) / 웜-디스크(재시작 후, 디스크 캐시만) / 웜-메모리(같은 프로세스) 상태에서 검증합니다.
+수치 비교 fast path(verify_step)를 거친 경우도 함께 측정합니다.
+
+사용법 (저장소 루트에서, .env 필요):
+    python tests/bench-sympy-cache.py [STEPS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sympy.core.cache import clear_cache  # noqa: E402
+
+from app.services import step_verifier  # noqa: E402
+from app.services.expression_cache import ExpressionCache  # noqa: E402
+
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    steps = []
+    for i in range(count):
+        a, b = rng.randint(1, 9), rng.randint(1, 9)
+        family = rng.randrange(4)
+        if family == 0:
+            # 완전제곱식
+            expr_in, expr_out = f"x^2-{2 * a}x+{a * a - b}", f"(x-{a})^2-{b}"
+        elif family == 1:
+            # 인수분해
+            expr_in, expr_out = f"x^2-{a + b}x+{a * b}", f"(x-{a})(x-{b})"
+        elif family == 2:
+            # 삼각함수 항등식
+            expr_in, expr_out = f"{a}sin(x)^2+{a}cos(x)^2", f"{a}"
+        else:
+            # 분수식 약분
+            expr_in, expr_out = f"(x^2-{a * a})/(x+{a})", f"x-{a}"
+        if rng.random() < 0.05:
+            # 틀린 변환
+            expr_out = f"{expr_out}+1"
+        steps.append((expr_in, expr_out))
+    return steps
+
+
+def run(label, cache, corpus):
+    clear_cache()
+    start = time.perf_counter()
+    passed = sum(1 for expr_in, expr_out in corpus if cache.equivalent(expr_in, expr_out))
+    cache.flush()
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    print(
+        f"{label:<12} {elapsed:8.2f}s  {elapsed / len(corpus) * 1e6:9.1f}us/step  "
+        f"pass={passed}  memory_hit={stats['memory_hits']}  disk_hit={stats['disk_hits']}  miss={stats['misses']}"
+    )
+
+
+def run_fast_path(label, cache, corpus):
+    # verify_step(수치 비교 후 필요할 때만 기호 비교)을 벤치용 캐시로 실행
+    step_verifier.expression_cache = cache
+    start = time.perf_counter()
+    results = [step_verifier.verify_step({"expr_in": expr_in, "expr_out": expr_out}) for expr_in, expr_out in corpus]
+    cache.flush()
+    elapsed = time.perf_counter() - start
+    passed = sum(1 for r in results if r["status"] == "pass")
+    numeric = sum(1 for r in results if r["method"] == "numeric")
+    print(f"{label:<12} {elapsed:8.2f}s  {elapsed / len(corpus) * 1e6:9.1f}us/step  pass={passed}  numeric_only={numeric}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    corpus = make_corpus(count)
+    print(f"{count} steps, {len(set(corpus))} unique")
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "expression-cache.db")
+        cold = ExpressionCache(path)
+        run("cold", cold, corpus)
+        # 재시작을 흉내 냄: 메모리 캐시는 비어 있고 디스크 캐시만 있음
+        run("warm-disk", ExpressionCache(path), corpus)
+        cold.memory_hits = cold.disk_hits = cold.misses = 0
+        run("warm-memory", cold, corpus)
+
+    print("numeric fast path (verify_step)")
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "expression-cache.db")
+        cache = ExpressionCache(path)
+        clear_cache()
+        run_fast_path("cold", cache, corpus)
+        run_fast_path("warm-memory", cache, corpus)
+
+
+if __name__ == "__main__":
+    main()